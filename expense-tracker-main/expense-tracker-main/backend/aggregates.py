@@ -0,0 +1,174 @@
+"""Per-user expense aggregates maintained on write.
+
+Each user has one document in the `user_aggregates` collection holding the
+expense count, total amount, per-category totals and the first/last expense
+date (as proleptic Gregorian ordinals). Writers fold new expenses into it
+with server-side Increment/Minimum/Maximum transforms committed in the same
+atomic batch as the expense documents, so /api/ai/insights can answer from a
+single document read instead of scanning every expense.
+
+Usage:
+    python aggregates.py rebuild --user <user_id>
+    python aggregates.py rebuild --all
+"""
+import argparse
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+from firebase_admin import firestore
+from firestore_bulk import bulk_write
+
+AGGREGATES_COLLECTION = 'user_aggregates'
+
+def date_ordinal(value: Any) -> Optional[int]:
+    """Parse an expense date into a day ordinal, or None if it is not a valid date"""
+    if isinstance(value, datetime):
+        return value.toordinal()
+    try:
+        return datetime.fromisoformat(str(value)).toordinal()
+    except ValueError:
+        return None
+
+def summarize_expenses(expenses: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compute aggregate values for a set of expenses"""
+    summary: Dict[str, Any] = {
+        'count': 0,
+        'total_amount': 0.0,
+        'category_totals': {},
+        'min_date_ordinal': None,
+        'max_date_ordinal': None
+    }
+    category_totals = summary['category_totals']
+
+    for expense in expenses:
+        category = expense.get('category', 'Uncategorized')
+        amount = float(expense.get('amount', 0))
+        summary['count'] += 1
+        summary['total_amount'] += amount
+        category_totals[category] = category_totals.get(category, 0) + amount
+
+        ordinal = date_ordinal(expense.get('date', ''))
+        if ordinal is not None:
+            if summary['min_date_ordinal'] is None or ordinal < summary['min_date_ordinal']:
+                summary['min_date_ordinal'] = ordinal
+            if summary['max_date_ordinal'] is None or ordinal > summary['max_date_ordinal']:
+                summary['max_date_ordinal'] = ordinal
+
+    return summary
+
+def aggregate_update(user_id: str, expenses: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a merge-set payload that folds expenses into a user's aggregate"""
+    summary = summarize_expenses(expenses)
+    update: Dict[str, Any] = {
+        'user_id': user_id,
+        'count': firestore.Increment(summary['count']),
+        'total_amount': firestore.Increment(summary['total_amount']),
+        'category_totals': {
+            category: firestore.Increment(amount)
+            for category, amount in summary['category_totals'].items()
+        },
+        'updated_at': firestore.SERVER_TIMESTAMP
+    }
+    if summary['min_date_ordinal'] is not None:
+        update['min_date_ordinal'] = firestore.Minimum(summary['min_date_ordinal'])
+        update['max_date_ordinal'] = firestore.Maximum(summary['max_date_ordinal'])
+    return update
+
+def aggregate_ref(db: Any, user_id: str) -> Any:
+    return db.collection(AGGREGATES_COLLECTION).document(user_id)
+
+def stage_aggregate_update(batch: Any, db: Any, user_id: str, expenses: Sequence[Dict[str, Any]]) -> None:
+    """Add the aggregate update for expenses to a write batch or transaction"""
+    batch.set(aggregate_ref(db, user_id), aggregate_update(user_id, expenses), merge=True)
+
+def add_expenses(db: Any, user_id: str, expenses: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Bulk-create a user's expense documents, folding each chunk into their aggregate atomically"""
+    ensure_user_aggregate(db, user_id)
+    return bulk_write(
+        db, 'expenses', expenses,
+        stage_extra=lambda batch, chunk: stage_aggregate_update(batch, db, user_id, chunk),
+        extra_ops=1
+    )
+
+def rebuild_in_transaction(transaction: Any, db: Any, user_id: str, only_if_missing: bool = False) -> Dict[str, Any]:
+    """Recompute a user's aggregate from their expenses within `transaction`.
+
+    The aggregate document is read in the transaction, so an Increment
+    committed by a concurrent writer makes Firestore retry the rebuild
+    instead of the rebuild overwriting it.
+    """
+    ref = aggregate_ref(db, user_id)
+    snapshot = ref.get(transaction=transaction)
+    if only_if_missing and snapshot.exists:
+        return snapshot.to_dict() or {}
+    query = db.collection('expenses').where('user_id', '==', user_id)
+    aggregate = summarize_expenses(doc.to_dict() or {} for doc in transaction.get(query))
+    aggregate['user_id'] = user_id
+    transaction.set(ref, dict(aggregate, updated_at=firestore.SERVER_TIMESTAMP))
+    return aggregate
+
+def rebuild_user_aggregate(db: Any, user_id: str, only_if_missing: bool = False) -> Dict[str, Any]:
+    """Recompute a user's aggregate from their expense documents in a transaction"""
+    return firestore.transactional(rebuild_in_transaction)(db.transaction(), db, user_id, only_if_missing)
+
+def ensure_user_aggregate(db: Any, user_id: str) -> None:
+    """Backfill a missing aggregate before a write folds into it.
+
+    A merge-set Increment on a missing document creates it holding only the
+    new expenses; writers call this first so the aggregate starts from the
+    user's existing ones.
+    """
+    if not aggregate_ref(db, user_id).get().exists:
+        rebuild_user_aggregate(db, user_id, only_if_missing=True)
+
+def get_user_aggregate(db: Any, user_id: str) -> Dict[str, Any]:
+    """Read a user's aggregate, backfilling it on first access"""
+    snapshot = aggregate_ref(db, user_id).get()
+    if snapshot.exists:
+        return snapshot.to_dict() or {}
+    return rebuild_user_aggregate(db, user_id, only_if_missing=True)
+
+def insights_from_aggregate(aggregate: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Derive the /api/ai/insights payload, or None if the user has no expenses"""
+    category_totals = aggregate.get('category_totals') or {}
+    if not aggregate.get('count') or not category_totals:
+        return None
+
+    # Find top category
+    top_category = max(category_totals.items(), key=lambda x: x[1])
+
+    # Calculate average daily spend
+    total_amount = float(aggregate.get('total_amount', 0))
+    min_date = aggregate.get('min_date_ordinal')
+    max_date = aggregate.get('max_date_ordinal')
+    if min_date is not None and max_date is not None:
+        date_range = (max_date - min_date) or 1
+        average_daily = total_amount / date_range
+    else:
+        average_daily = 0
+
+    return {
+        'topCategory': top_category[0],
+        'topCategoryAmount': top_category[1],
+        'averageDailySpend': average_daily
+    }
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Maintain per-user expense aggregates')
+    parser.add_argument('command', choices=['rebuild'])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--user', help='Rebuild a single user')
+    target.add_argument('--all', action='store_true', help='Rebuild every user')
+    args = parser.parse_args(argv)
+
+    from app import db
+
+    user_ids = [args.user] if args.user else [doc.id for doc in db.collection('users').stream()]
+    for user_id in user_ids:
+        aggregate = rebuild_user_aggregate(db, user_id)
+        print(f"Rebuilt aggregate for {user_id}: {aggregate['count']} expenses")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
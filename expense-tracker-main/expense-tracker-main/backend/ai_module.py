@@ -1,14 +1,45 @@
-from typing import Dict, Any, Sequence, List, Tuple, NamedTuple, Union
+from __future__ import annotations
+
+from typing import Dict, Any, Iterable, Sequence, List, Optional, Tuple, NamedTuple, Union, TYPE_CHECKING
 import numpy as np
 from numpy.typing import NDArray
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
-from statsmodels.tsa.arima.model import ARIMA
 from datetime import datetime, timedelta
-import pandas as pd
-from scipy import stats
-from statsmodels.tsa.seasonal import seasonal_decompose
+from importlib.metadata import version
+from threading import Lock
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import cached_property
+import atexit
+import logging
+import os
+import time
+import model_store
+from expense_frame import ExpenseFrame, as_expense_frame
+from keyword_rules import KeywordMatcher, KeywordRule, default_matcher
+from expense_validation import is_user_categorized
+from online_learning import ONLINE_CATEGORY_MODEL_NAME, HASH_FEATURES, OnlineCategoryLearner, build_online_model
+from inference_pool import CategoryInferencePool
+from process_pools import spawn_executor, terminate_executor
+from forecast_engines import CLOSED_FORM_ENGINES, FORECAST_ENGINE, arima_forecast, select_engine
+from lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.pipeline import Pipeline
+
+logger = logging.getLogger(__name__)
+
+# Heavy analytics stack, imported on first use rather than at worker startup
+pd = lazy_import('pandas')
+stats = lazy_import('scipy.stats')
+tsa_seasonal = lazy_import('statsmodels.tsa.seasonal')
+sklearn_text = lazy_import('sklearn.feature_extraction.text')
+sklearn_naive_bayes = lazy_import('sklearn.naive_bayes')
+sklearn_pipeline = lazy_import('sklearn.pipeline')
+
+# Analytics methods take either raw expense dicts or a cached ExpenseFrame
+ExpenseData = Union[Sequence[Dict[str, Any]], ExpenseFrame]
 
 class LinregressResult(NamedTuple):
     slope: float
@@ -103,19 +134,165 @@ TRAINING_DATA = [
 
 CATEGORIES = [category for _, category in set(TRAINING_DATA)]
 
+# 'static' serves the TF-IDF model fitted on TRAINING_DATA; 'online' serves
+# a hashing model that keeps learning from users' confirmed categories
+CATEGORY_MODEL_MODE = os.getenv('CATEGORY_MODEL_MODE', 'static')
+
+def category_model_metadata() -> Dict[str, Any]:
+    """Metadata a persisted category model must match to be reused"""
+    return {
+        'training_data': model_store.training_data_fingerprint(TRAINING_DATA),
+        'sklearn_version': version('scikit-learn')
+    }
+
+def online_category_model_metadata() -> Dict[str, Any]:
+    """Metadata an online model snapshot must match to be resumed"""
+    return dict(category_model_metadata(), mode='online', hash_features=HASH_FEATURES)
+
 class ExpenseAI:
-    def __init__(self):
-        # Initialize ML model for category prediction
-        self.category_model = self._train_category_model()
-        
-    def _train_category_model(self) -> Pipeline:
+    def __init__(self, forecast_workers: Optional[int] = None, forecast_timeout: Optional[float] = None,
+                 keyword_matcher: Optional[KeywordMatcher] = None, category_model_mode: Optional[str] = None,
+                 inference_workers: Optional[int] = None, forecast_engine: Optional[str] = None):
+        # The ML model for category prediction is loaded on first use
+        self._category_model: Optional[Pipeline] = None
+        self._category_model_lock = Lock()
+        self.category_model_mode = category_model_mode or CATEGORY_MODEL_MODE
+        self._online_learner: Optional[OnlineCategoryLearner] = None
+
+        # Keyword rules decide known merchants before the model is consulted
+        self.keyword_matcher = keyword_matcher or default_matcher()
+
+        # 'auto' picks an engine per category series; see forecast_engines
+        self.forecast_engine = forecast_engine or FORECAST_ENGINE
+
+        # Per-category ARIMA fits run on a process pool; 0 workers fits inline
+        if forecast_workers is None:
+            forecast_workers = int(os.getenv('FORECAST_WORKERS', str(min(4, os.cpu_count() or 1))))
+        if forecast_timeout is None:
+            forecast_timeout = float(os.getenv('FORECAST_FIT_TIMEOUT', '10'))
+        self.forecast_workers = forecast_workers
+        self.forecast_timeout = forecast_timeout
+        self._forecast_pool: Optional[ProcessPoolExecutor] = None
+        self._forecast_pool_lock = Lock()
+
+        # Static-mode categorization can run on an inference process pool;
+        # 0 workers predicts inline on the request thread
+        if inference_workers is None:
+            inference_workers = int(os.getenv('INFERENCE_WORKERS', '0'))
+        self.inference_workers = inference_workers
+        self.inference_timeout = float(os.getenv('INFERENCE_TIMEOUT', '5'))
+        self._inference_pool: Optional[CategoryInferencePool] = None
+
+    def _get_forecast_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Return the shared forecast worker pool, starting it on first use"""
+        if self.forecast_workers <= 0:
+            return None
+        with self._forecast_pool_lock:
+            if self._forecast_pool is None:
+                self._forecast_pool = spawn_executor(self.forecast_workers)
+            return self._forecast_pool
+
+    @property
+    def inference_pool(self) -> Optional[CategoryInferencePool]:
+        """Category inference pool, started on first use; None when inference runs inline"""
+        if self.inference_workers <= 0 or self.category_model_mode == 'online':
+            return None
+        if self._inference_pool is None:
+            with self._category_model_lock:
+                if self._inference_pool is None:
+                    # Workers memory-map the published artifact, so make sure there is one
+                    metadata = category_model_metadata()
+                    if model_store.load_model(model_store.CATEGORY_MODEL_NAME, metadata) is None:
+                        model_store.save_model(self._train_category_model(), model_store.CATEGORY_MODEL_NAME, metadata)
+                    self._inference_pool = CategoryInferencePool(
+                        self.inference_workers,
+                        metadata,
+                        max_batch_size=int(os.getenv('INFERENCE_MAX_BATCH', '256')),
+                        max_wait_ms=float(os.getenv('INFERENCE_MAX_WAIT_MS', '2'))
+                    )
+                    atexit.register(self._inference_pool.close)
+        return self._inference_pool
+
+    def _predict_proba(self, descriptions: List[str]) -> Tuple[Sequence[str], NDArray[np.float64]]:
+        """Class labels and probability rows, from the inference pool when there is one"""
+        pool = self.inference_pool
+        if pool is not None:
+            try:
+                return pool.predict_proba(descriptions, timeout=self.inference_timeout)
+            except Exception as e:
+                # A slow or broken pool must not fail the request
+                pool.record_fallback()
+                logger.warning("Category inference pool failed, predicting inline: %r", e)
+        model = self.category_model
+        return model.classes_, model.predict_proba(descriptions)
+
+    def _reset_forecast_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Kill a broken or hung forecast pool so the next request starts a fresh one"""
+        with self._forecast_pool_lock:
+            if self._forecast_pool is pool:
+                self._forecast_pool = None
+        terminate_executor(pool)
+
+    @property
+    def category_model(self) -> Pipeline:
+        """Category prediction model, loaded from the model store on first access"""
+        if self.category_model_mode == 'online':
+            return self.online_learner.model
+        if self._category_model is None:
+            with self._category_model_lock:
+                if self._category_model is None:
+                    self._category_model = self._load_category_model()
+        return self._category_model
+
+    @category_model.setter
+    def category_model(self, model: Pipeline) -> None:
+        self._category_model = model
+
+    @property
+    def online_learner(self) -> OnlineCategoryLearner:
+        """Learner behind the online category model, resumed from its last snapshot"""
+        if self._online_learner is None:
+            with self._category_model_lock:
+                if self._online_learner is None:
+                    metadata = online_category_model_metadata()
+                    model = model_store.load_model(ONLINE_CATEGORY_MODEL_NAME, metadata)
+                    if model is None:
+                        model = build_online_model(TRAINING_DATA, CATEGORIES)
+                    self._online_learner = OnlineCategoryLearner(
+                        model,
+                        batch_size=int(os.getenv('ONLINE_BATCH_SIZE', '32')),
+                        flush_interval=float(os.getenv('ONLINE_FLUSH_INTERVAL', '5')),
+                        snapshot_every=int(os.getenv('ONLINE_SNAPSHOT_EVERY', '10')),
+                        metadata=metadata
+                    )
+                    atexit.register(self._online_learner.close)
+        return self._online_learner
+
+    def learn_categories(self, expenses: Iterable[Dict[str, Any]]) -> int:
+        """Queue user-confirmed categories for the online model; 0 in static mode"""
+        if self.category_model_mode != 'online':
+            return 0
+        return self.online_learner.observe(
+            (expense['description'], expense['category'])
+            for expense in expenses if is_user_categorized(expense)
+        )
+
+    def _load_category_model(self) -> Pipeline:
+        """Load the published category model, retraining if it is missing or fails verification"""
+        model = model_store.load_model(model_store.CATEGORY_MODEL_NAME, category_model_metadata())
+        if model is None:
+            model = self._train_category_model()
+        return model
+
+    @staticmethod
+    def _train_category_model() -> Pipeline:
         """Train a machine learning model for category prediction"""
         descriptions = [desc for desc, _ in TRAINING_DATA]
         categories = [cat for _, cat in TRAINING_DATA]
         
-        model = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=1000)),
-            ('clf', MultinomialNB(alpha=0.1))
+        model = sklearn_pipeline.Pipeline([
+            ('tfidf', sklearn_text.TfidfVectorizer(max_features=1000)),
+            ('clf', sklearn_naive_bayes.MultinomialNB(alpha=0.1))
         ])
         
         model.fit(descriptions, categories)
@@ -123,49 +300,79 @@ class ExpenseAI:
 
     def predict_category(self, description: str) -> Dict[str, Any]:
         """Predict expense category using ML model with enhanced confidence scoring"""
+        return self.predict_categories([description])[0]
+
+    def predict_categories(self, descriptions: Sequence[str]) -> List[Dict[str, Any]]:
+        """Predict categories for a batch of descriptions in a single vectorized pass"""
+        if not descriptions:
+            return []
+
+        # Unambiguous high-priority keyword matches skip TF-IDF entirely
+        results: List[Optional[Dict[str, Any]]] = []
+        remaining: List[int] = []
+        for index, description in enumerate(descriptions):
+            rule = self.keyword_matcher.preclassify(description)
+            results.append(self._build_rule_prediction(rule) if rule else None)
+            if rule is None:
+                remaining.append(index)
+        if not remaining:
+            return results
+
+        remaining_descriptions = [descriptions[index] for index in remaining]
         try:
-            predicted_category = self.category_model.predict([description])[0]
-            probabilities = self.category_model.predict_proba([description])[0]
-            confidence = max(probabilities)
-            
-            # Enhance confidence based on description length and keywords
-            description_length = len(description.split())
-            length_factor = min(description_length / 5, 1.0)
-            confidence = confidence * (0.7 + 0.3 * length_factor)
-            
-            return {
-                'category': predicted_category,
-                'confidence': float(confidence),
-                'ai_tagged': True,
-                'suggested_categories': [
-                    {'category': cat, 'confidence': float(prob)}
-                    for cat, prob in zip(self.category_model.classes_, probabilities)
-                    if prob > 0.1
-                ]
-            }
+            # One TF-IDF transform over the whole batch; labels come from the
+            # argmax of the same probability matrix instead of a second predict()
+            classes, probabilities = self._predict_proba(remaining_descriptions)
         except Exception as e:
             # Fallback to keyword-based approach
-            return self._keyword_based_prediction(description)
+            for index, description in zip(remaining, remaining_descriptions):
+                results[index] = self._keyword_based_prediction(description)
+            return results
+
+        best_indices = probabilities.argmax(axis=1)
+        for index, description, best_index, row in zip(remaining, remaining_descriptions, best_indices, probabilities):
+            results[index] = self._build_category_prediction(description, classes[best_index], row, classes)
+        return results
+
+    def _build_rule_prediction(self, rule: KeywordRule) -> Dict[str, Any]:
+        """Prediction payload for a description decided by a keyword rule"""
+        return {
+            'category': rule.category,
+            'confidence': rule.confidence,
+            'ai_tagged': True,
+            'suggested_categories': [{'category': rule.category, 'confidence': rule.confidence}]
+        }
+
+    def _build_category_prediction(self, description: str, predicted_category: str,
+                                   probabilities: NDArray[np.float64], classes: NDArray[Any]) -> Dict[str, Any]:
+        """Build the per-description prediction payload from its probability row"""
+        confidence = max(probabilities)
+
+        # Enhance confidence based on description length and keywords
+        description_length = len(description.split())
+        length_factor = min(description_length / 5, 1.0)
+        confidence = confidence * (0.7 + 0.3 * length_factor)
+
+        return {
+            'category': predicted_category,
+            'confidence': float(confidence),
+            'ai_tagged': True,
+            'suggested_categories': [
+                {'category': cat, 'confidence': float(prob)}
+                for cat, prob in zip(classes, probabilities)
+                if prob > 0.1
+            ]
+        }
 
     def _keyword_based_prediction(self, description: str) -> Dict[str, Any]:
         """Fallback keyword-based prediction"""
-        description = description.lower()
-        category_keywords = {
-            'Food': ["food", "restaurant", "pizza", "kfc", "mcdonalds", "grocery", "cafe", "subway", "lidl", "carrefour"],
-            'Transport': ["uber", "taxi", "bus", "train", "transport", "fuel", "gas station"],
-            'Shopping': ["shopping", "store", "mall", "h&m", "zara", "amazon", "nike", "adidas", "ikea", "clothing"],
-            'Entertainment': ["netflix", "spotify", "movie", "cinema", "theater", "concert", "disney+"],
-            'Utilities': ["bill", "utility", "electricity", "water", "gas", "internet", "phone"],
-            'Health': ["pharmacy", "doctor", "health", "medical", "medicine", "gym", "dental"]
-        }
-        
-        for category, keywords in category_keywords.items():
-            if any(keyword in description for keyword in keywords):
-                return {
-                    'category': category,
-                    'confidence': 0.8,
-                    'ai_tagged': True
-                }
+        found = self.keyword_matcher.match(description)
+        if found is not None:
+            return {
+                'category': found.rule.category,
+                'confidence': 0.8,
+                'ai_tagged': True
+            }
         
         return {
             'category': "Other",
@@ -173,62 +380,104 @@ class ExpenseAI:
             'ai_tagged': True
         }
 
-    def predict_future_expenses(self, expenses: Sequence[Dict[str, Any]], days: int = 30) -> Dict[str, Any]:
+    def predict_future_expenses(self, expenses: ExpenseData, days: int = 30) -> Dict[str, Any]:
         """Predict future expenses using advanced time series analysis"""
         if not expenses:
             return {'error': 'No expenses data available'}
 
         try:
-            df = pd.DataFrame(expenses)
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.set_index('date')
+            df = as_expense_frame(expenses).to_dataframe().set_index('date')
+            # Expenses whose date could not be parsed cannot be placed on the timeline
+            df = df[df.index.notna()]
+            if df.empty:
+                return {'error': 'No expenses with a valid date'}
             
             # Create multiple time series for different categories
             category_series = {}
-            for category in df['category'].unique():
-                category_df = df[df['category'] == category]
+            category_amounts = {}
+            for category, category_df in df.groupby('category', observed=True, sort=False):
                 daily_amounts = category_df['amount'].resample('D').sum().fillna(0)
                 category_series[category] = daily_amounts
+                category_amounts[category] = category_df['amount'].to_numpy()
+
+            # Closed-form engines run inline; ARIMA fits go to the worker pool when configured
+            engines = {
+                category: select_engine(series.to_numpy(), self.forecast_engine)
+                for category, series in category_series.items()
+            }
+            pool = self._get_forecast_pool() if 'arima' in engines.values() else None
+            pending = {}
+            for category, engine in engines.items():
+                if engine == 'arima' and pool is not None:
+                    # Each fit gets forecast_timeout from its own submission, not from when it is awaited
+                    pending[category] = (pool.submit(arima_forecast, category_series[category], days),
+                                         time.monotonic() + self.forecast_timeout)
 
-            # Generate predictions for each category
             predictions = {}
-            for category, series in category_series.items():
-                if len(series) > 2:
-                    model = ARIMA(series, order=(2,1,2))
-                    model_fit = model.fit()
-                    forecast = model_fit.forecast(steps=days)
-                    conf_int = model_fit.get_forecast(steps=days).conf_int()
-                    
+            fallback_categories = []
+            recycle_pool = False
+            for category, engine in engines.items():
+                if engine != 'arima':
+                    predictions[category] = CLOSED_FORM_ENGINES[engine](category_series[category].to_numpy(), days)
+                    continue
+                future, deadline = pending.get(category, (None, None))
+                try:
+                    if future is None:
+                        predictions[category] = arima_forecast(category_series[category], days)
+                    else:
+                        predictions[category] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except Exception as e:
+                    # A fit that times out or fails falls back to the category average
+                    if future is not None:
+                        # A fit that already started cannot be cancelled and would hold its worker
+                        if not future.cancel() and not future.done():
+                            recycle_pool = True
+                        if isinstance(e, BrokenProcessPool):
+                            recycle_pool = True
+                    fallback = self._simple_average_prediction(category_amounts[category], days)
                     predictions[category] = {
-                        'predictions': forecast.values.tolist(),
-                        'confidence_intervals': list(zip(
-                            conf_int.iloc[:, 0].values.tolist(),
-                            conf_int.iloc[:, 1].values.tolist()
-                        ))
+                        'predictions': fallback['predictions'],
+                        'confidence_intervals': fallback['confidence_intervals']
                     }
+                    engines[category] = 'simple_average'
+                    fallback_categories.append(category)
+            if recycle_pool:
+                self._reset_forecast_pool(pool)
 
             # Combine category predictions
             total_predictions = []
+            total_intervals = []
             for i in range(days):
                 day_total = sum(pred['predictions'][i] for pred in predictions.values())
                 total_predictions.append(day_total)
+                total_intervals.append((
+                    sum(pred['confidence_intervals'][i][0] for pred in predictions.values()),
+                    sum(pred['confidence_intervals'][i][1] for pred in predictions.values())
+                ))
 
             return {
                 'predictions': total_predictions,
-                'category_predictions': predictions,
+                'confidence_intervals': total_intervals,
+                'category_predictions': {
+                    cat: {'predictions': pred['predictions'], 'confidence_intervals': pred['confidence_intervals']}
+                    for cat, pred in predictions.items()
+                },
                 'model_metrics': {
-                    'aic': {cat: float(model_fit.aic) for cat, model_fit in predictions.items()},
-                    'bic': {cat: float(model_fit.bic) for cat, model_fit in predictions.items()}
+                    'aic': {cat: pred['aic'] for cat, pred in predictions.items() if 'aic' in pred},
+                    'bic': {cat: pred['bic'] for cat, pred in predictions.items() if 'bic' in pred},
+                    'fallback_categories': fallback_categories,
+                    'engines': engines
                 }
             }
         except Exception as e:
             # Fallback to simple average prediction
-            return self._simple_average_prediction(expenses, days)
+            if isinstance(expenses, ExpenseFrame):
+                return self._simple_average_prediction(expenses.amounts, days)
+            return self._simple_average_prediction([exp['amount'] for exp in expenses], days)
 
-    def _simple_average_prediction(self, expenses: Sequence[Dict[str, Any]], days: int) -> Dict[str, Any]:
+    def _simple_average_prediction(self, amounts: Union[Sequence[float], np.ndarray], days: int) -> Dict[str, Any]:
         """Fallback to simple average prediction"""
-        amounts = [exp['amount'] for exp in expenses]
-        avg_amount = sum(amounts) / len(amounts) if amounts else 0
+        avg_amount = float(np.mean(amounts)) if len(amounts) else 0
         predictions = [avg_amount] * days
 
         return {
@@ -237,6 +486,27 @@ class ExpenseAI:
             'model_metrics': {'method': 'simple_average'}
         }
 
+    def _unusual_spending(self, df: 'pd.DataFrame', threshold: float = 2.0) -> List[Dict[str, Any]]:
+        """Expenses more than threshold standard deviations from their category mean"""
+        # One groupby-transform pass for every category; records keep the
+        # old per-category loop's order (category first seen, then position)
+        grouped = df.groupby('category', observed=True, sort=False)['amount']
+        mean = grouped.transform('mean')
+        std = grouped.transform('std', ddof=0)
+        # A category with one expense, or all equal amounts, has no outliers
+        z_scores = (df['amount'] - mean) / std.where(std > 0)
+        flagged = z_scores.abs() > threshold
+        if not flagged.any():
+            return []
+
+        outliers = df.loc[flagged, ['amount', 'description', 'category', 'date']].assign(
+            date=lambda frame: frame['date'].dt.strftime('%Y-%m-%d'),
+            z_score=z_scores[flagged]
+        )
+        outliers = outliers.sort_values('category', kind='stable')
+        outliers['category'] = outliers['category'].astype(object)
+        return outliers.to_dict('records')
+
     def _calculate_trend(self, values: Union[pd.Series, np.ndarray]) -> Dict[str, float]:
         """Calculate trend using simple linear regression"""
         if len(values) < 2:
@@ -270,77 +540,23 @@ class ExpenseAI:
             'r_squared': float(r_squared)
         }
 
-    def analyze_spending_patterns(self, expenses: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_spending_patterns(self, expenses: ExpenseData) -> Dict[str, Any]:
         """Analyze spending patterns with advanced statistical analysis"""
         if not expenses:
             return {'error': 'No expenses data available'}
+        return AnalyticsPipeline(self, expenses).spending_analysis()
 
-        df = pd.DataFrame(expenses)
-        df['date'] = pd.to_datetime(df['date'])
-        
-        # Enhanced daily spending analysis
-        daily_spending = df.groupby('date')['amount'].sum()
-        weekly_spending = daily_spending.resample('W').sum()
-        monthly_spending = daily_spending.resample('M').sum()
-        
-        # Calculate spending trends with our custom method
-        daily_trend = self._calculate_trend(np.array(daily_spending.values))
-        weekly_trend = self._calculate_trend(np.array(weekly_spending.values))
-        monthly_trend = self._calculate_trend(np.array(monthly_spending.values))
-        
-        # Enhanced category analysis
-        category_dist = df.groupby('category')['amount'].sum()
-        total_spent = category_dist.sum()
-        category_percentages = (category_dist / total_spent * 100).round(2)
-        
-        # Detect unusual spending with statistical methods
-        unusual_spending = []
-        for category in df['category'].unique():
-            category_expenses = df[df['category'] == category]['amount']
-            if len(category_expenses) > 1:
-                z_scores = stats.zscore(category_expenses)
-                unusual_indices = np.where(np.abs(z_scores) > 2)[0]
-                for idx in unusual_indices:
-                    expense = df[df['category'] == category].iloc[idx]
-                    unusual_spending.append({
-                        'amount': float(expense['amount']),
-                        'description': expense['description'],
-                        'category': category,
-                        'date': expense['date'].strftime('%Y-%m-%d'),
-                        'z_score': float(z_scores[idx])
-                    })
-        
-        # Calculate spending volatility
-        daily_volatility = daily_spending.std()
-        weekly_volatility = weekly_spending.std()
-        monthly_volatility = monthly_spending.std()
-        
-        # Identify spending patterns
-        patterns = {
-            'daily_pattern': self._identify_daily_pattern(daily_spending),
-            'weekly_pattern': self._identify_weekly_pattern(weekly_spending),
-            'monthly_pattern': self._identify_monthly_pattern(monthly_spending)
-        }
-        
-        return {
-            'total_spent': float(total_spent),
-            'category_distribution': category_percentages.to_dict(),
-            'unusual_spending': unusual_spending,
-            'spending_trends': {
-                'daily': {'slope': daily_trend['slope'], 'confidence': daily_trend['r_squared']},
-                'weekly': {'slope': weekly_trend['slope'], 'confidence': weekly_trend['r_squared']},
-                'monthly': {'slope': monthly_trend['slope'], 'confidence': monthly_trend['r_squared']}
-            },
-            'spending_volatility': {
-                'daily': float(daily_volatility),
-                'weekly': float(weekly_volatility),
-                'monthly': float(monthly_volatility)
-            },
-            'patterns': patterns,
-            'average_daily_spending': float(daily_spending.mean()),
-            'average_weekly_spending': float(weekly_spending.mean()),
-            'average_monthly_spending': float(monthly_spending.mean())
-        }
+    def detect_anomalies(self, expenses: ExpenseData) -> List[Dict[str, Any]]:
+        """Expenses far outside their category's usual amounts"""
+        if not expenses:
+            return []
+        return AnalyticsPipeline(self, expenses).unusual_spending
+
+    def identify_patterns(self, expenses: ExpenseData) -> Dict[str, Any]:
+        """Day-of-week, weekly and monthly spending patterns"""
+        if not expenses:
+            return {}
+        return AnalyticsPipeline(self, expenses).patterns
 
     def _identify_daily_pattern(self, daily_spending: pd.Series) -> Dict[str, Any]:
         """Identify daily spending patterns"""
@@ -377,7 +593,7 @@ class ExpenseAI:
     def _detect_seasonality(self, series: pd.Series) -> Dict[str, Any]:
         """Detect seasonal patterns in spending"""
         try:
-            decomposition = seasonal_decompose(series, model='additive', period=12)
+            decomposition = tsa_seasonal.seasonal_decompose(series, model='additive', period=12)
             return {
                 'seasonal_strength': float(np.abs(decomposition.seasonal).mean()),
                 'trend_strength': float(np.abs(decomposition.trend).mean()),
@@ -386,49 +602,11 @@ class ExpenseAI:
         except:
             return {'error': 'Insufficient data for seasonality analysis'}
 
-    def process_chat_query(self, query: str, expenses: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    def process_chat_query(self, query: str, expenses: ExpenseData) -> Dict[str, Any]:
         """Process natural language queries with enhanced understanding"""
         if not expenses:
             return {'message': 'No expenses found in your history.'}
-
-        df = pd.DataFrame(expenses)
-        df['date'] = pd.to_datetime(df['date'])
-        
-        # Enhanced query understanding
-        query = query.lower()
-        
-        if 'total' in query:
-            total = df['amount'].sum()
-            return {
-                'amount': float(total),
-                'message': f"Your total spending is €{total:.2f}.",
-                'breakdown': {
-                    'by_category': df.groupby('category')['amount'].sum().to_dict(),
-                    'by_month': df.groupby(df['date'].dt.to_period('M'))['amount'].sum().to_dict()
-                }
-            }
-        elif 'category' in query:
-            category_totals = df.groupby('category')['amount'].sum()
-            return {
-                'amount': float(category_totals.sum()),
-                'message': f"Category-wise spending: {category_totals.to_dict()}",
-                'recommendations': self._generate_category_recommendations(category_totals)
-            }
-        elif 'trend' in query:
-            daily_spending = df.groupby('date')['amount'].sum()
-            trend = self._calculate_trend(np.array(daily_spending.values))
-            return {
-                'amount': trend['slope'],
-                'message': f"Your spending is {'increasing' if trend['slope'] > 0 else 'decreasing'} by €{abs(trend['slope']):.2f} per day on average.",
-                'confidence': trend['r_squared']
-            }
-        else:
-            # Try to understand the query using keywords
-            analysis = self.analyze_spending_patterns(expenses)
-            return {
-                'message': self._generate_insightful_response(query, analysis),
-                'analysis': analysis
-            }
+        return AnalyticsPipeline(self, expenses).chat(query)
 
     def _generate_category_recommendations(self, category_totals: pd.Series) -> List[Dict[str, Any]]:
         """Generate recommendations based on category spending"""
@@ -470,5 +648,138 @@ class ExpenseAI:
         
         return " ".join(response)
 
+class AnalyticsPipeline:
+    """Per-request analytics over one user's expenses
+
+    The daily series, its weekly and monthly resamples, category totals,
+    trends and z-score outliers are each computed on first use and shared
+    by the chat answer, anomalies and patterns of the same request. Time
+    spent building each of them is recorded in `timings` (milliseconds).
+    """
+
+    def __init__(self, ai: ExpenseAI, expenses: ExpenseData):
+        self.ai = ai
+        self.timings: Dict[str, float] = {}
+        with self.stage('frame'):
+            self.df = as_expense_frame(expenses).to_dataframe()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+    @cached_property
+    def daily_spending(self) -> pd.Series:
+        with self.stage('daily_spending'):
+            return self.df.groupby('date')['amount'].sum()
+
+    @cached_property
+    def weekly_spending(self) -> pd.Series:
+        daily_spending = self.daily_spending
+        with self.stage('resamples'):
+            return daily_spending.resample('W').sum()
+
+    @cached_property
+    def monthly_spending(self) -> pd.Series:
+        daily_spending = self.daily_spending
+        with self.stage('resamples'):
+            return daily_spending.resample('M').sum()
+
+    @cached_property
+    def category_totals(self) -> pd.Series:
+        with self.stage('category_totals'):
+            return self.df.groupby('category', observed=True)['amount'].sum()
+
+    @cached_property
+    def unusual_spending(self) -> List[Dict[str, Any]]:
+        with self.stage('unusual_spending'):
+            return self.ai._unusual_spending(self.df)
+
+    @cached_property
+    def trends(self) -> Dict[str, Dict[str, float]]:
+        series = {'daily': self.daily_spending, 'weekly': self.weekly_spending, 'monthly': self.monthly_spending}
+        with self.stage('trends'):
+            return {name: self.ai._calculate_trend(np.array(values.values)) for name, values in series.items()}
+
+    @cached_property
+    def patterns(self) -> Dict[str, Any]:
+        daily_spending, weekly_spending, monthly_spending = self.daily_spending, self.weekly_spending, self.monthly_spending
+        with self.stage('patterns'):
+            return {
+                'daily_pattern': self.ai._identify_daily_pattern(daily_spending),
+                'weekly_pattern': self.ai._identify_weekly_pattern(weekly_spending),
+                'monthly_pattern': self.ai._identify_monthly_pattern(monthly_spending)
+            }
+
+    def spending_analysis(self) -> Dict[str, Any]:
+        """The analyze_spending_patterns payload"""
+        daily_spending, weekly_spending, monthly_spending = self.daily_spending, self.weekly_spending, self.monthly_spending
+        trends = self.trends
+        category_totals = self.category_totals
+        total_spent = category_totals.sum()
+        category_percentages = (category_totals / total_spent * 100).round(2)
+
+        return {
+            'total_spent': float(total_spent),
+            'category_distribution': category_percentages.to_dict(),
+            'unusual_spending': self.unusual_spending,
+            'spending_trends': {
+                name: {'slope': trend['slope'], 'confidence': trend['r_squared']}
+                for name, trend in trends.items()
+            },
+            'spending_volatility': {
+                'daily': float(daily_spending.std()),
+                'weekly': float(weekly_spending.std()),
+                'monthly': float(monthly_spending.std())
+            },
+            'patterns': self.patterns,
+            'average_daily_spending': float(daily_spending.mean()),
+            'average_weekly_spending': float(weekly_spending.mean()),
+            'average_monthly_spending': float(monthly_spending.mean())
+        }
+
+    def chat(self, query: str) -> Dict[str, Any]:
+        """Answer a natural language query from the shared intermediates"""
+        df = self.df
+        query = query.lower()
+
+        if 'total' in query:
+            with self.stage('chat'):
+                total = df['amount'].sum()
+                by_month = df.groupby(df['date'].dt.to_period('M').astype(str))['amount'].sum().to_dict()
+            return {
+                'amount': float(total),
+                'message': f"Your total spending is €{total:.2f}.",
+                'breakdown': {
+                    'by_category': self.category_totals.to_dict(),
+                    'by_month': by_month
+                }
+            }
+        elif 'category' in query:
+            category_totals = self.category_totals
+            return {
+                'amount': float(category_totals.sum()),
+                'message': f"Category-wise spending: {category_totals.to_dict()}",
+                'recommendations': self.ai._generate_category_recommendations(category_totals)
+            }
+        elif 'trend' in query:
+            trend = self.trends['daily']
+            return {
+                'amount': trend['slope'],
+                'message': f"Your spending is {'increasing' if trend['slope'] > 0 else 'decreasing'} by €{abs(trend['slope']):.2f} per day on average.",
+                'confidence': trend['r_squared']
+            }
+        else:
+            # Try to understand the query using keywords
+            analysis = self.spending_analysis()
+            return {
+                'message': self.ai._generate_insightful_response(query, analysis),
+                'analysis': analysis
+            }
+
 # Initialize the AI module
 expense_ai = ExpenseAI() 
\ No newline at end of file
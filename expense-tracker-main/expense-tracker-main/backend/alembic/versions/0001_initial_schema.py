@@ -0,0 +1,53 @@
+"""Initial schema, as previously created by Base.metadata.create_all
+
+Databases created before migrations existed already have these tables;
+mark them with `alembic stamp 0001` instead of running this revision.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'categories',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String()),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+    )
+    op.create_index('ix_categories_id', 'categories', ['id'])
+
+    op.create_table(
+        'expenses',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('description', sa.String()),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('category_id', sa.Integer(), sa.ForeignKey('categories.id'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+    )
+    op.create_index('ix_expenses_id', 'expenses', ['id'])
+
+def downgrade() -> None:
+    op.drop_table('expenses')
+    op.drop_table('categories')
+    op.drop_table('users')
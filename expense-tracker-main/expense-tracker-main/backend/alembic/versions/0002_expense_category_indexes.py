@@ -0,0 +1,27 @@
+"""Composite indexes for the per-user expense and category queries
+
+Every router query is scoped to the current user, so the indexes lead with
+user_id. The unique (user_id, name) index also enforces what
+create_category/update_category check for; remove duplicate category names
+before upgrading an existing database.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index('ix_expenses_user_id_date', 'expenses', ['user_id', 'date'])
+    op.create_index('ix_expenses_user_id_category_id', 'expenses', ['user_id', 'category_id'])
+    op.create_index('uq_categories_user_id_name', 'categories', ['user_id', 'name'], unique=True)
+
+def downgrade() -> None:
+    op.drop_index('uq_categories_user_id_name', table_name='categories')
+    op.drop_index('ix_expenses_user_id_category_id', table_name='expenses')
+    op.drop_index('ix_expenses_user_id_date', table_name='expenses')
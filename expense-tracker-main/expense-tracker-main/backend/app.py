@@ -1,45 +1,134 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from datetime import datetime, timedelta
 import os
+import time
 from dotenv import load_dotenv
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
+from google.cloud.firestore_v1.field_path import FieldPath
 import requests
-import traceback
-from ai_module import expense_ai
+import logging
+from logging_config import configure_logging
+from ai_module import AnalyticsPipeline, expense_ai
+from forecast_cache import ForecastCache
+from expense_frame import ExpenseFrame, FrameCache
+from category_memo import CategoryMemo
+import aggregates
+from firestore_bulk import bulk_write
+from expense_validation import validate_expense
+from expense_import import import_expenses, iter_csv_rows, iter_ofx_rows
+import io
+from streaming import STREAM_FORMATS, encode_stream
 
 # Load environment variables
 load_dotenv()
 
+configure_logging()
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
+
+# Upper bound on descriptions accepted by /api/ai/categorize/batch
+MAX_CATEGORIZE_BATCH_SIZE = int(os.getenv('MAX_CATEGORIZE_BATCH_SIZE', '10000'))
+
+# Page size cap and projectable fields for GET /api/expenses
+MAX_EXPENSE_PAGE_SIZE = int(os.getenv('MAX_EXPENSE_PAGE_SIZE', '1000'))
+EXPENSE_FIELDS = {'user_id', 'amount', 'description', 'category', 'date', 'currency', 'created_at', 'ai_tagged'}
+
+# Forecast results keyed on (user_id, expense set fingerprint, days)
+forecast_cache = ForecastCache(max_bytes=int(os.getenv('FORECAST_CACHE_MAX_BYTES', str(64 * 1024 * 1024))))
+
+# Parsed, columnar copies of each user's expenses for the analytics routes
+expense_frames = FrameCache(max_bytes=int(os.getenv('EXPENSE_FRAME_CACHE_MAX_BYTES', str(256 * 1024 * 1024))))
+
+# Categories each user gave their own descriptions, consulted before the model
+category_memo = CategoryMemo(
+    max_users=int(os.getenv('CATEGORY_MEMO_MAX_USERS', '1000')),
+    max_entries_per_user=int(os.getenv('CATEGORY_MEMO_MAX_ENTRIES', '5000')),
+    max_age=float(os.getenv('CATEGORY_MEMO_TTL', '300'))
+)
+
 # Configure CORS to allow requests from frontend
 CORS(app, resources={
     r"/api/*": {
         "origins": ["http://localhost:3000"],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"]
+        "allow_headers": ["Content-Type", "Authorization"],
+        "expose_headers": ["X-Next-Cursor"]
     }
 })
 
-# Initialize Firebase Admin
-try:
-    cred = credentials.Certificate('firebase-credentials.json.json')
-    firebase_admin.initialize_app(cred)
-    db = firestore.client()
-    
-    # Test Firestore connection
-    test_ref = db.collection('_test').document('_test')
-    test_ref.set({'test': True})
-    test_ref.delete()
-    print("Firebase and Firestore initialized successfully!")
-except Exception as e:
-    print(f"Firebase/Firestore initialization error: {str(e)}")
-    print(traceback.format_exc())
-    raise e
+def init_firestore():
+    """Initialize Firebase Admin and check the Firestore connection"""
+    try:
+        cred = credentials.Certificate('firebase-credentials.json.json')
+        firebase_admin.initialize_app(cred)
+        client = firestore.client()
+
+        # Test Firestore connection
+        test_ref = client.collection('_test').document('_test')
+        test_ref.set({'test': True})
+        test_ref.delete()
+        logger.info("Firebase and Firestore initialized successfully")
+        return client
+    except Exception as e:
+        logger.exception("Firebase/Firestore initialization error: %s", e)
+        raise e
+
+# Forecast and inference workers are spawned processes that re-import this
+# script as __mp_main__ when it is run directly; they never serve requests,
+# so they skip Firebase entirely
+db = init_firestore() if __name__ != '__mp_main__' else None
+
+def invalidate_user_caches(user_id, new_expenses=None):
+    """Drop cached derived data for a user after their expenses change
+
+    Expenses passed in new_expenses (with their ids) are appended to the
+    user's cached frame; without them the frame is rebuilt on next use.
+    """
+    forecast_cache.invalidate_user(user_id)
+    if new_expenses is None or not expense_frames.append(user_id, new_expenses):
+        expense_frames.invalidate_user(user_id)
+    if new_expenses is None:
+        category_memo.invalidate_user(user_id)
+    else:
+        category_memo.learn(user_id, new_expenses)
+
+def get_expense_frame(user_id):
+    """The user's expenses as an ExpenseFrame, read from Firestore only when stale
+
+    The frame is trusted while its row count matches the user's aggregate,
+    which every write path keeps current; this also catches writes made by
+    other workers, whose appends never reach this process's cache.
+    """
+    frame = expense_frames.get(user_id)
+    if frame is not None:
+        aggregate = aggregates.get_user_aggregate(db, user_id)
+        if len(frame) == int(aggregate.get('count', 0)):
+            return frame
+    query = db.collection('expenses').where('user_id', '==', user_id)
+    frame = ExpenseFrame.from_expenses(iter_documents(query))
+    expense_frames.put(user_id, frame)
+    return frame
+
+def categorize_for_user(user_id, descriptions):
+    """Predict categories, preferring the labels the user gave the same descriptions"""
+    if not user_id:
+        return expense_ai.predict_categories(descriptions)
+    if not category_memo.loaded(user_id):
+        query = db.collection('expenses').where('user_id', '==', user_id).select(['description', 'category', 'ai_tagged'])
+        category_memo.load(user_id, iter_documents(query))
+
+    predictions = [category_memo.lookup(user_id, description) for description in descriptions]
+    remaining = [index for index, prediction in enumerate(predictions) if prediction is None]
+    if remaining:
+        for index, prediction in zip(remaining, expense_ai.predict_categories([descriptions[index] for index in remaining])):
+            predictions[index] = prediction
+    return predictions
 
 def create_sample_expenses(user_id):
-    """Create sample expenses for a user"""
+    """Create sample expenses for a user, returning bulk write stats"""
     sample_expenses = [
         # Regular monthly bills
         {
@@ -196,13 +285,13 @@ def create_sample_expenses(user_id):
         }
     ]
 
-    # Add sample expenses to Firestore
-    for expense in sample_expenses:
-        db.collection('expenses').add(expense)
-    return len(sample_expenses)
+    # Add sample expenses and their aggregate update to Firestore in batched writes
+    stats = aggregates.add_expenses(db, user_id, sample_expenses)
+    invalidate_user_caches(user_id)
+    return stats
 
 def create_sample_budgets(user_id):
-    """Create sample budgets for a user"""
+    """Create sample budgets for a user, returning bulk write stats"""
     sample_budgets = [
         {
             'category': 'Food',
@@ -241,23 +330,18 @@ def create_sample_budgets(user_id):
         }
     ]
 
-    # Add sample budgets to Firestore
-    for budget in sample_budgets:
-        db.collection('budgets').add(budget)
-    return len(sample_budgets)
+    # Add sample budgets to Firestore in batched writes
+    return bulk_write(db, 'budgets', sample_budgets)
 
 # Auth routes
 @app.route('/api/auth/register', methods=['POST'])
 def register():
     try:
-        print("Starting registration process...")
         data = request.get_json()
         
         if not data:
             return jsonify({'error': 'No data provided'}), 400
             
-        print(f"Received registration data: {data}")
-        
         email = data.get('email', '').strip()
         password = data.get('password', '')
         name = data.get('name', '').strip()
@@ -277,7 +361,7 @@ def register():
                 password=password,
                 display_name=name
             )
-            print(f"Created user in Firebase Auth with ID: {user.uid}")
+            logger.debug("Created user in Firebase Auth with ID: %s", user.uid)
 
             # Store user data in Firestore
             user_data = {
@@ -287,7 +371,7 @@ def register():
             }
             
             db.collection('users').document(user.uid).set(user_data)
-            print(f"Stored user data in Firestore for ID: {user.uid}")
+            logger.info("Registered user %s", user.uid)
 
             return jsonify({
                 'message': 'Registration successful',
@@ -301,25 +385,20 @@ def register():
         except auth.EmailAlreadyExistsError:
             return jsonify({'error': 'Email already in use'}), 400
         except Exception as e:
-            print(f"Registration error: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Registration error: %s", e)
             return jsonify({'error': 'Registration failed. Please try again.'}), 500
 
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Unexpected error: %s", e)
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
 @app.route('/api/auth/login', methods=['POST'])
 def login():
     try:
-        print("Starting login process...")
         data = request.get_json()
         if data is None:
             return jsonify({'error': 'No data provided'}), 400
             
-        print(f"Received login data: {data}")
-        
         # Check if required fields exist in data
         if 'email' not in data or 'password' not in data:
             return jsonify({'error': 'Email and password are required'}), 400
@@ -330,25 +409,21 @@ def login():
         if not email or not password:
             return jsonify({'error': 'Email and password are required'}), 400
 
-        print(f"Attempting login for email: {email}")
-
         try:
             # First verify the user exists
             user = auth.get_user_by_email(email)
-            print(f"Found user with ID: {user.uid}")
+            logger.debug("Found user with ID: %s", user.uid)
 
             # Get user data from Firestore
             user_doc = db.collection('users').document(user.uid).get()
             if not user_doc.exists:
-                print(f"User document not found for ID: {user.uid}")
+                logger.warning("User document not found for ID: %s", user.uid)
                 return jsonify({'error': 'User profile not found'}), 404
             
             user_data = user_doc.to_dict()
             if user_data is None:
                 return jsonify({'error': 'User data is corrupted'}), 500
 
-            print(f"Retrieved user data: {user_data}")
-
             response_data = {
                 'user': {
                     'id': user.uid,
@@ -356,107 +431,197 @@ def login():
                     'name': user_data.get('name', '')
                 }
             }
-            print("Login successful!")
+            logger.debug("Login successful for user %s", user.uid)
             return jsonify(response_data), 200
 
         except auth.UserNotFoundError:
-            print(f"No user found with email: {email}")
+            logger.debug("Login failed: unknown email")
             return jsonify({'error': 'Invalid email or password'}), 401
         except Exception as e:
-            print(f"Error during user lookup: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Error during user lookup: %s", e)
             return jsonify({'error': 'Login failed'}), 500
 
     except Exception as e:
-        print(f"Login error: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Login error: %s", e)
         return jsonify({'error': 'Login failed'}), 500
 
+def iter_documents(query):
+    """Yield each document of a query, with its id, as it arrives from Firestore"""
+    try:
+        for doc in query.stream():
+            document = doc.to_dict()
+            document['id'] = doc.id
+            yield document
+    except Exception as e:
+        logger.error("Error while streaming documents: %s", e)
+        raise
+
+def streaming_response(query, stream_format):
+    """Stream a query's documents as NDJSON or a chunked JSON array"""
+    body = encode_stream(stream_format, iter_documents(query), app.json.dumps)
+    return Response(stream_with_context(body), mimetype=STREAM_FORMATS[stream_format])
+
 # Expense routes
+def build_expense_query(args):
+    """Build the Firestore query for an expense listing from request args.
+
+    Supports limit/start_after cursor pagination ordered by date, a fields=
+    projection and start_date/end_date filters. Returns (query, limit, error).
+    """
+    user_id = args.get('user_id')
+    if not user_id:
+        return None, None, 'user_id is required'
+
+    query = db.collection('expenses').where('user_id', '==', user_id)
+
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    if start_date:
+        query = query.where('date', '>=', start_date)
+    if end_date:
+        query = query.where('date', '<=', end_date)
+
+    fields = args.get('fields')
+    if fields:
+        selected = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in selected if field not in EXPENSE_FIELDS]
+        if unknown:
+            return None, None, f"Unknown fields: {', '.join(unknown)}"
+        query = query.select(selected)
+
+    limit = None
+    if args.get('limit'):
+        try:
+            limit = int(args['limit'])
+        except ValueError:
+            return None, None, 'Invalid limit value'
+        if limit < 1 or limit > MAX_EXPENSE_PAGE_SIZE:
+            return None, None, f'Limit must be between 1 and {MAX_EXPENSE_PAGE_SIZE}'
+
+    start_after = args.get('start_after')
+    if limit is not None or start_after:
+        # Pages are ordered by date, with the document id breaking ties
+        query = query.order_by('date').order_by(FieldPath.document_id())
+        if start_after:
+            cursor = db.collection('expenses').document(start_after).get()
+            if not cursor.exists or (cursor.to_dict() or {}).get('user_id') != user_id:
+                return None, None, 'Invalid start_after cursor'
+            query = query.start_after(cursor)
+        if limit is not None:
+            query = query.limit(limit)
+
+    return query, limit, None
+
 @app.route('/api/expenses', methods=['GET'])
 def get_expenses():
     try:
-        print("Fetching expenses...")
-        user_id = request.args.get('user_id')
-        if not user_id:
-            print("Error: user_id is required")
-            return jsonify({'error': 'user_id is required'}), 400
-            
-        print(f"Fetching expenses for user: {user_id}")
-        # Query expenses for the user
-        expenses_ref = db.collection('expenses')
-        query = expenses_ref.where('user_id', '==', user_id)
-        
-        # Get all expenses
-        expenses = []
-        print("Starting to stream expenses...")
-        for doc in query.stream():
-            expense = doc.to_dict()
-            expense['id'] = doc.id
-            print(f"Found expense: {expense}")
-            expenses.append(expense)
-            
-        print(f"Found {len(expenses)} expenses")
-        return jsonify(expenses), 200
-        
+        stream_format = request.args.get('format')
+        if stream_format and stream_format not in STREAM_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(STREAM_FORMATS)}"}), 400
+
+        query, limit, error = build_expense_query(request.args)
+        if error:
+            logger.debug("Rejected expense listing: %s", error)
+            return jsonify({'error': error}), 400
+
+        # Exports stream documents straight through instead of buffering them
+        if stream_format:
+            return streaming_response(query, stream_format)
+
+        expenses = list(iter_documents(query))
+
+        response = jsonify(expenses)
+        # A full page means there may be more; hand back the cursor for the next one
+        if limit is not None and len(expenses) == limit:
+            response.headers['X-Next-Cursor'] = expenses[-1]['id']
+        return response, 200
+
     except Exception as e:
-        print(f"Error fetching expenses: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error fetching expenses: %s", e)
         return jsonify({'error': 'Failed to fetch expenses'}), 500
 
 @app.route('/api/expenses', methods=['POST'])
 def add_expense():
     try:
-        print("Adding new expense...")
         data = request.get_json()
         if data is None:
             return jsonify({'error': 'No data provided'}), 400
 
-        required_fields = ['user_id', 'amount', 'description', 'category', 'date']
-        
-        # Validate required fields are present in data
-        if not all(field in data for field in required_fields):
-            missing = [field for field in required_fields if field not in data]
-            error_msg = f"Missing required fields: {', '.join(missing)}"
-            print(f"Error: {error_msg}")
+        expense_data, error_msg = validate_expense(data)
+        if expense_data is None:
+            logger.debug("Rejected expense: %s", error_msg)
             return jsonify({'error': error_msg}), 400
-        
-        print(f"Creating expense for user: {data['user_id']}")
-        
-        # Validate amount is a valid number
-        try:
-            amount = float(data['amount'])
-            if amount <= 0:
-                return jsonify({'error': 'Amount must be greater than 0'}), 400
-        except (ValueError, TypeError):
-            return jsonify({'error': 'Invalid amount value'}), 400
-        
+
         # Create expense document
         expense_ref = db.collection('expenses').document()
-        expense_data = {
-            'user_id': data['user_id'],
-            'amount': amount,
-            'description': data['description'],
-            'category': data['category'],
-            'date': data['date'],
-            'currency': data.get('currency', 'EUR'),  # Default to EUR if not specified
-            'created_at': datetime.utcnow()
-        }
-        
-        # Save to Firestore
-        expense_ref.set(expense_data)
-        print(f"Expense created with ID: {expense_ref.id}")
+
+        # Save to Firestore together with the user's aggregate update
+        aggregates.ensure_user_aggregate(db, expense_data['user_id'])
+        batch = db.batch()
+        batch.set(expense_ref, expense_data)
+        aggregates.stage_aggregate_update(batch, db, expense_data['user_id'], [expense_data])
+        batch.commit()
+        logger.debug("Expense created with ID: %s", expense_ref.id)
         
         # Return the created expense with its ID
         response_data = expense_data.copy()
         response_data['id'] = expense_ref.id
+        # The expense is committed; failing to update a cache must not report it as failed
+        try:
+            invalidate_user_caches(expense_data['user_id'], [response_data])
+            expense_ai.learn_categories([response_data])
+        except Exception as e:
+            logger.exception("Error updating caches for new expense %s: %s", expense_ref.id, e)
+            invalidate_user_caches(expense_data['user_id'])
         return jsonify(response_data), 201
         
     except Exception as e:
-        print(f"Error adding expense: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error adding expense: %s", e)
         return jsonify({'error': 'Failed to add expense'}), 500
 
+@app.route('/api/expenses/import', methods=['POST'])
+def import_expense_file():
+    try:
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({'error': 'No file provided'}), 400
+
+        user_id = request.form.get('user_id', '').strip()
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+
+        file_format = (request.form.get('format') or os.path.splitext(upload.filename or '')[1].lstrip('.')).lower()
+        if file_format in ('ofx', 'qfx'):
+            parse_rows = iter_ofx_rows
+        elif file_format == 'csv':
+            parse_rows = iter_csv_rows
+        else:
+            return jsonify({'error': 'Unsupported file format, expected csv or ofx'}), 400
+
+        auto_categorize = request.form.get('auto_categorize', 'true').lower() in ('1', 'true', 'yes')
+
+        logger.info("Importing %s expenses for user: %s", file_format, user_id)
+
+        # Parse the upload as a stream and commit it chunk by chunk
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', errors='replace', newline='')
+        try:
+            report = import_expenses(
+                parse_rows(stream),
+                user_id,
+                write_chunk=lambda chunk: aggregates.add_expenses(db, user_id, chunk),
+                categorize=(lambda descriptions: categorize_for_user(user_id, descriptions)) if auto_categorize else None
+            )
+        finally:
+            # Chunks committed before a failure are already visible
+            invalidate_user_caches(user_id)
+
+        logger.info("Imported %d expenses for user %s, %d rows failed", report['imported'], user_id, report['failed'])
+        return jsonify(report), 200
+
+    except Exception as e:
+        logger.exception("Error importing expenses: %s", e)
+        return jsonify({'error': 'Failed to import expenses'}), 500
+
 # Category routes
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
@@ -518,67 +683,62 @@ def add_category():
 @app.route('/api/budgets', methods=['GET'])
 def get_budgets():
     try:
-        print("Fetching budgets...")
         user_id = request.args.get('user_id')
         if not user_id:
-            print("Error: user_id is required")
             return jsonify({'error': 'user_id is required'}), 400
             
-        print(f"Fetching budgets for user: {user_id}")
+        stream_format = request.args.get('format')
+        if stream_format and stream_format not in STREAM_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(STREAM_FORMATS)}"}), 400
+
         # Query budgets for the user
         budgets_ref = db.collection('budgets')
         query = budgets_ref.where('user_id', '==', user_id)
+
+        if stream_format:
+            return streaming_response(query, stream_format)
         
         # Get all budgets
-        budgets = []
-        print("Starting to stream budgets...")
-        for doc in query.stream():
-            budget = doc.to_dict()
-            budget['id'] = doc.id
-            print(f"Found budget: {budget}")
-            budgets.append(budget)
-            
-        print(f"Found {len(budgets)} budgets")
+        budgets = list(iter_documents(query))
+        logger.debug("Found %d budgets for user %s", len(budgets), user_id)
         return jsonify(budgets), 200
         
     except Exception as e:
-        print(f"Error fetching budgets: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error fetching budgets: %s", e)
         return jsonify({'error': 'Failed to fetch budgets'}), 500
 
 @app.route('/api/test/add-sample-data', methods=['POST'])
 def add_sample_data():
     try:
-        print("Starting add sample data process...")
         data = request.get_json()
         if data is None:
             return jsonify({'error': 'No data provided'}), 400
             
         if 'user_id' not in data:
-            print("Error: user_id is required")
             return jsonify({'error': 'user_id is required'}), 400
             
         user_id = str(data['user_id'])
         if not user_id:
-            print("Error: user_id cannot be empty")
             return jsonify({'error': 'user_id cannot be empty'}), 400
 
-        print(f"Adding sample data for user: {user_id}")
+        logger.info("Adding sample data for user: %s", user_id)
 
         # Create sample data
-        num_expenses = create_sample_expenses(user_id)
-        num_budgets = create_sample_budgets(user_id)
+        expense_stats = create_sample_expenses(user_id)
+        budget_stats = create_sample_budgets(user_id)
 
-        print("Sample data added successfully!")
         return jsonify({
             'message': 'Sample data added successfully',
-            'expenses_created': num_expenses,
-            'budgets_created': num_budgets
+            'expenses_created': expense_stats['written'],
+            'budgets_created': budget_stats['written'],
+            'write_stats': {
+                'expenses': expense_stats,
+                'budgets': budget_stats
+            }
         }), 201
 
     except Exception as e:
-        print(f"Error creating sample data: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error creating sample data: %s", e)
         return jsonify({'error': 'Failed to create sample data'}), 500
 
 # AI routes
@@ -596,17 +756,53 @@ def categorize_expense():
         if not description:
             return jsonify({'error': 'Description cannot be empty'}), 400
             
-        # Get AI prediction
-        prediction = expense_ai.predict_category(description)
+        # The user's own label for this description wins over the model
+        user_id = str(data.get('user_id') or '')
+        prediction = categorize_for_user(user_id, [description])[0]
         if prediction is None:
             return jsonify({'error': 'Could not predict category'}), 404
             
         return jsonify(prediction), 200
         
     except Exception as e:
-        print(f"Error categorizing expense: {str(e)}")
+        logger.error("Error categorizing expense: %s", e)
         return jsonify({'error': 'Failed to categorize expense'}), 500
 
+@app.route('/api/ai/categorize/batch', methods=['POST'])
+def categorize_expenses_batch():
+    try:
+        data = request.get_json()
+        if data is None:
+            return jsonify({'error': 'No data provided'}), 400
+
+        descriptions = data.get('descriptions')
+        if not isinstance(descriptions, list) or not descriptions:
+            return jsonify({'error': 'Descriptions must be a non-empty list'}), 400
+
+        if len(descriptions) > MAX_CATEGORIZE_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_CATEGORIZE_BATCH_SIZE} descriptions per batch'}), 400
+
+        descriptions = [str(description).strip() for description in descriptions]
+        empty = [index for index, description in enumerate(descriptions) if not description]
+        if empty:
+            return jsonify({'error': 'Descriptions cannot be empty', 'indices': empty}), 400
+
+        # Classify the whole batch with one vectorizer pass
+        start = time.perf_counter()
+        predictions = categorize_for_user(str(data.get('user_id') or ''), descriptions)
+        elapsed = time.perf_counter() - start
+
+        return jsonify({
+            'predictions': predictions,
+            'count': len(predictions),
+            'elapsed_ms': elapsed * 1000,
+            'items_per_second': len(predictions) / elapsed if elapsed > 0 else None
+        }), 200
+
+    except Exception as e:
+        logger.error("Error categorizing expense batch: %s", e)
+        return jsonify({'error': 'Failed to categorize expenses'}), 500
+
 @app.route('/api/ai/predict', methods=['POST'])
 def predict_expenses():
     try:
@@ -621,25 +817,41 @@ def predict_expenses():
         if not user_id:
             return jsonify({'error': 'User ID cannot be empty'}), 400
             
+        try:
+            days = int(data.get('days', 30))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid days value'}), 400
+        if days < 1 or days > 365:
+            return jsonify({'error': 'Days must be between 1 and 365'}), 400
+
         # Get user's past expenses
-        expenses_ref = db.collection('expenses').where('user_id', '==', user_id)
-        expenses = []
-        for doc in expenses_ref.stream():
-            expense = doc.to_dict()
-            expenses.append(expense)
-            
-        # Convert expenses to list of dictionaries, ensuring no None values
-        expenses_list = [expense.to_dict() for expense in expenses if expense and isinstance(expense.to_dict(), dict)]
-        
+        try:
+            frame = get_expense_frame(user_id)
+        except Exception as e:
+            # predict_future_expenses falls back to the simple average on data it cannot frame
+            logger.exception("Error building expense frame for user %s: %s", user_id, e)
+            query = db.collection('expenses').where('user_id', '==', user_id)
+            return jsonify(expense_ai.predict_future_expenses(list(iter_documents(query)), days)), 200
+
+        # Reuse the last forecast if the expense set has not changed
+        fingerprint = frame.fingerprint()
+        predictions = forecast_cache.get(user_id, fingerprint, days)
+        if predictions is not None:
+            return jsonify(predictions), 200
+
         # Get predictions
-        predictions = expense_ai.predict_future_expenses(expenses_list)
+        predictions = expense_ai.predict_future_expenses(frame, days)
+        expense_frames.refresh_size(user_id)
         if predictions is None:
             return jsonify({'error': 'Could not predict future expenses'}), 404
-            
+
+        if 'error' not in predictions:
+            forecast_cache.put(user_id, fingerprint, days, predictions)
+
         return jsonify(predictions), 200
         
     except Exception as e:
-        print(f"Error predicting expenses: {str(e)}")
+        logger.error("Error predicting expenses: %s", e)
         return jsonify({'error': 'Failed to predict expenses'}), 500
 
 @app.route('/api/ai/chat', methods=['POST'])
@@ -655,33 +867,32 @@ def chat():
         if not query or not user_id:
             return jsonify({'error': 'Missing required fields'}), 400
             
-        # Get user's expenses from Firestore
-        expenses_ref = db.collection('expenses')
-        expenses = expenses_ref.where('user_id', '==', user_id).get()
+        # Get user's expenses, parsed once for every analysis below
+        frame = get_expense_frame(user_id)
         
-        if not expenses:
+        if not frame:
             return jsonify({'error': 'No expenses found'}), 404
-            
-        # Convert expenses to list of dictionaries, ensuring no None values
-        expenses_list = [expense.to_dict() for expense in expenses if expense and isinstance(expense.to_dict(), dict)]
-        
-        # Process query with AI
-        response = expense_ai.process_chat_query(query, expenses_list)
         
-        # Get AI insights
-        anomalies = expense_ai.detect_anomalies(expenses_list)
-        patterns = expense_ai.identify_patterns(expenses_list)
+        # One pipeline computes the shared series and statistics once for
+        # the answer and the insights alike
+        pipeline = AnalyticsPipeline(expense_ai, frame)
+        response = pipeline.chat(query)
         
         # Add insights to response
         response['insights'] = {
-            'anomalies': anomalies,
-            'patterns': patterns
+            'anomalies': pipeline.unusual_spending,
+            'patterns': pipeline.patterns
         }
+        expense_frames.refresh_size(user_id)
+        
+        logger.debug("Chat pipeline timings for user %s: %s", user_id, pipeline.timings)
+        if app.debug:
+            response['timings'] = pipeline.timings
         
         return jsonify(response)
         
     except Exception as e:
-        print(f"Error in chat endpoint: {str(e)}")
+        logger.error("Error in chat endpoint: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/ai/insights', methods=['GET'])
@@ -691,47 +902,33 @@ def get_ai_insights():
         if not user_id:
             return jsonify({'error': 'User ID is required'}), 400
 
-        # Get user's expenses
-        expenses_ref = db.collection('expenses')
-        expenses = expenses_ref.where('user_id', '==', user_id).stream()
-        
-        expenses_list = []
-        for expense in expenses:
-            expense_data = expense.to_dict()
-            expenses_list.append(expense_data)
-
-        if not expenses_list:
+        # Read the maintained aggregate instead of scanning every expense
+        aggregate = aggregates.get_user_aggregate(db, user_id)
+        insights = aggregates.insights_from_aggregate(aggregate)
+        if insights is None:
             return jsonify({'error': 'No expenses found'}), 404
 
-        # Calculate insights
-        # Group expenses by category
-        category_totals = {}
-        for expense in expenses_list:
-            category = expense.get('category', 'Uncategorized')
-            amount = float(expense.get('amount', 0))
-            category_totals[category] = category_totals.get(category, 0) + amount
-
-        # Find top category
-        top_category = max(category_totals.items(), key=lambda x: x[1])
-
-        # Calculate average daily spend
-        total_amount = sum(float(exp.get('amount', 0)) for exp in expenses_list)
-        dates = [datetime.fromisoformat(exp.get('date', '')) for exp in expenses_list]
-        if dates:
-            date_range = (max(dates) - min(dates)).days or 1
-            average_daily = total_amount / date_range
-        else:
-            average_daily = 0
+        return jsonify(insights)
+
+    except Exception as e:
+        logger.error("Error in get_ai_insights: %s", e)
+        return jsonify({'error': 'Failed to get AI insights'}), 500
 
+@app.route('/api/ai/metrics', methods=['GET'])
+def get_ai_metrics():
+    try:
+        # Only report on the inference pool; reading the property would start it
+        pool = expense_ai._inference_pool
         return jsonify({
-            'topCategory': top_category[0],
-            'topCategoryAmount': top_category[1],
-            'averageDailySpend': average_daily
+            'inference': pool.stats() if pool is not None else {'workers': 0},
+            'forecast_cache': forecast_cache.stats(),
+            'expense_frames': expense_frames.stats(),
+            'category_memo': category_memo.stats()
         })
 
     except Exception as e:
-        print(f"Error in get_ai_insights: {str(e)}")
-        return jsonify({'error': 'Failed to get AI insights'}), 500
+        logger.error("Error in get_ai_metrics: %s", e)
+        return jsonify({'error': 'Failed to get AI metrics'}), 500
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000) 
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""Signed access tokens for the FastAPI routers.
+
+/api/auth/login checks the password with bcrypt once and hands back a
+short-lived JWT signed with settings.SECRET_KEY. Every later request only
+has to check that signature, and even that is skipped for tokens seen
+recently: decoded claims are kept in a small LRU keyed on the raw token,
+and a cached entry is honoured only until the token's own expiry.
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional
+
+import jwt
+
+from config import settings
+
+TOKEN_CACHE_SIZE = 10000
+
+class TokenCache:
+    """Thread-safe LRU of decoded token claims"""
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is None:
+                self.misses += 1
+                return None
+            if claims['exp'] <= now:
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+token_cache = TokenCache()
+
+def create_access_token(user_id: int, email: str, expires_minutes: Optional[int] = None) -> str:
+    """Issue a signed token for a user who has just proven their password"""
+    now = int(time.time())
+    if expires_minutes is None:
+        expires_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    claims = {
+        'sub': str(user_id),
+        'email': email,
+        'iat': now,
+        'exp': now + expires_minutes * 60
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+def decode_access_token(token: str, cache: Optional[TokenCache] = token_cache) -> Dict[str, Any]:
+    """Return the claims of a valid token, raising jwt.InvalidTokenError otherwise"""
+    if cache is not None:
+        claims = cache.get(token, time.time())
+        if claims is not None:
+            return claims
+
+    claims = jwt.decode(
+        token,
+        settings.SECRET_KEY,
+        algorithms=[settings.ALGORITHM],
+        options={'require': ['exp', 'sub']}
+    )
+    if cache is not None:
+        cache.put(token, claims)
+    return claims
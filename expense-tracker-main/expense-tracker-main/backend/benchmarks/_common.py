@@ -0,0 +1,24 @@
+"""Latency helpers shared by the benchmark scripts.
+
+Scripts run as `python benchmarks/bench_x.py`, which puts this directory on
+sys.path, so they import it as `from _common import ...`.
+"""
+from typing import Dict, List, Optional
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def latency_summary(latencies: List[float], elapsed: Optional[float] = None) -> Dict[str, float]:
+    """p50/p99 latency in seconds, plus throughput when the wall time is given"""
+    summary = {'p50': percentile(latencies, 0.5), 'p99': percentile(latencies, 0.99)}
+    if elapsed is not None:
+        summary['rps'] = len(latencies) / elapsed
+    return summary
+
+def print_latency_header(rps: bool = True) -> None:
+    print(f"{'mode':<8}" + (f"{'req/s':>10}" if rps else '') + f"{'p50 ms':>10}{'p99 ms':>10}")
+
+def print_latency_row(name: str, summary: Dict[str, float]) -> None:
+    rps = f"{summary['rps']:>10.0f}" if 'rps' in summary else ''
+    print(f"{name:<8}{rps}{summary['p50'] * 1000:>10.1f}{summary['p99'] * 1000:>10.1f}")
@@ -0,0 +1,58 @@
+"""Authentication throughput benchmark for the FastAPI routers.
+
+Compares the work get_current_user does per request under each scheme:
+
+    bcrypt          verify the submitted password against its bcrypt hash
+                    (what every expense/category call did before)
+    jwt             verify the bearer token signature and expiry
+    jwt-cached      look the token up in the LRU of decoded claims
+
+The database lookup is the same in every mode and is left out.
+
+Usage:
+    python benchmarks/bench_auth.py [--requests N] [--users N]
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passlib.context import CryptContext
+
+from auth_tokens import TokenCache, create_access_token, decode_access_token
+
+def throughput(check: Callable[[int], object], requests: int, users: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        check(i % users)
+    return requests / (time.perf_counter() - start)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20000, help='authenticated requests per token mode')
+    parser.add_argument('--bcrypt-requests', type=int, default=20, help='requests for the (slow) bcrypt mode')
+    parser.add_argument('--users', type=int, default=100, help='distinct users sending requests')
+    args = parser.parse_args()
+
+    pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+    password_hash = pwd_context.hash('correct horse battery staple')
+    tokens = [create_access_token(user_id, f'user{user_id}@example.com') for user_id in range(args.users)]
+    cache = TokenCache()
+
+    modes = [
+        ('bcrypt', lambda user: pwd_context.verify('correct horse battery staple', password_hash), args.bcrypt_requests),
+        ('jwt', lambda user: decode_access_token(tokens[user], cache=None), args.requests),
+        ('jwt-cached', lambda user: decode_access_token(tokens[user], cache), args.requests),
+    ]
+
+    print(f"{'mode':<12}{'requests/s':>14}{'us/request':>14}")
+    for name, check, requests in modes:
+        rate = throughput(check, requests, args.users)
+        print(f"{name:<12}{rate:>14.0f}{1e6 / rate:>14.1f}")
+    print(f"token cache: {cache.stats()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Load benchmark: synchronous Session vs AsyncSession for expense listings.
+
+Both handlers page through the same SQLite file with the same query and the
+same bearer-token auth; the only difference is the database path:
+
+    sync    the previous handler style, a blocking Session used inside an
+            async def (every query stalls the event loop)
+    async   routers/expenses.py on the AsyncEngine from database.py
+
+Requests go through httpx's ASGI transport with a fixed number in flight, as
+a single uvicorn worker would see them.
+
+Usage:
+    python benchmarks/bench_db_async.py [--requests N] [--concurrency N] [--rows N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI, Query
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from auth_tokens import create_access_token
+from database import Base, get_async_db, make_async_engine
+from models import Category, Expense, User
+from routers import expenses
+from routers.auth import get_current_user
+from _common import latency_summary, print_latency_header, print_latency_row
+
+def seed(session_factory, rows: int) -> int:
+    with session_factory() as db:
+        user = User(email='bench@example.com', hashed_password='-', full_name='Bench')
+        db.add(user)
+        db.flush()
+        category = Category(name='Food', user_id=user.id)
+        db.add(category)
+        db.flush()
+        start = datetime(2023, 1, 1)
+        db.add_all([
+            Expense(amount=i % 97 + 1, description=f'Expense {i}', date=start + timedelta(hours=i),
+                    category_id=category.id, user_id=user.id)
+            for i in range(rows)
+        ])
+        db.commit()
+        return user.id
+
+def build_app(session_factory, async_engine) -> FastAPI:
+    async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    def get_sync_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(expenses.router, prefix='/async/expenses')
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    @app.get('/sync/expenses/')
+    async def sync_expenses(
+        limit: int = Query(100),
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_sync_db)
+    ):
+        return db.query(Expense).filter(Expense.user_id == current_user.id).order_by(
+            Expense.date, Expense.id
+        ).limit(limit).all()
+
+    return app
+
+async def run_load(client: httpx.AsyncClient, path: str, headers: dict, requests: int,
+                   concurrency: int, limit: int) -> dict:
+    latencies: List[float] = []
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path, params={'limit': limit}, headers=headers)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return latency_summary(latencies, elapsed)
+
+async def main_async(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(db_url, connect_args={'check_same_thread': False})
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        user_id = seed(session_factory, args.rows)
+        async_engine = make_async_engine(db_url)
+
+        app = build_app(session_factory, async_engine)
+        headers = {'Authorization': f"Bearer {create_access_token(user_id, 'bench@example.com')}"}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+            print(f"{args.requests} requests, {args.concurrency} in flight, {args.limit} rows per page, {args.rows} rows seeded")
+            print_latency_header()
+            for name in ('sync', 'async'):
+                path = f'/{name}/expenses/'
+                await run_load(client, path, headers, args.concurrency, args.concurrency, args.limit)  # warm up
+                result = await run_load(client, path, headers, args.requests, args.concurrency, args.limit)
+                print_latency_row(name, result)
+
+        await async_engine.dispose()
+        engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--rows', type=int, default=5000, help='expenses seeded for the user')
+    parser.add_argument('--limit', type=int, default=100, help='page size requested')
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
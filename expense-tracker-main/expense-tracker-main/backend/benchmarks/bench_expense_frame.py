@@ -0,0 +1,84 @@
+"""Analytics input benchmark: lists of dicts vs a cached ExpenseFrame.
+
+    list     what /api/ai/chat did before: every ExpenseAI call gets the raw
+             list and runs pd.DataFrame + pd.to_datetime over it
+    frame    the frame is built once (as FrameCache would hold it) and
+             passed to every call; appends fold into it in place
+
+Each "request" is process_chat_query followed by analyze_spending_patterns,
+the two DataFrame-building calls the chat route makes. The append row
+measures adding one expense to a cached frame against rebuilding it.
+
+Usage:
+    python benchmarks/bench_expense_frame.py [--rows N] [--requests N]
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+from datetime import date, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_module import ExpenseAI
+from expense_frame import ExpenseFrame
+from _common import latency_summary, print_latency_header, print_latency_row
+
+CATEGORIES = ['Food', 'Transportation', 'Utilities', 'Entertainment', 'Shopping', 'Health']
+
+def make_expenses(rows: int) -> List[dict]:
+    start = date(2022, 1, 1)
+    return [
+        {'id': f'e{i}', 'amount': float(i % 97 + 1), 'category': CATEGORIES[i % len(CATEGORIES)],
+         'date': (start + timedelta(days=i % 730)).isoformat(), 'description': f'Expense {i}'}
+        for i in range(rows)
+    ]
+
+def run(label: str, request, requests: int) -> None:
+    latencies: List[float] = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        request()
+        latencies.append(time.perf_counter() - start)
+    print_latency_row(label, latency_summary(latencies))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    ai = ExpenseAI()
+    expenses = make_expenses(args.rows)
+    frame = ExpenseFrame.from_expenses(expenses)
+    query = 'How much did I spend?'
+
+    def with_list() -> None:
+        ai.process_chat_query(query, expenses)
+        ai.analyze_spending_patterns(expenses)
+
+    def with_frame() -> None:
+        ai.process_chat_query(query, frame)
+        ai.analyze_spending_patterns(frame)
+
+    print(f"{args.rows} expenses, {args.requests} requests")
+    print_latency_header(rps=False)
+    run('list', with_list, args.requests)
+    run('frame', with_frame, args.requests)
+
+    extra = make_expenses(args.requests)
+    start = time.perf_counter()
+    for expense in extra:
+        frame.append([expense])
+    appended = (time.perf_counter() - start) / args.requests
+    start = time.perf_counter()
+    ExpenseFrame.from_expenses(expenses)
+    rebuilt = time.perf_counter() - start
+    print(f"append one expense {appended * 1000:.2f} ms, rebuild {rebuilt * 1000:.1f} ms, "
+          f"frame {frame.nbytes / 1024:.0f} KiB")
+
+if __name__ == '__main__':
+    main()
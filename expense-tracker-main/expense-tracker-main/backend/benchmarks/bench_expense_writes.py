@@ -0,0 +1,171 @@
+"""Write-throughput benchmark for expense create and update.
+
+    previous    the handlers before this change: user lookup, category
+                ownership query, (expense fetch,) commit and refresh
+    single      routers/expenses.py: one INSERT ... SELECT / UPDATE ... WHERE
+                EXISTS with RETURNING, user id taken from the token
+
+Both run against the same SQLite file through the AsyncEngine, with a fixed
+number of requests in flight. Statements per request are counted with an
+engine event so the saved round trips are visible next to the timings.
+With more than one request in flight SQLite serializes writers behind its
+busy-wait backoff, which dominates tail latency; --concurrency 1 isolates
+the round-trip cost.
+
+Usage:
+    python benchmarks/bench_expense_writes.py [--requests N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI, Form, HTTPException
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from auth_tokens import create_access_token
+from database import Base, get_async_db, make_async_engine
+from models import Category, Expense, User
+from routers import expenses
+from routers.auth import get_current_user
+from _common import latency_summary
+
+def build_app(async_engine) -> FastAPI:
+    async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(expenses.router, prefix='/single/expenses')
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    async def owned_category(db: AsyncSession, category_id: int, user: User) -> None:
+        category = (await db.execute(select(Category).where(
+            Category.id == category_id, Category.user_id == user.id
+        ))).scalars().first()
+        if not category:
+            raise HTTPException(status_code=404, detail='Category not found')
+
+    @app.post('/previous/expenses/')
+    async def create_expense(
+        amount: float = Form(...), description: str = Form(...), date: datetime = Form(...),
+        category_id: int = Form(...), current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+    ):
+        await owned_category(db, category_id, current_user)
+        expense = Expense(amount=amount, description=description, date=date,
+                          category_id=category_id, user_id=current_user.id)
+        db.add(expense)
+        await db.commit()
+        await db.refresh(expense)
+        return expense
+
+    @app.put('/previous/expenses/{expense_id}')
+    async def update_expense(
+        expense_id: int, amount: float = Form(...), description: str = Form(...), date: datetime = Form(...),
+        category_id: int = Form(...), current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+    ):
+        expense = (await db.execute(select(Expense).where(
+            Expense.id == expense_id, Expense.user_id == current_user.id
+        ))).scalars().first()
+        if not expense:
+            raise HTTPException(status_code=404, detail='Expense not found')
+        await owned_category(db, category_id, current_user)
+        expense.amount = amount
+        expense.description = description
+        expense.date = date
+        expense.category_id = category_id
+        await db.commit()
+        await db.refresh(expense)
+        return expense
+
+    return app
+
+async def run_load(send, requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for i in remaining:
+            start = time.perf_counter()
+            response = await send(i)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return latency_summary(latencies, elapsed)
+
+async def main_async(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(db_url)
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            user = User(email='bench@example.com', hashed_password='-', full_name='Bench')
+            db.add(user)
+            db.flush()
+            category = Category(name='Food', user_id=user.id)
+            db.add(category)
+            db.commit()
+            user_id, category_id = user.id, category.id
+        engine.dispose()
+
+        async_engine = make_async_engine(db_url)
+        statements = [0]
+
+        def count(*_):
+            statements[0] += 1
+
+        event.listen(async_engine.sync_engine, 'before_cursor_execute', count)
+
+        headers = {'Authorization': f"Bearer {create_access_token(user_id, 'bench@example.com')}"}
+        transport = httpx.ASGITransport(app=build_app(async_engine))
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+            def form(i: int) -> dict:
+                return {'amount': i % 90 + 1, 'description': f'Expense {i}',
+                        'date': f'2024-01-{i % 28 + 1:02d}T12:00:00', 'category_id': category_id}
+
+            print(f"{args.requests} requests per row, {args.concurrency} in flight")
+            print(f"{'handler':<10}{'op':<8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'stmts/req':>11}")
+            for name in ('previous', 'single'):
+                created: List[int] = []
+
+                async def create(i: int) -> httpx.Response:
+                    response = await client.post(f'/{name}/expenses/', data=form(i), headers=headers)
+                    created.append(response.json()['id'])
+                    return response
+
+                async def modify(i: int) -> httpx.Response:
+                    return await client.put(f'/{name}/expenses/{created[i % len(created)]}',
+                                            data=form(i + 1), headers=headers)
+
+                for op, send in (('create', create), ('update', modify)):
+                    statements[0] = 0
+                    result = await run_load(send, args.requests, args.concurrency)
+                    print(f"{name:<10}{op:<8}{result['rps']:>9.0f}{result['p50'] * 1000:>9.1f}"
+                          f"{result['p99'] * 1000:>9.1f}{statements[0] / args.requests:>11.1f}")
+
+        await async_engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=10)
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
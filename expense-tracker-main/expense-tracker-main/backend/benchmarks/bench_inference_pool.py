@@ -0,0 +1,83 @@
+"""Concurrent categorization benchmark: inline inference vs the inference pool.
+
+    inline   ExpenseAI.predict_categories on each request thread, the TF-IDF
+             transform holding the GIL
+    pool     the same calls served by inference_pool.CategoryInferencePool,
+             which coalesces requests arriving within --max-wait-ms into one
+             predict_proba call in a worker process
+
+Each client thread sends one description per request, as /api/ai/categorize
+does. Keyword pre-classification is disabled so every request reaches the
+model. The pool row is followed by its batch-size histogram.
+
+Usage:
+    python benchmarks/bench_inference_pool.py [--requests N] [--concurrency N] [--workers N] [--max-wait-ms MS]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_store
+from ai_module import TRAINING_DATA, ExpenseAI, category_model_metadata
+from inference_pool import CategoryInferencePool
+from keyword_rules import KeywordMatcher
+from _common import latency_summary, print_latency_header, print_latency_row
+
+def run_load(ai: ExpenseAI, requests: int, concurrency: int) -> dict:
+    descriptions = [f"{TRAINING_DATA[i % len(TRAINING_DATA)][0]} #{i % 50}" for i in range(requests)]
+
+    def send(description: str) -> float:
+        start = time.perf_counter()
+        ai.predict_categories([description])
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        latencies = list(clients.map(send, descriptions))
+    elapsed = time.perf_counter() - start
+    return latency_summary(latencies, elapsed)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    store_dir = tempfile.mkdtemp()
+    try:
+        model = ExpenseAI._train_category_model()
+        model_store.save_model(model, model_store.CATEGORY_MODEL_NAME, category_model_metadata(), store_dir)
+
+        inline = ExpenseAI(forecast_workers=0, inference_workers=0, keyword_matcher=KeywordMatcher([]))
+        inline.category_model = model
+
+        pooled = ExpenseAI(forecast_workers=0, inference_workers=args.workers, keyword_matcher=KeywordMatcher([]))
+        pool = CategoryInferencePool(args.workers, category_model_metadata(),
+                                     max_wait_ms=args.max_wait_ms, store_dir=store_dir)
+        pool.start()
+        pooled._inference_pool = pool
+
+        print(f"{args.requests} requests, {args.concurrency} client threads, {args.workers} workers, "
+              f"{args.max_wait_ms} ms coalescing window")
+        print_latency_header()
+        for name, ai in (('inline', inline), ('pool', pooled)):
+            result = run_load(ai, args.requests, args.concurrency)
+            print_latency_row(name, result)
+
+        stats = pool.stats()
+        print(f"batches {stats['batches']}, coalesced requests {stats['coalesced_requests']}")
+        print(f"batch size histogram (cumulative): {stats['batch_size']['buckets']}")
+        pool.close()
+    finally:
+        shutil.rmtree(store_dir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Logging overhead benchmark for a per-document request handler.
+
+The handler mirrors GET /api/expenses: it walks N documents and emits one
+trace line per document, like the print() calls it used to make. app.py
+connects to Firebase at import, so the loop is reproduced here rather than
+driven through the Flask test client. Modes:
+
+    print           the old unconditional print() per document
+    debug-off       logger.debug() with the level at INFO (production)
+    debug-queued    DEBUG on, records handed to the queue listener
+    debug-sync      DEBUG on, a plain StreamHandler writing inline
+    debug-sampled   DEBUG on through the queue, LOG_DEBUG_SAMPLE_RATE=0.01
+
+Output goes to os.devnull so that terminal speed does not skew the numbers.
+
+Usage:
+    python benchmarks/bench_logging.py [--docs N] [--requests N]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logging_config import LOG_FORMAT, configure_logging, shutdown_logging
+from _common import percentile
+
+logger = logging.getLogger('bench.expenses')
+
+def make_documents(count: int) -> List[dict]:
+    return [
+        {'id': f'doc{i}', 'amount': 10.0 + i % 50, 'description': f'Expense {i}', 'category': 'Food'}
+        for i in range(count)
+    ]
+
+def handler_print(documents: List[dict], sink) -> int:
+    expenses = []
+    for doc in documents:
+        print(f"Found expense: {doc}", file=sink)
+        expenses.append(doc)
+    return len(expenses)
+
+def handler_logging(documents: List[dict], sink) -> int:
+    expenses = []
+    for doc in documents:
+        logger.debug("Found expense %s", doc['id'])
+        expenses.append(doc)
+    return len(expenses)
+
+def use_sync_handler(sink) -> None:
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG)
+
+def measure(handler: Callable, documents: List[dict], sink, requests: int) -> List[float]:
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        handler(documents, sink)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=1000, help='documents per request')
+    parser.add_argument('--requests', type=int, default=200, help='simulated requests per mode')
+    args = parser.parse_args()
+
+    documents = make_documents(args.docs)
+    with open(os.devnull, 'w') as sink:
+        modes = [
+            ('print', handler_print, lambda: configure_logging('INFO', stream=sink)),
+            ('debug-off', handler_logging, lambda: configure_logging('INFO', stream=sink)),
+            ('debug-queued', handler_logging, lambda: configure_logging('DEBUG', stream=sink)),
+            ('debug-sync', handler_logging, lambda: use_sync_handler(sink)),
+            ('debug-sampled', handler_logging, lambda: configure_logging('DEBUG', 0.01, stream=sink)),
+        ]
+
+        print(f"{'mode':<14}{'median ms':>12}{'p99 ms':>12}")
+        for name, handler, setup in modes:
+            setup()
+            timings = measure(handler, documents, sink, args.requests)
+            shutdown_logging()
+            print(f"{name:<14}{statistics.median(timings) * 1000:>12.3f}{percentile(timings, 0.99) * 1000:>12.3f}")
+
+if __name__ == '__main__':
+    main()
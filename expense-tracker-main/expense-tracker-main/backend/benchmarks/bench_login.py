@@ -0,0 +1,138 @@
+"""Concurrency benchmark for /api/auth/login.
+
+Fires N simultaneous logins at an in-process app (httpx ASGI transport, so
+everything shares one event loop exactly like a single uvicorn worker) while
+a probe keeps pinging a trivial endpoint. Two login handlers are compared:
+
+    inline      the previous handler: bcrypt and the SQLAlchemy query run
+                directly inside the async def, blocking the loop (it gives
+                its connection back early too, otherwise 100 logins
+                deadlock on the connection pool before bcrypt even matters)
+    offloaded   routers.auth.login: queries on the threadpool, bcrypt on
+                the bounded password pool
+
+The login p99 is bounded below by the CPU bcrypt needs either way; the
+probe p99 shows how long every other request waits behind logins.
+
+Usage:
+    python benchmarks/bench_login.py [--logins N] [--rounds R]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI, Form, HTTPException
+from passlib.hash import bcrypt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from database import Base, get_db
+from models import User
+from routers import auth
+from _common import percentile
+
+PASSWORD = 'correct horse battery staple'
+
+def build_app(db_url: str) -> Tuple[FastAPI, sessionmaker]:
+    engine = create_engine(db_url, connect_args={'check_same_thread': False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(auth.router, prefix='/api/auth')
+    app.dependency_overrides[get_db] = override_get_db
+
+    @app.post('/inline/login')
+    async def inline_login(email: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
+        user = db.query(User).filter(User.email == email).first()
+        db.close()
+        if not user or not auth.verify_password(password, user.hashed_password):
+            raise HTTPException(status_code=401, detail='Incorrect email or password')
+        return {'user': {'id': user.id}}
+
+    @app.get('/ping')
+    async def ping():
+        return {'ok': True}
+
+    return app, session_factory
+
+async def run_mode(client: httpx.AsyncClient, path: str, logins: int, users: int) -> dict:
+    login_latencies: List[float] = []
+    probe_latencies: List[float] = []
+    done = asyncio.Event()
+
+    async def login(i: int) -> None:
+        start = time.perf_counter()
+        response = await client.post(path, data={'email': f'user{i % users}@example.com', 'password': PASSWORD})
+        response.raise_for_status()
+        login_latencies.append(time.perf_counter() - start)
+
+    async def probe() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get('/ping')
+            probe_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.005)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(login(i) for i in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    return {
+        'elapsed': elapsed,
+        'login_p50': percentile(login_latencies, 0.5),
+        'login_p99': percentile(login_latencies, 0.99),
+        'probe_p99': percentile(probe_latencies, 0.99),
+        'probe_max': max(probe_latencies),
+        'probes': len(probe_latencies)
+    }
+
+async def main_async(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        app, session_factory = build_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        hasher = bcrypt.using(rounds=args.rounds)
+        with session_factory() as db:
+            password_hash = hasher.hash(PASSWORD)
+            db.add_all([
+                User(email=f'user{i}@example.com', hashed_password=password_hash, full_name=f'User {i}')
+                for i in range(args.users)
+            ])
+            db.commit()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+            print(f"{args.logins} concurrent logins, bcrypt rounds={args.rounds}, "
+                  f"password pool={auth.PASSWORD_HASH_WORKERS} threads, cpus={os.cpu_count()}")
+            print(f"{'mode':<11}{'total s':>9}{'login p50':>11}{'login p99':>11}{'probe p99':>11}{'probe max':>11}{'probes':>8}")
+            for name, path in (('inline', '/inline/login'), ('offloaded', '/api/auth/login')):
+                result = await run_mode(client, path, args.logins, args.users)
+                print(f"{name:<11}{result['elapsed']:>9.2f}{result['login_p50'] * 1000:>9.0f}ms"
+                      f"{result['login_p99'] * 1000:>9.0f}ms{result['probe_p99'] * 1000:>9.0f}ms"
+                      f"{result['probe_max'] * 1000:>9.0f}ms{result['probes']:>8}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=100, help='simultaneous login requests')
+    parser.add_argument('--users', type=int, default=10, help='distinct accounts logging in')
+    parser.add_argument('--rounds', type=int, default=10, help='bcrypt cost factor of the seeded hashes')
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
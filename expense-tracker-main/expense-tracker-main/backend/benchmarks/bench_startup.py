@@ -0,0 +1,79 @@
+"""Startup-time benchmark: import cost per module in a fresh interpreter.
+
+Each module is imported in its own subprocess so that nothing is already
+cached in sys.modules, and the best of several runs is reported. The
+ai_module rows show what a worker pays before serving its first request
+(import) and what the first analytics request pays on top (first use).
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'numpy',
+    'joblib',
+    'pandas',
+    'scipy.stats',
+    'sklearn.pipeline',
+    'sklearn.feature_extraction.text',
+    'sklearn.naive_bayes',
+    'statsmodels.tsa.seasonal',
+    'statsmodels.tsa.arima.model',
+]
+
+TIMED_SNIPPET = """
+import time
+start = time.perf_counter()
+{setup}
+setup_done = time.perf_counter()
+{body}
+end = time.perf_counter()
+print(setup_done - start, end - setup_done)
+"""
+
+SCENARIOS = [
+    ('ai_module (import)', 'import ai_module', 'pass'),
+    ('ai_module (first categorize)', 'import ai_module',
+     "ai_module.expense_ai.predict_category('Netflix subscription')"),
+    ('ai_module (first forecast)', 'import ai_module',
+     "ai_module.expense_ai.predict_future_expenses("
+     "[{'amount': 10.0, 'category': 'Food', 'description': 'Cafe', 'date': '2024-01-%02d' % d} "
+     "for d in range(1, 29)], days=7)"),
+]
+
+def run_snippet(setup: str, body: str) -> Tuple[float, float]:
+    code = TIMED_SNIPPET.format(setup=setup, body=body)
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=BACKEND_DIR, check=True,
+        capture_output=True, text=True
+    ).stdout.strip().splitlines()[-1]
+    setup_time, body_time = output.split()
+    return float(setup_time), float(body_time)
+
+def best_of(repeat: int, setup: str, body: str) -> Tuple[float, float]:
+    runs: List[Tuple[float, float]] = [run_snippet(setup, body) for _ in range(repeat)]
+    return min(r[0] for r in runs), min(r[1] for r in runs)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'module':<40} {'import ms':>10} {'first use ms':>13}")
+    for module in MODULES:
+        import_time, _ = best_of(args.repeat, f'import {module}', 'pass')
+        print(f"{module:<40} {import_time * 1000:>10.1f} {'':>13}")
+
+    for label, setup, body in SCENARIOS:
+        import_time, use_time = best_of(args.repeat, setup, body)
+        print(f"{label:<40} {import_time * 1000:>10.1f} {use_time * 1000:>13.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""Per-user memo of the categories users gave their own expenses.
+
+Someone who has filed "Netflix subscription" under Entertainment a dozen
+times should get that answer back without running the model, and their
+own label should beat whatever the model thinks. Each user's memo maps
+descriptions, both as typed and normalized (lowercased, with numbers,
+dates and punctuation stripped, so "NETFLIX.COM 03/24 #8812" and "Netflix
+com" share a key), to how often each category was used for them.
+
+Only expenses the user categorized count; rows auto-categorized on import
+carry ai_tagged and are skipped so the model never learns from itself.
+Memos are kept for a bounded number of users and keys, both in LRU order,
+and expire after max_age seconds so writes seen by other workers are
+picked up.
+"""
+import re
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional
+
+from expense_validation import is_user_categorized
+
+_TOKEN_PATTERN = re.compile(r"[^\W\d_]+(?:[&+'][^\W\d_]+)*")
+
+def normalize_description(description: str) -> str:
+    """Lowercased alphabetic tokens of a description, e.g. 'NETFLIX.COM 03/24' -> 'netflix com'"""
+    return ' '.join(_TOKEN_PATTERN.findall(str(description).lower()))
+
+class UserCategoryMemo:
+    """One user's description -> {category: count} tables, LRU-bounded"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._exact: 'OrderedDict[str, Dict[str, int]]' = OrderedDict()
+        self._normalized: 'OrderedDict[str, Dict[str, int]]' = OrderedDict()
+        self.created_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._exact) + len(self._normalized)
+
+    def _record(self, table: 'OrderedDict[str, Dict[str, int]]', key: str, category: str) -> None:
+        counts = table.get(key)
+        if counts is None:
+            counts = table[key] = {}
+        else:
+            table.move_to_end(key)
+        # Re-inserting puts the latest category last, so ties go to it
+        counts[category] = counts.pop(category, 0) + 1
+        while len(table) > self.max_entries:
+            table.popitem(last=False)
+
+    def learn(self, expenses: Iterable[Dict[str, Any]]) -> None:
+        for expense in expenses:
+            if not is_user_categorized(expense):
+                continue
+            description = str(expense['description']).strip()
+            category = str(expense['category'])
+            self._record(self._exact, description, category)
+            normalized = normalize_description(description)
+            if normalized:
+                self._record(self._normalized, normalized, category)
+
+    def lookup(self, description: str) -> Optional[Dict[str, Any]]:
+        """The user's usual category for a description, or None if never seen"""
+        description = str(description).strip()
+        key, table, match = description, self._exact, 'exact'
+        if key not in table:
+            key, table, match = normalize_description(description), self._normalized, 'normalized'
+        counts = table.get(key)
+        if not counts:
+            return None
+        table.move_to_end(key)
+
+        total = sum(counts.values())
+        # max() keeps the first of equal counts; iterate latest first
+        category = max(reversed(counts.items()), key=lambda item: item[1])[0]
+        return {
+            'category': category,
+            'confidence': counts[category] / total,
+            'ai_tagged': False,
+            'source': f'user_history_{match}',
+            'suggested_categories': [
+                {'category': name, 'confidence': count / total}
+                for name, count in sorted(counts.items(), key=lambda item: -item[1])
+            ]
+        }
+
+class CategoryMemo:
+    """Thread-safe LRU of per-user memos"""
+
+    def __init__(self, max_users: int = 1000, max_entries_per_user: int = 5000, max_age: float = 300.0):
+        self.max_users = max_users
+        self.max_entries_per_user = max_entries_per_user
+        self.max_age = max_age
+        self._users: 'OrderedDict[str, UserCategoryMemo]' = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def loaded(self, user_id: str) -> bool:
+        """Whether the user has a memo that has not expired"""
+        with self._lock:
+            memo = self._users.get(user_id)
+            if memo is None:
+                return False
+            if time.monotonic() - memo.created_at > self.max_age:
+                del self._users[user_id]
+                return False
+            return True
+
+    def load(self, user_id: str, expenses: Iterable[Dict[str, Any]]) -> None:
+        """(Re)build a user's memo from their stored expenses"""
+        memo = UserCategoryMemo(self.max_entries_per_user)
+        memo.learn(expenses)
+        with self._lock:
+            self._users[user_id] = memo
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def learn(self, user_id: str, expenses: Iterable[Dict[str, Any]]) -> bool:
+        """Fold new expenses into a loaded memo; False if the user has none"""
+        with self._lock:
+            memo = self._users.get(user_id)
+            if memo is None:
+                return False
+            memo.learn(expenses)
+            return True
+
+    def lookup(self, user_id: str, description: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            memo = self._users.get(user_id)
+            result = memo.lookup(description) if memo is not None else None
+            if memo is not None:
+                self._users.move_to_end(user_id)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return result
+
+    def invalidate_user(self, user_id: str) -> bool:
+        with self._lock:
+            return self._users.pop(user_id, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'users': len(self._users),
+                'entries': sum(len(memo) for memo in self._users.values()),
+                'max_users': self.max_users,
+                'max_entries_per_user': self.max_entries_per_user,
+                'hits': self.hits,
+                'misses': self.misses
+            }
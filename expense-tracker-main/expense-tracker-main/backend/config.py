@@ -1,10 +1,21 @@
 from pydantic_settings import BaseSettings
 
+# Placeholder default for SECRET_KEY; anyone can forge tokens signed with it
+DEFAULT_SECRET_KEY = "your-secret-key-here"
+# RFC 7518 section 3.2: an HS256 key must be at least as long as its 256-bit hash
+MIN_SECRET_KEY_BYTES = 32
+
 class Settings(BaseSettings):
     ALLOWED_ORIGINS: str = "http://localhost:3000"
     OPENAI_API_KEY: str = ""
     DATABASE_URL: str = ""
-    SECRET_KEY: str = "your-secret-key-here"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    SECRET_KEY: str = DEFAULT_SECRET_KEY
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     DEBUG: bool = True
@@ -13,4 +24,14 @@ class Settings(BaseSettings):
         env_file = ".env"
         extra = "allow"  # Allow extra fields
 
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
+
+def check_secret_key(secret_key: str) -> None:
+    """Refuse a JWT signing key that is the placeholder or too short for HS256"""
+    if secret_key == DEFAULT_SECRET_KEY:
+        raise RuntimeError(
+            "SECRET_KEY is not set; generate one with "
+            "python -c 'import secrets; print(secrets.token_urlsafe(48))' and put it in .env"
+        )
+    if len(secret_key.encode('utf-8')) < MIN_SECRET_KEY_BYTES:
+        raise RuntimeError(f"SECRET_KEY must be at least {MIN_SECRET_KEY_BYTES} bytes long")
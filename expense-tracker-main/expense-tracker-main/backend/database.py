@@ -0,0 +1,93 @@
+from threading import Lock
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from config import settings
+
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL or "sqlite:///./expense_tracker.db"
+
+# Async driver used for each sync URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mssql": "mssql+aioodbc",
+}
+
+connect_args = {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base = declarative_base()
+
+def async_database_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its asyncio counterpart"""
+    parsed = make_url(url)
+    async_driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if async_driver is None:
+        raise ValueError(
+            f"No asyncio driver for the '{parsed.get_backend_name()}' database; "
+            f"supported backends are {', '.join(sorted(ASYNC_DRIVERS))}"
+        )
+    if parsed.drivername == async_driver:
+        return url
+    return parsed.set(drivername=async_driver).render_as_string(hide_password=False)
+
+def make_async_engine(url: str = SQLALCHEMY_DATABASE_URL, **overrides) -> AsyncEngine:
+    """Build an AsyncEngine with the pool and statement cache settings from config"""
+    async_url = make_url(async_database_url(url))
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "query_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    connect = {}
+
+    if async_url.get_backend_name() == "sqlite":
+        # sqlite3 keeps its own per-connection prepared statement cache
+        connect["cached_statements"] = settings.DB_STATEMENT_CACHE_SIZE
+        in_memory = async_url.database in (None, "", ":memory:")
+    else:
+        in_memory = False
+        if async_url.get_driver_name() == "asyncpg":
+            connect["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+    if not in_memory:
+        # aiosqlite defaults to NullPool; pool file databases like any other
+        options.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    options["connect_args"] = connect
+    options.update(overrides)
+    return create_async_engine(async_url, **options)
+
+# Built on the first async request, so a missing async driver fails that
+# request with a clear error instead of the whole app at import
+_async_session_factory = None
+_async_session_factory_lock = Lock()
+
+def get_async_session_factory() -> async_sessionmaker:
+    global _async_session_factory
+    if _async_session_factory is None:
+        with _async_session_factory_lock:
+            if _async_session_factory is None:
+                _async_session_factory = async_sessionmaker(make_async_engine(), expire_on_commit=False, autoflush=False)
+    return _async_session_factory
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
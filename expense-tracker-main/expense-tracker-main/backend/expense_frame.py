@@ -0,0 +1,235 @@
+"""Columnar, per-user cache of expenses for the analytics endpoints.
+
+Every ExpenseAI method used to start with pd.DataFrame(expenses) and
+pd.to_datetime over a list of dicts, and /api/ai/chat paid for that several
+times per request. An ExpenseFrame holds the same data as typed NumPy
+columns (float64 amounts, datetime64 dates, int32 category codes) that are
+parsed once, grow in place as expenses are added, and hand out a single
+shared DataFrame until the next change. FrameCache keeps one frame per user
+under a byte budget, evicting least recently used users first.
+"""
+import hashlib
+import sys
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+INITIAL_CAPACITY = 64
+
+def parse_dates(values: Sequence[Any]) -> np.ndarray:
+    """Parse ISO 8601 dates, with or without a time or offset, as naive UTC datetime64"""
+    parsed = pd.to_datetime(values, format='ISO8601', errors='coerce', utc=True)
+    return parsed.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+
+class ExpenseFrame:
+    """Growable columnar store of one user's expenses"""
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        capacity = max(capacity, 1)
+        self._size = 0
+        self._amounts = np.empty(capacity, dtype=np.float64)
+        self._dates = np.empty(capacity, dtype='datetime64[ns]')
+        self._codes = np.empty(capacity, dtype=np.int32)
+        self._ids = np.empty(capacity, dtype=object)
+        self._descriptions = np.empty(capacity, dtype=object)
+        self._categories: List[str] = []
+        self._category_codes: Dict[str, int] = {}
+        self._object_bytes = 0
+        self._lock = Lock()
+        self._dataframe = None
+        self._fingerprint: Optional[str] = None
+
+    @classmethod
+    def from_expenses(cls, expenses: Iterable[Dict[str, Any]]) -> 'ExpenseFrame':
+        expenses = list(expenses)
+        frame = cls(capacity=len(expenses))
+        frame.append(expenses)
+        return frame
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._amounts)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ('_amounts', '_dates', '_codes', '_ids', '_descriptions'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def _category_code(self, category: Any) -> int:
+        category = str(category)
+        code = self._category_codes.get(category)
+        if code is None:
+            code = len(self._categories)
+            self._categories.append(category)
+            self._category_codes[category] = code
+            self._object_bytes += sys.getsizeof(category)
+        return code
+
+    def append(self, expenses: Sequence[Dict[str, Any]]) -> None:
+        """Add expenses; dates are parsed here, once, and unparseable ones become NaT"""
+        if not expenses:
+            return
+        count = len(expenses)
+        amounts = np.fromiter((float(expense['amount']) for expense in expenses), dtype=np.float64, count=count)
+        dates = parse_dates([expense['date'] for expense in expenses])
+
+        with self._lock:
+            start, end = self._size, self._size + count
+            self._grow(end)
+            self._amounts[start:end] = amounts
+            self._dates[start:end] = dates
+            for offset, expense in enumerate(expenses):
+                position = start + offset
+                self._codes[position] = self._category_code(expense['category'])
+                expense_id = expense.get('id')
+                description = expense.get('description')
+                self._ids[position] = expense_id
+                self._descriptions[position] = description
+                self._object_bytes += sys.getsizeof(expense_id) + sys.getsizeof(description)
+            self._size = end
+            self._dataframe = None
+            self._fingerprint = None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the frame, including spare capacity and string payloads"""
+        arrays = (self._amounts, self._dates, self._codes, self._ids, self._descriptions)
+        total = sum(array.nbytes for array in arrays) + self._object_bytes
+        if self._dataframe is not None:
+            total += int(self._dataframe.memory_usage(index=False, deep=False).sum())
+        return total
+
+    @property
+    def amounts(self) -> np.ndarray:
+        return self._amounts[:self._size]
+
+    def to_dataframe(self) -> 'pd.DataFrame':
+        """Shared DataFrame view of the frame; callers must not modify it"""
+        with self._lock:
+            if self._dataframe is None:
+                size = self._size
+                self._dataframe = pd.DataFrame({
+                    'id': self._ids[:size],
+                    'amount': self._amounts[:size],
+                    'date': self._dates[:size],
+                    'category': pd.Categorical.from_codes(self._codes[:size], categories=list(self._categories)),
+                    'description': self._descriptions[:size]
+                })
+            return self._dataframe
+
+    def fingerprint(self) -> str:
+        """Order-independent hash of ids, amounts, dates and categories"""
+        with self._lock:
+            if self._fingerprint is None:
+                size = self._size
+                ids = np.array([str(value) for value in self._ids[:size]], dtype=object)
+                order = np.argsort(ids, kind='stable')
+                categories = np.array(self._categories, dtype=object)
+                digest = hashlib.sha256()
+                digest.update('\x00'.join(ids[order]).encode('utf-8'))
+                digest.update(self._amounts[:size][order].tobytes())
+                digest.update(self._dates[:size][order].view(np.int64).tobytes())
+                digest.update('\x00'.join(categories[self._codes[:size][order]]).encode('utf-8'))
+                self._fingerprint = digest.hexdigest()
+            return self._fingerprint
+
+def as_expense_frame(expenses: Any) -> ExpenseFrame:
+    """Accept either a cached ExpenseFrame or a plain list of expense dicts"""
+    if isinstance(expenses, ExpenseFrame):
+        return expenses
+    return ExpenseFrame.from_expenses(expenses)
+
+class FrameCache:
+    """Thread-safe per-user LRU of ExpenseFrames bounded by total memory"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _account(self, user_id: str, frame: ExpenseFrame) -> None:
+        """(Re)record a frame's size and evict other users until under budget"""
+        previous = self._entries.pop(user_id, None)
+        if previous is not None:
+            self._size -= previous[1]
+        size = frame.nbytes
+        if size > self.max_bytes:
+            return
+        self._entries[user_id] = (frame, size)
+        self._size += size
+        while self._size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self.evictions += 1
+
+    def get(self, user_id: str) -> Optional[ExpenseFrame]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, user_id: str, frame: ExpenseFrame) -> None:
+        with self._lock:
+            self._account(user_id, frame)
+
+    def append(self, user_id: str, expenses: Sequence[Dict[str, Any]]) -> bool:
+        """Fold new expenses into a cached frame; False if the user has none cached"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return False
+            frame = entry[0]
+            frame.append(expenses)
+            self._account(user_id, frame)
+            return True
+
+    def refresh_size(self, user_id: str) -> None:
+        """Re-account a frame whose memory grew, e.g. after building its DataFrame"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._account(user_id, entry[0])
+
+    def invalidate_user(self, user_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            if entry is None:
+                return False
+            self._size -= entry[1]
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
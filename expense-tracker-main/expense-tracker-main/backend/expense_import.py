@@ -0,0 +1,165 @@
+"""Streaming import of bank statement files into expenses.
+
+Rows are parsed lazily from the uploaded file, validated with the same rules
+as POST /api/expenses, optionally auto-categorized in batches and handed to
+the writer one chunk at a time. Memory use therefore depends on the chunk
+size and the error-report cap, not on the size of the file.
+"""
+import csv
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from expense_validation import validate_expense
+from firestore_bulk import FIRESTORE_BATCH_LIMIT
+
+# One Firestore batch per chunk, leaving room for the aggregate update
+IMPORT_CHUNK_SIZE = FIRESTORE_BATCH_LIMIT - 1
+MAX_REPORTED_ERRORS = 1000
+OFX_READ_SIZE = 64 * 1024
+
+CSV_COLUMN_ALIASES = {
+    'transaction date': 'date',
+    'posted date': 'date',
+    'payee': 'description',
+    'details': 'description',
+    'memo': 'description',
+    'name': 'description'
+}
+
+Row = Tuple[int, Dict[str, Any]]
+
+def iter_csv_rows(stream: TextIO) -> Iterator[Row]:
+    """Yield (line_number, row) for each data row of a CSV file with a header"""
+    reader = csv.reader(stream)
+    try:
+        header = next(reader)
+    except StopIteration:
+        return
+
+    columns = [name.strip().lower() for name in header]
+    columns = [CSV_COLUMN_ALIASES.get(name, name) for name in columns]
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue
+        row = {
+            column: value.strip()
+            for column, value in zip(columns, values)
+            if column and value.strip()
+        }
+        yield reader.line_num, row
+
+def _ofx_tokens(stream: TextIO) -> Iterator[Tuple[str, str]]:
+    """Yield (tag, value) pairs from SGML or XML OFX, reading the stream in chunks"""
+    token = re.compile(r'<(/?[A-Za-z0-9.]+)>([^<]*)')
+    buffer = ''
+    while True:
+        chunk = stream.read(OFX_READ_SIZE)
+        buffer += chunk
+        # Only the text before the last '<' is guaranteed to hold complete tokens
+        cut = len(buffer) if not chunk else buffer.rfind('<')
+        if cut > 0:
+            for match in token.finditer(buffer, 0, cut):
+                yield match.group(1).upper(), match.group(2).strip()
+            buffer = buffer[cut:]
+        if not chunk:
+            return
+
+def _ofx_date(value: str) -> str:
+    """Convert an OFX date such as 20240115120000[-5:EST] to YYYY-MM-DD"""
+    return datetime.strptime(value[:8], '%Y%m%d').strftime('%Y-%m-%d')
+
+def iter_ofx_rows(stream: TextIO) -> Iterator[Row]:
+    """Yield (transaction_number, row) for each STMTTRN in an OFX statement.
+
+    Debits (negative TRNAMT) become positive expense amounts; credits come
+    out negative and are rejected by validation.
+    """
+    currency = None
+    transaction: Optional[Dict[str, str]] = None
+    number = 0
+
+    for tag, value in _ofx_tokens(stream):
+        if tag == 'CURDEF':
+            currency = value
+        elif tag == 'STMTTRN':
+            transaction = {}
+        elif tag == '/STMTTRN' and transaction is not None:
+            number += 1
+            row: Dict[str, Any] = {}
+            description = transaction.get('NAME') or transaction.get('MEMO')
+            if description:
+                row['description'] = description
+            if 'TRNAMT' in transaction:
+                try:
+                    row['amount'] = -float(transaction['TRNAMT'])
+                except ValueError:
+                    row['amount'] = transaction['TRNAMT']
+            if 'DTPOSTED' in transaction:
+                try:
+                    row['date'] = _ofx_date(transaction['DTPOSTED'])
+                except ValueError:
+                    row['date'] = transaction['DTPOSTED']
+            if currency:
+                row['currency'] = currency
+            yield number, row
+            transaction = None
+        elif transaction is not None and not tag.startswith('/'):
+            transaction[tag] = value
+
+def import_expenses(rows: Iterable[Row], user_id: str,
+                    write_chunk: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
+                    categorize: Optional[Callable[[List[str]], List[Dict[str, Any]]]] = None,
+                    chunk_size: int = IMPORT_CHUNK_SIZE,
+                    max_errors: int = MAX_REPORTED_ERRORS) -> Dict[str, Any]:
+    """Validate, categorize and write parsed rows chunk by chunk.
+
+    write_chunk receives at most chunk_size validated expenses and returns
+    bulk write stats. When categorize is given, rows without a category are
+    classified with one batched call per chunk; otherwise a category is
+    required like in POST /api/expenses.
+    """
+    report: Dict[str, Any] = {
+        'imported': 0,
+        'failed': 0,
+        'auto_categorized': 0,
+        'errors': [],
+        'errors_truncated': False,
+        'elapsed_write_seconds': 0.0
+    }
+    pending: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        uncategorized = [expense for expense in pending if not expense['category']]
+        if uncategorized and categorize is not None:
+            predictions = categorize([str(expense['description']) for expense in uncategorized])
+            for expense, prediction in zip(uncategorized, predictions):
+                expense['category'] = prediction['category']
+                expense['ai_tagged'] = True
+            report['auto_categorized'] += len(uncategorized)
+
+        stats = write_chunk(pending)
+        report['imported'] += stats['written']
+        report['elapsed_write_seconds'] += stats['elapsed_seconds']
+        pending.clear()
+
+    for row_number, row in rows:
+        expense, error = validate_expense(dict(row, user_id=user_id), require_category=categorize is None)
+        if expense is None:
+            report['failed'] += 1
+            if len(report['errors']) < max_errors:
+                report['errors'].append({'row': row_number, 'error': error})
+            else:
+                report['errors_truncated'] = True
+            continue
+
+        pending.append(expense)
+        if len(pending) >= chunk_size:
+            flush()
+
+    if pending:
+        flush()
+
+    elapsed = report['elapsed_write_seconds']
+    report['docs_per_second'] = report['imported'] / elapsed if elapsed > 0 else None
+    return report
@@ -0,0 +1,53 @@
+"""Validation rules shared by every path that creates expenses"""
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+REQUIRED_EXPENSE_FIELDS = ['user_id', 'amount', 'description', 'category', 'date']
+
+def validate_expense(data: Dict[str, Any], require_category: bool = True) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Validate an incoming expense payload.
+
+    Returns (expense_data, None) with the document to store, or
+    (None, error_message) when the payload is rejected. With
+    require_category=False a missing category is left empty for the caller
+    to fill in.
+    """
+    required_fields = [
+        field for field in REQUIRED_EXPENSE_FIELDS
+        if require_category or field != 'category'
+    ]
+
+    # Validate required fields are present in data
+    if not all(field in data for field in required_fields):
+        missing = [field for field in required_fields if field not in data]
+        return None, f"Missing required fields: {', '.join(missing)}"
+
+    # Validate amount is a valid number
+    try:
+        amount = float(data['amount'])
+        if amount <= 0:
+            return None, 'Amount must be greater than 0'
+    except (ValueError, TypeError):
+        return None, 'Invalid amount value'
+
+    # Validate date is ISO 8601, which is what the analytics parse
+    if not isinstance(data['date'], datetime):
+        try:
+            datetime.fromisoformat(str(data['date']))
+        except ValueError:
+            return None, 'Invalid date value, expected YYYY-MM-DD'
+
+    expense_data = {
+        'user_id': data['user_id'],
+        'amount': amount,
+        'description': data['description'],
+        'category': data.get('category', ''),
+        'date': data['date'],
+        'currency': data.get('currency', 'EUR'),  # Default to EUR if not specified
+        'created_at': datetime.utcnow()
+    }
+    return expense_data, None
+
+def is_user_categorized(expense: Dict[str, Any]) -> bool:
+    """Whether an expense carries a category its owner chose, not one the model guessed"""
+    return bool(expense.get('description')) and bool(expense.get('category')) and not expense.get('ai_tagged')
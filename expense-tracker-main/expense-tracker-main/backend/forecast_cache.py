@@ -0,0 +1,82 @@
+"""In-process cache of forecast results.
+
+Refitting forecasts is by far the most expensive thing /api/ai/predict does,
+and the result only depends on the user's expenses and the horizon. Entries
+are keyed on (user_id, ExpenseFrame.fingerprint() of the expense set, days), evicted in LRU
+order once the total serialized size exceeds a byte cap, and dropped
+eagerly when the user's expenses change.
+"""
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+CacheKey = Tuple[str, str, int]
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory cost of a cached result by its JSON size"""
+    return len(json.dumps(value, default=str))
+
+class ForecastCache:
+    """Thread-safe LRU cache of forecast results bounded by total size"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[CacheKey, Tuple[Dict[str, Any], int]]' = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str, fingerprint: str, days: int) -> Optional[Dict[str, Any]]:
+        key = (user_id, fingerprint, days)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, user_id: str, fingerprint: str, days: int, value: Dict[str, Any]) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        key = (user_id, fingerprint, days)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+
+            self._entries[key] = (value, size)
+            self._size += size
+
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Drop every cached forecast for a user, returning how many were removed"""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == user_id]
+            for key in keys:
+                _, size = self._entries.pop(key)
+                self._size -= size
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
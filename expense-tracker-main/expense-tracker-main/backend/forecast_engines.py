@@ -0,0 +1,132 @@
+"""Forecasting engines and the per-series engine selector.
+
+ARIMA(2,1,2) needs a few weeks of mostly non-zero days to estimate its five
+parameters; most category series are shorter or sparser than that (a
+category spent on twice a week is ~70% zero days), and fitting them costs
+tens of milliseconds only to fail or overfit. select_engine picks per
+series:
+
+    moving_average  short or sparse series: the mean daily spend over the
+                    last MOVING_AVERAGE_WINDOW days
+    holt            dense series too short for ARIMA: damped-trend Holt
+                    smoothing, parameters grid-searched in one vectorized pass
+    arima           long, dense series
+
+Both closed-form engines are pure NumPy and return the same payload shape as
+arima_forecast. FORECAST_ENGINE forces one engine for every series. The
+module has no import-time side effects, so arima_forecast can run in a
+spawned forecast worker (see process_pools).
+"""
+import os
+from typing import Any, Dict, Sequence, Union
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+arima_model = lazy_import('statsmodels.tsa.arima.model')
+
+ENGINES = ('moving_average', 'holt', 'arima')
+
+ARIMA_ORDER = (2, 1, 2)
+
+# 'auto' selects per series; any name in ENGINES forces that engine
+FORECAST_ENGINE = os.getenv('FORECAST_ENGINE', 'auto')
+HOLT_MIN_POINTS = int(os.getenv('FORECAST_HOLT_MIN_POINTS', '14'))
+ARIMA_MIN_POINTS = int(os.getenv('FORECAST_ARIMA_MIN_POINTS', '30'))
+# Series with a larger share of zero-spend days are treated as sparse
+MAX_ZERO_FRACTION = float(os.getenv('FORECAST_MAX_ZERO_FRACTION', '0.5'))
+MOVING_AVERAGE_WINDOW = 28
+
+# Two-sided 95% normal quantile, matching ARIMA's default conf_int
+Z_95 = 1.959963984540054
+
+# Damped-trend Holt search grid: level, trend and damping smoothing factors
+_ALPHAS, _BETAS, _PHIS = (a.ravel() for a in np.meshgrid(
+    np.array([0.05, 0.1, 0.2, 0.3, 0.5, 0.7]),
+    np.array([0.01, 0.05, 0.1, 0.2]),
+    np.array([0.8, 0.9, 0.98]),
+    indexing='ij'
+))
+
+Series = Union[Sequence[float], np.ndarray]
+
+def select_engine(values: Series, engine: str = 'auto') -> str:
+    """Name of the engine to forecast this daily series with"""
+    if engine != 'auto':
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown forecast engine: {engine}")
+        return engine
+    values = np.asarray(values, dtype=np.float64)
+    points = len(values)
+    nonzero = int(np.count_nonzero(values))
+    if points < HOLT_MIN_POINTS or nonzero < 3 or 1 - nonzero / points > MAX_ZERO_FRACTION:
+        return 'moving_average'
+    if points < ARIMA_MIN_POINTS:
+        return 'holt'
+    return 'arima'
+
+def moving_average_forecast(values: Series, days: int, window: int = MOVING_AVERAGE_WINDOW) -> Dict[str, Any]:
+    """Flat forecast at the mean of the last `window` days"""
+    recent = np.asarray(values, dtype=np.float64)[-window:]
+    mean = float(recent.mean()) if len(recent) else 0.0
+    spread = Z_95 * float(recent.std()) if len(recent) else 0.0
+    return {
+        'predictions': [mean] * days,
+        'confidence_intervals': [(mean - spread, mean + spread)] * days
+    }
+
+def holt_forecast(values: Series, days: int) -> Dict[str, Any]:
+    """Damped-trend Holt forecast, picking the parameters with the lowest one-step SSE"""
+    y = np.asarray(values, dtype=np.float64)
+    if len(y) < 3:
+        return moving_average_forecast(y, days)
+
+    # Every grid point runs the recursion at once, one vector op per day
+    level = np.full(_ALPHAS.shape, y[0])
+    trend = np.full(_ALPHAS.shape, (y[min(len(y), 4) - 1] - y[0]) / (min(len(y), 4) - 1))
+    sse = np.zeros(_ALPHAS.shape)
+    for observed in y[1:]:
+        expected = level + _PHIS * trend
+        error = observed - expected
+        sse += error * error
+        new_level = expected + _ALPHAS * error
+        trend = _BETAS * (new_level - level) + (1 - _BETAS) * _PHIS * trend
+        level = new_level
+
+    best = int(np.argmin(sse))
+    alpha, beta, phi = _ALPHAS[best], _BETAS[best], _PHIS[best]
+    steps = np.arange(1, days + 1)
+    damping = np.cumsum(phi ** steps)
+    predictions = level[best] + damping * trend[best]
+
+    # h-step variance: sigma^2 * (1 + sum_{j<h} c_j^2), c_j = alpha * (1 + beta * (phi + ... + phi^j))
+    sigma2 = sse[best] / (len(y) - 1)
+    c = alpha * (1 + beta * damping[:-1])
+    variance = sigma2 * (1 + np.concatenate(([0.0], np.cumsum(c * c))))
+    spread = Z_95 * np.sqrt(variance)
+    return {
+        'predictions': predictions.tolist(),
+        'confidence_intervals': list(zip((predictions - spread).tolist(), (predictions + spread).tolist()))
+    }
+
+def arima_forecast(series: Any, days: int) -> Dict[str, Any]:
+    """Fit ARIMA to a date-indexed daily series and forecast `days` ahead"""
+    model_fit = arima_model.ARIMA(series, order=ARIMA_ORDER).fit()
+    # One forecast result serves both the point values and the intervals
+    forecast = model_fit.get_forecast(steps=days)
+    conf_int = forecast.conf_int()
+    return {
+        'predictions': forecast.predicted_mean.values.tolist(),
+        'confidence_intervals': list(zip(
+            conf_int.iloc[:, 0].values.tolist(),
+            conf_int.iloc[:, 1].values.tolist()
+        )),
+        'aic': float(model_fit.aic),
+        'bic': float(model_fit.bic)
+    }
+
+CLOSED_FORM_ENGINES = {
+    'moving_average': moving_average_forecast,
+    'holt': holt_forecast
+}
@@ -0,0 +1,216 @@
+"""Out-of-process category inference with request micro-batching.
+
+predict_proba on the TF-IDF pipeline holds the GIL, so categorize requests
+handled inline serialize behind each other and behind everything else the
+worker is doing. CategoryInferencePool runs the model in a small pool of
+spawned processes; each loads the published artifact from model_store
+memory-mapped, so its arrays live once in the page cache however many
+workers there are. The worker functions live here, in a module without
+import-time side effects, because spawned workers import it (see
+process_pools).
+
+Requests go through a dispatcher thread that waits up to max_wait_ms after
+the first one for others to arrive, drops duplicate descriptions and sends
+the lot as one vectorized call. Latency and batch-size histograms are kept
+for the metrics endpoint.
+"""
+import bisect
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import model_store
+from process_pools import spawn_executor, terminate_executor
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram with cumulative, Prometheus-style counts"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        cumulative, running = {}, 0
+        for bound, count in zip([*map(str, self.buckets), '+Inf'], counts):
+            running += count
+            cumulative[bound] = running
+        return {'buckets': cumulative, 'count': running, 'sum': total}
+
+# Set in each worker process by _init_worker
+_worker_model = None
+
+def _init_worker(store_dir: str, metadata: Dict[str, Any]) -> None:
+    global _worker_model
+    _worker_model = model_store.load_model(model_store.CATEGORY_MODEL_NAME, metadata, store_dir, mmap=True)
+
+def _predict_batch(descriptions: List[str]) -> Tuple[List[str], np.ndarray]:
+    if _worker_model is None:
+        raise RuntimeError('Category model artifact could not be loaded in the inference worker')
+    return list(_worker_model.classes_), _worker_model.predict_proba(descriptions)
+
+class _Request:
+    __slots__ = ('descriptions', 'future', 'enqueued_at')
+
+    def __init__(self, descriptions: List[str]):
+        self.descriptions = descriptions
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+class CategoryInferencePool:
+    """Process pool serving the published category model behind a micro-batching queue"""
+
+    def __init__(self, workers: int, metadata: Dict[str, Any], max_batch_size: int = 256,
+                 max_wait_ms: float = 2.0, store_dir: str = model_store.MODEL_STORE_DIR):
+        self.workers = workers
+        self.metadata = metadata
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.store_dir = store_dir
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+        self.requests = 0
+        self.batches = 0
+        self.coalesced = 0
+        self.fallbacks = 0
+        self._queue: 'queue.Queue[Optional[_Request]]' = queue.Queue()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='category-inference', daemon=True)
+        self._dispatcher.start()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = spawn_executor(self.workers, _init_worker, (self.store_dir, self.metadata))
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor) -> None:
+        """Discard a broken pool so the next batch starts a fresh one"""
+        with self._executor_lock:
+            if self._executor is broken:
+                self._executor = None
+        terminate_executor(broken)
+
+    def start(self) -> None:
+        """Spawn the workers and load the model now instead of on the first request"""
+        executor = self._get_executor()
+        for future in [executor.submit(_predict_batch, ['warm up']) for _ in range(self.workers)]:
+            future.result()
+
+    def submit(self, descriptions: Sequence[str]) -> Future:
+        """Queue descriptions; the future resolves to (classes, probability rows)"""
+        request = _Request(list(descriptions))
+        self._queue.put(request)
+        return request.future
+
+    def predict_proba(self, descriptions: Sequence[str], timeout: Optional[float] = None) -> Tuple[List[str], np.ndarray]:
+        return self.submit(descriptions).result(timeout=timeout)
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            size = len(request.descriptions)
+            deadline = time.perf_counter() + self.max_wait
+            closing = False
+            # Coalesce whatever arrives within max_wait of the first request
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    closing = True
+                    break
+                batch.append(request)
+                size += len(request.descriptions)
+            self._send(batch)
+            if closing:
+                return
+
+    def _send(self, batch: List[_Request]) -> None:
+        unique = list(dict.fromkeys(description for request in batch for description in request.descriptions))
+        self.requests += len(batch)
+        self.batches += 1
+        self.coalesced += len(batch) - 1
+        self.batch_size.observe(len(unique))
+        try:
+            executor = self._get_executor()
+            future = executor.submit(_predict_batch, unique)
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        future.add_done_callback(lambda done: self._complete(batch, unique, executor, done))
+
+    def _fail(self, batch: List[_Request], error: BaseException) -> None:
+        for request in batch:
+            if not request.future.done():
+                request.future.set_exception(error)
+
+    def _complete(self, batch: List[_Request], unique: List[str], executor: ProcessPoolExecutor,
+                  done: Future) -> None:
+        try:
+            classes, probabilities = done.result()
+        except BaseException as e:
+            if isinstance(e, BrokenProcessPool):
+                logger.warning("Category inference pool broke, restarting it: %s", e)
+                self._reset_executor(executor)
+            self._fail(batch, e)
+            return
+
+        rows = {description: index for index, description in enumerate(unique)}
+        finished = time.perf_counter()
+        for request in batch:
+            indices = [rows[description] for description in request.descriptions]
+            request.future.set_result((classes, probabilities[indices]))
+            self.latency_ms.observe((finished - request.enqueued_at) * 1000)
+
+    def record_fallback(self) -> None:
+        """Count a request the caller answered inline after the pool timed out or failed"""
+        self.fallbacks += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'requests': self.requests,
+            'batches': self.batches,
+            'coalesced_requests': self.coalesced,
+            'fallbacks': self.fallbacks,
+            'pending': self._queue.qsize(),
+            'latency_ms': self.latency_ms.snapshot(),
+            'batch_size': self.batch_size.snapshot()
+        }
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._dispatcher.join()
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,182 @@
+"""Prioritized keyword rules compiled into one Aho-Corasick automaton.
+
+The keyword fallback used to test every keyword of every category with a
+substring scan, and the first category in dict order won, so "gas station"
+could come out as Utilities because of "gas". Rules here carry a priority:
+the highest-priority match wins, then the longest keyword, then the
+earliest one. Matching is one pass over the description regardless of how
+many rules there are, and keywords only match whole words or their plurals
+("buses" matches "bus", "business" does not).
+
+Matches from rules at or above a priority threshold (known merchants by
+default) are confident enough for ExpenseAI to skip the ML model.
+"""
+import json
+import logging
+import os
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_MERCHANT = 100
+PRIORITY_PHRASE = 50
+PRIORITY_KEYWORD = 10
+
+# Matches at or above this priority bypass the ML model
+PRECLASSIFY_MIN_PRIORITY = int(os.getenv('KEYWORD_PRECLASSIFY_MIN_PRIORITY', str(PRIORITY_MERCHANT)))
+
+# JSON list of extra rules, e.g. [{"keyword": "aldi", "category": "Food", "priority": 100}]
+KEYWORD_RULES_FILE = os.getenv('KEYWORD_RULES_FILE')
+
+# Endings a keyword may carry and still count as the same word
+PLURAL_SUFFIXES = frozenset({'', 's', 'es'})
+
+class KeywordRule(NamedTuple):
+    keyword: str
+    category: str
+    priority: int = PRIORITY_KEYWORD
+    confidence: float = 0.8
+
+class KeywordMatch(NamedTuple):
+    rule: KeywordRule
+    # Another category matched at the same priority
+    ambiguous: bool
+
+def _rules(category: str, priority: int, confidence: float, keywords: Iterable[str]) -> List[KeywordRule]:
+    return [KeywordRule(keyword, category, priority, confidence) for keyword in keywords]
+
+DEFAULT_RULES: List[KeywordRule] = [
+    *_rules('Food', PRIORITY_MERCHANT, 0.95, ["kfc", "mcdonalds", "subway", "lidl", "carrefour"]),
+    *_rules('Food', PRIORITY_KEYWORD, 0.8, ["food", "restaurant", "pizza", "grocery", "cafe"]),
+    *_rules('Transport', PRIORITY_MERCHANT, 0.95, ["uber"]),
+    *_rules('Transport', PRIORITY_PHRASE, 0.9, ["gas station"]),
+    *_rules('Transport', PRIORITY_KEYWORD, 0.8, ["taxi", "bus", "train", "transport", "fuel"]),
+    *_rules('Shopping', PRIORITY_MERCHANT, 0.95, ["h&m", "zara", "amazon", "nike", "adidas", "ikea"]),
+    *_rules('Shopping', PRIORITY_KEYWORD, 0.8, ["shopping", "store", "mall", "clothing"]),
+    *_rules('Entertainment', PRIORITY_MERCHANT, 0.95, ["netflix", "spotify", "disney+"]),
+    *_rules('Entertainment', PRIORITY_KEYWORD, 0.8, ["movie", "cinema", "theater", "concert"]),
+    *_rules('Utilities', PRIORITY_KEYWORD, 0.8, ["bill", "utility", "electricity", "water", "gas", "internet", "phone"]),
+    *_rules('Health', PRIORITY_KEYWORD, 0.8, ["pharmacy", "doctor", "health", "medical", "medicine", "gym", "dental"])
+]
+
+def load_rules_file(path: str) -> List[KeywordRule]:
+    """Read extra rules from a JSON list of {keyword, category, priority?, confidence?}"""
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+    return [KeywordRule(
+        keyword=str(entry['keyword']),
+        category=str(entry['category']),
+        priority=int(entry.get('priority', PRIORITY_KEYWORD)),
+        confidence=float(entry.get('confidence', 0.8))
+    ) for entry in entries]
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a rules table, matched case-insensitively"""
+
+    def __init__(self, rules: Sequence[KeywordRule] = DEFAULT_RULES):
+        # A later rule for the same keyword replaces an earlier one
+        by_keyword: Dict[str, KeywordRule] = {}
+        for rule in rules:
+            keyword = rule.keyword.strip().lower()
+            if keyword:
+                by_keyword[keyword] = rule._replace(keyword=keyword)
+        self.rules: List[KeywordRule] = list(by_keyword.values())
+        self._transitions, self._outputs = self._compile(self.rules)
+
+    @staticmethod
+    def _compile(rules: Sequence[KeywordRule]) -> Tuple[List[Dict[str, int]], List[Tuple[KeywordRule, ...]]]:
+        """Build the automaton as a full transition table (a DFA) plus per-state outputs"""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[KeywordRule]] = [[]]
+        for rule in rules:
+            state = 0
+            for char in rule.keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(rule)
+
+        # Breadth-first failure links, folded into the transitions so the
+        # scan never has to follow them
+        fail = [0] * len(goto)
+        transitions: List[Dict[str, int]] = [dict(goto[0])]
+        transitions.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fallback = transitions[fail[state]]
+            outputs[state].extend(outputs[fail[state]])
+            transitions[state] = dict(fallback)
+            for char, next_state in goto[state].items():
+                fail[next_state] = fallback.get(char, 0)
+                transitions[state][char] = next_state
+                queue.append(next_state)
+        return transitions, [tuple(output) for output in outputs]
+
+    def find_all(self, description: str) -> List[Tuple[int, KeywordRule]]:
+        """(start offset, rule) for every keyword occurring as a whole word or its plural"""
+        text = description.lower()
+        transitions, outputs = self._transitions, self._outputs
+        matches = []
+        state = 0
+        for end, char in enumerate(text):
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                for rule in outputs[state]:
+                    start = end - len(rule.keyword) + 1
+                    if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(rule.keyword[0]):
+                        continue
+                    if end + 1 < len(text) and _is_word_char(text[end + 1]) and _is_word_char(rule.keyword[-1]):
+                        suffix_end = end + 1
+                        while suffix_end < len(text) and _is_word_char(text[suffix_end]):
+                            suffix_end += 1
+                        if text[end + 1:suffix_end] not in PLURAL_SUFFIXES:
+                            continue
+                    matches.append((start, rule))
+        return matches
+
+    def match(self, description: str) -> Optional[KeywordMatch]:
+        """The winning rule for a description, or None if no keyword occurs"""
+        best: Optional[Tuple[int, int, int]] = None
+        best_rule: Optional[KeywordRule] = None
+        categories_at_best_priority = set()
+        for start, rule in self.find_all(description):
+            key = (rule.priority, len(rule.keyword), -start)
+            if best is None or rule.priority > best[0]:
+                categories_at_best_priority = {rule.category}
+            elif rule.priority == best[0]:
+                categories_at_best_priority.add(rule.category)
+            if best is None or key > best:
+                best, best_rule = key, rule
+        if best_rule is None:
+            return None
+        return KeywordMatch(best_rule, len(categories_at_best_priority) > 1)
+
+    def preclassify(self, description: str, min_priority: int = PRECLASSIFY_MIN_PRIORITY) -> Optional[KeywordRule]:
+        """A rule decisive enough to skip the ML model, if there is one"""
+        found = self.match(description)
+        if found is None or found.ambiguous or found.rule.priority < min_priority:
+            return None
+        return found.rule
+
+    def with_rules(self, rules: Iterable[KeywordRule]) -> 'KeywordMatcher':
+        """A new matcher with extra rules, which override same-keyword rules here"""
+        return KeywordMatcher([*self.rules, *rules])
+
+def default_matcher() -> KeywordMatcher:
+    """DEFAULT_RULES plus any rules from KEYWORD_RULES_FILE"""
+    rules = list(DEFAULT_RULES)
+    if KEYWORD_RULES_FILE:
+        try:
+            rules.extend(load_rules_file(KEYWORD_RULES_FILE))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring keyword rules file %s: %s", KEYWORD_RULES_FILE, e)
+    return KeywordMatcher(rules)
@@ -0,0 +1,51 @@
+"""Deferred imports for heavy libraries.
+
+pandas, scipy, statsmodels and scikit-learn together take well over a second
+to import, which would otherwise be paid by every worker before it can serve
+its first request. lazy_import() returns a stand-in that imports the real
+module the first time one of its attributes is used, so that cost moves to
+the first request that actually needs forecasting, pattern analysis or
+classification.
+"""
+import importlib
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, Optional
+
+# Seconds spent importing each lazily loaded module, in load order
+load_times: Dict[str, float] = {}
+
+class LazyModule(ModuleType):
+    """Module proxy that imports its target on first attribute access"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._lazy_module: Optional[ModuleType] = None
+        self._lazy_lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self._lazy_module
+        if module is None:
+            with self._lazy_lock:
+                module = self._lazy_module
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    load_times[self.__name__] = time.perf_counter() - start
+                    self._lazy_module = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._lazy_module is not None
+
+def lazy_import(name: str) -> Any:
+    """Return a proxy for module `name` that is imported on first use"""
+    return LazyModule(name)
@@ -0,0 +1,78 @@
+"""Application logging setup.
+
+Request handlers log through the standard logging module instead of print().
+Records below the configured level are discarded before any message
+formatting happens. Records that pass go onto an in-memory queue, and a
+background listener thread does the actual stream writes, so a slow stdout
+never blocks a request. DEBUG records can additionally be sampled to keep
+per-document tracing affordable when it is switched on in production.
+
+Environment:
+    LOG_LEVEL               minimum level, default INFO
+    LOG_DEBUG_SAMPLE_RATE   fraction of DEBUG records kept, default 1.0
+"""
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+_listener: Optional[QueueListener] = None
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of DEBUG records; higher levels always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+def configure_logging(level: Optional[str] = None, debug_sample_rate: Optional[float] = None,
+                      stream=None) -> QueueListener:
+    """Route the root logger through a queue drained by a background thread.
+
+    Safe to call more than once; later calls replace the previous setup.
+    """
+    global _listener
+
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    if debug_sample_rate is None:
+        debug_sample_rate = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1.0'))
+
+    if _listener is not None:
+        _listener.stop()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(debug_sample_rate))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
@@ -2,8 +2,14 @@ from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from database import Base, engine, get_db
 from routers import auth, expenses, categories
-from config import settings
+from config import check_secret_key, settings
 from sqlalchemy.orm import Session
+from logging_config import configure_logging
+
+configure_logging()
+
+# Bearer tokens are the routers' only authentication; do not start with a forgeable key
+check_secret_key(settings.SECRET_KEY)
 
 # Create FastAPI app
 app = FastAPI(title="Financial Advisor API")
@@ -20,6 +26,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Create database tables
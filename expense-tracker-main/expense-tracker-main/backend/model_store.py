@@ -0,0 +1,172 @@
+"""Versioned on-disk store for trained ML models.
+
+Models are dumped uncompressed so that numpy arrays inside them can be
+memory-mapped on load, which lets every worker process share the same
+page-cached bytes instead of holding a private copy. Each artifact is
+written under a content-addressed file name and described by a small JSON
+manifest holding its SHA-256 and training metadata; the manifest is swapped
+atomically so readers never see a half-written model. Versions the
+manifest no longer points to are deleted after each swap; processes that
+already memory-mapped one keep reading it until they unmap it.
+
+Usage:
+    python model_store.py train     # train and publish the category model
+    python model_store.py verify    # check the published artifact
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from lazy_imports import lazy_import
+
+joblib = lazy_import('joblib')
+logger = logging.getLogger(__name__)
+
+MODEL_STORE_DIR = os.getenv(
+    'MODEL_STORE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artifacts')
+)
+CATEGORY_MODEL_NAME = 'category_model'
+
+def file_sha256(path: str) -> str:
+    """Compute the SHA-256 of a file without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def training_data_fingerprint(training_data: Sequence[Tuple[str, str]]) -> str:
+    """Hash labelled training data so a model can be tied to the data it was fitted on"""
+    digest = hashlib.sha256()
+    for description, category in training_data:
+        digest.update(description.encode('utf-8'))
+        digest.update(b'\x1f')
+        digest.update(category.encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+def manifest_path(name: str, store_dir: str = MODEL_STORE_DIR) -> str:
+    """Path of the manifest describing the current version of a model"""
+    return os.path.join(store_dir, f'{name}.json')
+
+def read_manifest(name: str, store_dir: str = MODEL_STORE_DIR) -> Optional[Dict[str, Any]]:
+    """Read a model manifest, returning None when the model was never published"""
+    try:
+        with open(manifest_path(name, store_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_model(model: Any, name: str, metadata: Optional[Dict[str, Any]] = None,
+               store_dir: str = MODEL_STORE_DIR) -> Dict[str, Any]:
+    """Persist a model under a content-addressed file name and publish its manifest"""
+    os.makedirs(store_dir, exist_ok=True)
+
+    tmp_path = os.path.join(store_dir, f'.{name}.{os.getpid()}.tmp')
+    joblib.dump(model, tmp_path, compress=0)
+    sha256 = file_sha256(tmp_path)
+    version = sha256[:12]
+    artifact = f'{name}-{version}.joblib'
+    os.replace(tmp_path, os.path.join(store_dir, artifact))
+
+    manifest = dict(metadata or {})
+    manifest.update({
+        'name': name,
+        'version': version,
+        'artifact': artifact,
+        'sha256': sha256,
+        'created_at': datetime.utcnow().isoformat()
+    })
+
+    tmp_manifest = manifest_path(name, store_dir) + f'.{os.getpid()}.tmp'
+    with open(tmp_manifest, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_manifest, manifest_path(name, store_dir))
+    prune_artifacts(name, store_dir)
+    return manifest
+
+def prune_artifacts(name: str, store_dir: str = MODEL_STORE_DIR) -> int:
+    """Delete versions of a model older than the one its manifest points to.
+
+    Only older files go: a newer one may belong to a concurrent save_model
+    that has not swapped the manifest in yet. Returns how many were deleted.
+    """
+    manifest = read_manifest(name, store_dir)
+    if manifest is None:
+        return 0
+    try:
+        current_mtime = os.stat(os.path.join(store_dir, manifest['artifact'])).st_mtime
+    except (OSError, KeyError):
+        return 0
+
+    pattern = re.compile(re.escape(name) + r'-[0-9a-f]{12}\.joblib')
+    removed = 0
+    for entry in os.scandir(store_dir):
+        if entry.name == manifest['artifact'] or not pattern.fullmatch(entry.name):
+            continue
+        try:
+            if entry.stat().st_mtime < current_mtime:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            # Already removed by another process pruning the same store
+            pass
+    return removed
+
+def load_model(name: str, expected_metadata: Optional[Dict[str, Any]] = None,
+               store_dir: str = MODEL_STORE_DIR, mmap: bool = True) -> Optional[Any]:
+    """Load the published version of a model.
+
+    Returns None when there is no artifact, its bytes do not match the hash in
+    the manifest, or the manifest metadata differs from expected_metadata, so
+    callers can fall back to retraining.
+    """
+    manifest = read_manifest(name, store_dir)
+    if manifest is None:
+        return None
+
+    for key, value in (expected_metadata or {}).items():
+        if manifest.get(key) != value:
+            logger.warning("Model '%s' is stale: %s changed, ignoring artifact %s", name, key, manifest.get('version'))
+            return None
+
+    path = os.path.join(store_dir, manifest.get('artifact', ''))
+    try:
+        if file_sha256(path) != manifest.get('sha256'):
+            logger.warning("Model '%s' failed hash verification, ignoring artifact %s", name, manifest.get('version'))
+            return None
+        return joblib.load(path, mmap_mode='r' if mmap else None)
+    except Exception as e:
+        logger.exception("Error loading model '%s': %s", name, e)
+        return None
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Train and publish ML model artifacts')
+    parser.add_argument('command', choices=['train', 'verify'])
+    parser.add_argument('--store-dir', default=MODEL_STORE_DIR)
+    args = parser.parse_args(argv)
+
+    from ai_module import ExpenseAI, category_model_metadata
+
+    if args.command == 'train':
+        model = ExpenseAI._train_category_model()
+        manifest = save_model(model, CATEGORY_MODEL_NAME, category_model_metadata(), args.store_dir)
+        print(f"Published {manifest['artifact']} (sha256 {manifest['sha256']})")
+        return 0
+
+    model = load_model(CATEGORY_MODEL_NAME, category_model_metadata(), args.store_dir)
+    if model is None:
+        print('No valid category model artifact found')
+        return 1
+    print(f"Category model {read_manifest(CATEGORY_MODEL_NAME, args.store_dir)['version']} is valid")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
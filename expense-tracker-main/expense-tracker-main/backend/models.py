@@ -0,0 +1,50 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
+from database import Base
+
+class User(Base):
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String, unique=True, index=True, nullable=False)
+    hashed_password = Column(String, nullable=False)
+    full_name = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    categories = relationship("Category", back_populates="user")
+    expenses = relationship("Expense", back_populates="user")
+
+class Category(Base):
+    __tablename__ = "categories"
+    __table_args__ = (
+        # Serves the per-user listing and the duplicate-name checks
+        Index("uq_categories_user_id_name", "user_id", "name", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    description = Column(String)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    user = relationship("User", back_populates="categories")
+    expenses = relationship("Expense", back_populates="category")
+
+class Expense(Base):
+    __tablename__ = "expenses"
+    __table_args__ = (
+        # Listings filter on the user and page/range over date
+        Index("ix_expenses_user_id_date", "user_id", "date"),
+        # Category membership checks are always scoped to the owner
+        Index("ix_expenses_user_id_category_id", "user_id", "category_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    amount = Column(Float, nullable=False)
+    description = Column(String)
+    date = Column(DateTime, nullable=False, default=datetime.utcnow)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    user = relationship("User", back_populates="expenses")
+    category = relationship("Category", back_populates="expenses")
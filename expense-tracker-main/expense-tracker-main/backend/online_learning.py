@@ -0,0 +1,199 @@
+"""Incremental training for the category classifier.
+
+The default classifier is a TF-IDF pipeline fitted once on TRAINING_DATA;
+its vocabulary is fixed at fit time, so absorbing user corrections means a
+full retrain. The online model swaps TF-IDF for a HashingVectorizer, which
+has no vocabulary and a fixed memory footprint, in front of a MultinomialNB
+updated with partial_fit.
+
+OnlineCategoryLearner queues confirmed (description, category) pairs and a
+background thread trains on them in mini-batches. Each batch is applied to
+a copy of the classifier that is then swapped in, so predictions never wait
+on training and never see a half-updated model. Every few batches the model
+is snapshotted through model_store and reloaded from there on restart.
+
+Each server process runs its own learner on the confirmations it handles
+itself. They all snapshot under the same model name, and the last one to
+write wins: a restarted process resumes from that snapshot and loses what
+the other processes learned since their own last snapshots. Serving with a
+single worker process avoids this. model_store deletes superseded snapshot
+files, so disk use stays at one artifact.
+"""
+import copy
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import model_store
+from lazy_imports import lazy_import
+
+sklearn_text = lazy_import('sklearn.feature_extraction.text')
+sklearn_naive_bayes = lazy_import('sklearn.naive_bayes')
+sklearn_pipeline = lazy_import('sklearn.pipeline')
+scipy_sparse = lazy_import('scipy.sparse')
+
+logger = logging.getLogger(__name__)
+
+ONLINE_CATEGORY_MODEL_NAME = 'category_model_online'
+
+# Columns of the hashed feature space; memory is fixed at this times the
+# number of categories, however many distinct words users type
+HASH_FEATURES = int(os.getenv('ONLINE_HASH_FEATURES', str(2 ** 16)))
+
+def _vectorizer() -> Any:
+    # MultinomialNB needs non-negative features, hence alternate_sign=False
+    return sklearn_text.HashingVectorizer(n_features=HASH_FEATURES, alternate_sign=False)
+
+def build_online_model(training_data: Sequence[Tuple[str, str]], classes: Sequence[str]) -> Any:
+    """Hashing + Naive Bayes pipeline seeded with the labelled examples"""
+    model = sklearn_pipeline.Pipeline([
+        ('hashing', _vectorizer()),
+        ('clf', sklearn_naive_bayes.MultinomialNB(alpha=0.1))
+    ])
+    descriptions = [description for description, _ in training_data]
+    labels = [category for _, category in training_data]
+    model.named_steps['clf'].partial_fit(
+        model.named_steps['hashing'].transform(descriptions), labels, classes=sorted(set(classes))
+    )
+    return model
+
+def with_classes(model: Any, classes: Sequence[str]) -> Any:
+    """Copy of a fitted online model that also accepts new category labels
+
+    partial_fit fixes the label set on its first call, so the learned counts
+    are replayed into a fresh classifier: one weighted row per old class
+    whose features are that class's mean, weighted by its sample count.
+    """
+    old = model.named_steps['clf']
+    counts = old.class_count_
+    means = np.divide(old.feature_count_, counts[:, None], out=np.zeros_like(old.feature_count_),
+                      where=counts[:, None] > 0)
+    clf = sklearn_naive_bayes.MultinomialNB(alpha=old.alpha)
+    clf.partial_fit(scipy_sparse.csr_matrix(means), old.classes_,
+                    classes=sorted(set(classes) | set(old.classes_)), sample_weight=counts)
+    return sklearn_pipeline.Pipeline([('hashing', model.named_steps['hashing']), ('clf', clf)])
+
+class OnlineCategoryLearner:
+    """Streams confirmed labels into an online category model"""
+
+    def __init__(self, model: Any, batch_size: int = 32, flush_interval: float = 5.0,
+                 snapshot_every: int = 10, metadata: Optional[Dict[str, Any]] = None,
+                 store_dir: str = model_store.MODEL_STORE_DIR, background: bool = True):
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self.metadata = metadata or {}
+        self.store_dir = store_dir
+        self._pending: List[Tuple[str, str]] = []
+        self._condition = threading.Condition()
+        # Serializes training so batches apply one after another
+        self._train_lock = threading.Lock()
+        self._closed = False
+        # Trained since the last snapshot
+        self._dirty = False
+        self.samples_seen = 0
+        self.batches = 0
+        self.snapshots = 0
+        self._worker: Optional[threading.Thread] = None
+        if background:
+            self._worker = threading.Thread(target=self._run, name='category-learner', daemon=True)
+            self._worker.start()
+
+    def observe(self, samples: Iterable[Tuple[str, str]]) -> int:
+        """Queue (description, category) pairs for the next mini-batch"""
+        samples = [(str(description), str(category)) for description, category in samples]
+        if not samples:
+            return 0
+        with self._condition:
+            self._pending.extend(samples)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+        return len(samples)
+
+    def _take_batch(self) -> List[Tuple[str, str]]:
+        batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if len(self._pending) < self.batch_size and not self._closed:
+                    # A partial batch is trained after flush_interval anyway
+                    self._condition.wait(self.flush_interval)
+                if self._closed:
+                    return
+                batch = self._take_batch()
+            if batch:
+                try:
+                    self.train(batch)
+                except Exception as e:
+                    logger.exception("Online category update failed: %s", e)
+
+    def train(self, batch: Sequence[Tuple[str, str]]) -> None:
+        """Apply one mini-batch to a copy of the model and swap it in"""
+        descriptions = [description for description, _ in batch]
+        labels = [category for _, category in batch]
+        with self._train_lock:
+            current = self.model
+            new_labels = set(labels) - set(current.classes_)
+            if new_labels:
+                model = with_classes(current, list(new_labels))
+            else:
+                model = sklearn_pipeline.Pipeline([
+                    ('hashing', current.named_steps['hashing']),
+                    ('clf', copy.deepcopy(current.named_steps['clf']))
+                ])
+            model.named_steps['clf'].partial_fit(model.named_steps['hashing'].transform(descriptions), labels)
+            self.model = model
+            self.samples_seen += len(batch)
+            self.batches += 1
+            self._dirty = True
+            if self.snapshot_every and self.batches % self.snapshot_every == 0:
+                self.snapshot()
+
+    def flush(self) -> int:
+        """Train on everything queued now; returns how many samples were applied"""
+        applied = 0
+        while True:
+            with self._condition:
+                batch = self._take_batch()
+            if not batch:
+                return applied
+            self.train(batch)
+            applied += len(batch)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Publish the current model through the model store"""
+        start = time.perf_counter()
+        manifest = model_store.save_model(self.model, ONLINE_CATEGORY_MODEL_NAME, self.metadata, self.store_dir)
+        self.snapshots += 1
+        self._dirty = False
+        logger.info("Snapshotted online category model %s after %d samples in %.0f ms",
+                    manifest['version'], self.samples_seen, (time.perf_counter() - start) * 1000)
+        return manifest
+
+    def close(self) -> None:
+        """Stop the background thread, train on what is queued and snapshot"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._worker is not None:
+            self._worker.join()
+        self.flush()
+        if self._dirty:
+            self.snapshot()
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            pending = len(self._pending)
+        return {
+            'pending': pending,
+            'samples_seen': self.samples_seen,
+            'batches': self.batches,
+            'snapshots': self.snapshots
+        }
@@ -0,0 +1,34 @@
+"""Process pools for the forecast and category inference workers.
+
+Workers are spawned rather than forked: the parent holds threads and gRPC
+channels that do not survive a fork. A spawned worker only imports the
+module its task function lives in (plus the main script, which app.py
+guards against), so task functions belong in side-effect-free modules such
+as forecast_engines and inference_pool, never in app.py.
+
+ProcessPoolExecutor cannot cancel a call once a worker has started it, so a
+hung task would hold its worker until the process exits.
+terminate_executor kills the workers instead, and callers start a fresh pool.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+def spawn_executor(workers: int, initializer: Optional[Callable[..., None]] = None,
+                   initargs: Tuple[Any, ...] = ()) -> ProcessPoolExecutor:
+    """Process pool whose workers are started with the spawn method"""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=initializer,
+        initargs=initargs
+    )
+
+def terminate_executor(executor: ProcessPoolExecutor) -> None:
+    """Shut a pool down without waiting, killing workers stuck in a task"""
+    # _processes is the only handle on the workers before Python 3.14's terminate_workers()
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
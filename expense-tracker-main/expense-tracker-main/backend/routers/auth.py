@@ -1,16 +1,28 @@
 from fastapi import APIRouter, HTTPException, status, Form, Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, get_db
 from models import User
 from passlib.context import CryptContext
+from auth_tokens import create_access_token, decode_access_token
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import jwt
 import logging
+import os
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# bcrypt releases the GIL, so a few threads give real parallelism; the bound
+# keeps a burst of logins from starving the rest of the server of CPU
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+password_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='bcrypt')
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -18,6 +30,63 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bcrypt pool, keeping the event loop free"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_pool, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the bcrypt pool, keeping the event loop free"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_pool, get_password_hash, password)
+
+def _get_user_by_email(db: Session, email: str):
+    user = db.query(User).filter(User.email == email).first()
+    # Hand the connection back before the slow password work; requests
+    # queued on an exhausted pool would otherwise hold every threadpool
+    # slot that the connection owners need to finish
+    db.close()
+    return user
+
+def _add_user(db: Session, user: User) -> None:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+) -> int:
+    """User id from a bearer token issued by /login, without touching the database"""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        claims = decode_access_token(credentials.credentials)
+    except jwt.InvalidTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return int(claims["sub"])
+
+async def get_current_user(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Resolve the user from a bearer token issued by /login"""
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return user
+
 @router.post("/register")
 async def register(
     email: str = Form(...),
@@ -26,18 +95,16 @@ async def register(
     db: Session = Depends(get_db)
 ):
     # Check if user already exists
-    if db.query(User).filter(User.email == email).first():
+    if await run_in_threadpool(_get_user_by_email, db, email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Create new user
-    hashed_password = get_password_hash(password)
+    hashed_password = await get_password_hash_async(password)
     user = User(email=email, hashed_password=hashed_password, full_name=full_name)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    await run_in_threadpool(_add_user, db, user)
     
     return {"message": "User created successfully"}
 
@@ -47,11 +114,11 @@ async def login(
     password: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    logger.debug(f"Login attempt for email: {email}")
+    logger.debug("Login attempt for email: %s", email)
     
     # Find user by email
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+    user = await run_in_threadpool(_get_user_by_email, db, email)
+    if not user or not await verify_password_async(password, user.hashed_password):
         logger.debug("Login failed - incorrect credentials")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -60,6 +127,8 @@ async def login(
     
     logger.debug("Login successful")
     return {
+        "access_token": create_access_token(user.id, user.email),
+        "token_type": "bearer",
         "user": {
             "id": user.id,
             "email": user.email,
@@ -1,38 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form
-from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
-from models import User, Category
-from routers.auth import verify_password
+from fastapi import APIRouter, Depends, HTTPException, status, Form, Query
+from sqlalchemy import and_, delete, exists, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from database import get_async_db
+from models import User, Category, Expense
+from routers.auth import get_current_user, get_current_user_id
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-def get_current_user(email: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)) -> User:
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+async def commit_category(db: AsyncSession) -> None:
+    """Commit, turning a lost race on the unique (user_id, name) index into a 400"""
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Category with this name already exists"
         )
-    return user
 
 @router.post("/")
 async def create_category(
     name: str = Form(...),
     description: str = Form(None),
-    email: str = Form(...),
-    password: str = Form(...),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    current_user = get_current_user(email, password, db)
-    
     # Check if category with same name exists for user
-    if db.query(Category).filter(
+    if (await db.execute(select(Category.id).where(
         Category.name == name,
         Category.user_id == current_user.id
-    ).first():
+    ))).first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Category with this name already exists"
@@ -44,32 +45,30 @@ async def create_category(
         user_id=current_user.id
     )
     db.add(category)
-    db.commit()
-    db.refresh(category)
+    await commit_category(db)
+    await db.refresh(category)
     return category
 
 @router.get("/")
 async def get_categories(
-    email: str = Form(...),
-    password: str = Form(...),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    current_user = get_current_user(email, password, db)
-    categories = db.query(Category).filter(Category.user_id == current_user.id).all()
+    categories = (await db.execute(
+        select(Category).where(Category.user_id == current_user.id)
+    )).scalars().all()
     return categories
 
 @router.get("/{category_id}")
 async def get_category(
     category_id: int,
-    email: str = Form(...),
-    password: str = Form(...),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    current_user = get_current_user(email, password, db)
-    category = db.query(Category).filter(
+    category = (await db.execute(select(Category).where(
         Category.id == category_id,
         Category.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -82,15 +81,13 @@ async def update_category(
     category_id: int,
     name: str = Form(...),
     description: str = Form(None),
-    email: str = Form(...),
-    password: str = Form(...),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    current_user = get_current_user(email, password, db)
-    category = db.query(Category).filter(
+    category = (await db.execute(select(Category).where(
         Category.id == category_id,
         Category.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -98,11 +95,11 @@ async def update_category(
         )
     
     # Check if new name conflicts with existing category
-    existing_category = db.query(Category).filter(
+    existing_category = (await db.execute(select(Category.id).where(
         Category.name == name,
         Category.user_id == current_user.id,
         Category.id != category_id
-    ).first()
+    ))).first()
     if existing_category:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -112,35 +109,67 @@ async def update_category(
     category.name = name
     category.description = description
     
-    db.commit()
-    db.refresh(category)
+    await commit_category(db)
+    await db.refresh(category)
     return category
 
 @router.delete("/{category_id}")
 async def delete_category(
     category_id: int,
-    email: str = Form(...),
-    password: str = Form(...),
-    db: Session = Depends(get_db)
+    reassign_to: Optional[int] = Query(None, description="Category to move this category's expenses to before deleting it"),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    current_user = get_current_user(email, password, db)
-    category = db.query(Category).filter(
+    reassigned = 0
+    if reassign_to is not None:
+        if reassign_to == category_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot reassign expenses to the category being deleted"
+            )
+        target = (await db.execute(select(Category.id).where(
+            Category.id == reassign_to,
+            Category.user_id == user_id
+        ))).first()
+        if not target:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Target category not found"
+            )
+        # One set-based UPDATE, however many expenses the category holds
+        result = await db.execute(update(Expense.__table__).where(
+            Expense.user_id == user_id,
+            Expense.category_id == category_id
+        ).values(category_id=reassign_to))
+        reassigned = result.rowcount
+
+    # The emptiness check is an EXISTS inside the DELETE itself, so no
+    # expense rows are loaded and none can slip in between check and delete
+    has_expenses = exists().where(and_(
+        Expense.user_id == user_id,
+        Expense.category_id == Category.id
+    ))
+    deleted = (await db.execute(delete(Category.__table__).where(
         Category.id == category_id,
-        Category.user_id == current_user.id
-    ).first()
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Category not found"
-        )
-    
-    # Check if category has associated expenses
-    if category.expenses:
+        Category.user_id == user_id,
+        ~has_expenses
+    ).returning(Category.id))).first()
+
+    if not deleted:
+        await db.rollback()
+        found = (await db.execute(select(Category.id).where(
+            Category.id == category_id,
+            Category.user_id == user_id
+        ))).first()
+        if not found:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete category with associated expenses"
         )
-    
-    db.delete(category)
-    db.commit()
-    return {"message": "Category deleted successfully"} 
\ No newline at end of file
+
+    await db.commit()
+    return {"message": "Category deleted successfully", "reassigned_expenses": reassigned}
@@ -1,23 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Form, Query, Response
+from sqlalchemy import and_, exists, insert, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import datetime
-from database import get_db
+from database import get_async_db
 from models import User, Expense, Category
-from routers.auth import verify_password
+from routers.auth import get_current_user, get_current_user_id
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-def get_current_user(email: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)) -> User:
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password"
-        )
-    return user
+MAX_PAGE_SIZE = 1000
+EXPENSE_FIELDS = ('id', 'amount', 'description', 'date', 'category_id', 'user_id')
+
+def owned_category(category_id: int, user_id: int):
+    return and_(Category.id == category_id, Category.user_id == user_id)
 
 @router.post("/")
 async def create_expense(
@@ -25,57 +23,102 @@ async def create_expense(
     description: str = Form(...),
     date: datetime = Form(...),
     category_id: int = Form(...),
-    email: str = Form(...),
-    password: str = Form(...),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    current_user = get_current_user(email, password, db)
-    
-    # Verify category exists and belongs to user
-    category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == current_user.id
-    ).first()
-    if not category:
+    # INSERT ... SELECT FROM categories inserts nothing unless the category
+    # belongs to the user, and RETURNING hands back the row in the same trip
+    values = select(
+        literal(amount, Expense.amount.type),
+        literal(description, Expense.description.type),
+        literal(date, Expense.date.type),
+        Category.id,
+        Category.user_id
+    ).where(owned_category(category_id, user_id))
+    statement = insert(Expense.__table__).from_select(
+        ['amount', 'description', 'date', 'category_id', 'user_id'], values
+    ).returning(*Expense.__table__.c)
+
+    expense = (await db.execute(statement)).first()
+    if not expense:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
-    
-    expense = Expense(
-        amount=amount,
-        description=description,
-        date=date,
-        category_id=category_id,
-        user_id=current_user.id
-    )
-    db.add(expense)
-    db.commit()
-    db.refresh(expense)
-    return expense
+    await db.commit()
+    return expense._asdict()
 
 @router.get("/")
 async def get_expenses(
-    email: str = Form(...),
-    password: str = Form(...),
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    start_after: Optional[int] = Query(None, description="Expense id of the last item of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    current_user = get_current_user(email, password, db)
-    expenses = db.query(Expense).filter(Expense.user_id == current_user.id).all()
+    columns = None
+    if fields:
+        selected = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in selected if field not in EXPENSE_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        # The id is always needed to build the next cursor
+        columns = [Expense.id] + [getattr(Expense, field) for field in selected if field != 'id']
+
+    query = select(*columns) if columns else select(Expense)
+    query = query.where(Expense.user_id == current_user.id)
+    if start_date is not None:
+        query = query.where(Expense.date >= start_date)
+    if end_date is not None:
+        query = query.where(Expense.date <= end_date)
+
+    if limit is not None or start_after is not None:
+        # Keyset pagination ordered by date, with the id breaking ties
+        if start_after is not None:
+            cursor = (await db.execute(select(Expense.date).where(
+                Expense.id == start_after,
+                Expense.user_id == current_user.id
+            ))).first()
+            if not cursor:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid start_after cursor"
+                )
+            query = query.where(or_(
+                Expense.date > cursor.date,
+                and_(Expense.date == cursor.date, Expense.id > start_after)
+            ))
+        query = query.order_by(Expense.date, Expense.id)
+        if limit is not None:
+            query = query.limit(limit)
+
+    result = await db.execute(query)
+    if columns:
+        expenses = [row._asdict() for row in result]
+    else:
+        expenses = result.scalars().all()
+
+    if limit is not None and len(expenses) == limit:
+        last = expenses[-1]
+        response.headers["X-Next-Cursor"] = str(last["id"] if columns else last.id)
     return expenses
 
 @router.get("/{expense_id}")
 async def get_expense(
     expense_id: int,
-    email: str = Form(...),
-    password: str = Form(...),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    current_user = get_current_user(email, password, db)
-    expense = db.query(Expense).filter(
+    expense = (await db.execute(select(Expense).where(
         Expense.id == expense_id,
         Expense.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     if not expense:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,59 +133,52 @@ async def update_expense(
     description: str = Form(...),
     date: datetime = Form(...),
     category_id: int = Form(...),
-    email: str = Form(...),
-    password: str = Form(...),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    current_user = get_current_user(email, password, db)
-    expense = db.query(Expense).filter(
+    # Ownership of both the expense and the target category is checked by
+    # the UPDATE itself
+    statement = update(Expense.__table__).where(
         Expense.id == expense_id,
-        Expense.user_id == current_user.id
-    ).first()
+        Expense.user_id == user_id,
+        exists().where(owned_category(category_id, user_id))
+    ).values(
+        amount=amount,
+        description=description,
+        date=date,
+        category_id=category_id
+    ).returning(*Expense.__table__.c)
+
+    expense = (await db.execute(statement)).first()
     if not expense:
+        # Nothing matched; only now find out which check failed
+        found = (await db.execute(select(Expense.id).where(
+            Expense.id == expense_id,
+            Expense.user_id == user_id
+        ))).first()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Expense not found"
-        )
-    
-    # Verify category exists and belongs to user
-    category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == current_user.id
-    ).first()
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Category not found"
+            detail="Category not found" if found else "Expense not found"
         )
-    
-    expense.amount = amount
-    expense.description = description
-    expense.date = date
-    expense.category_id = category_id
-    
-    db.commit()
-    db.refresh(expense)
-    return expense
+    await db.commit()
+    return expense._asdict()
 
 @router.delete("/{expense_id}")
 async def delete_expense(
     expense_id: int,
-    email: str = Form(...),
-    password: str = Form(...),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    current_user = get_current_user(email, password, db)
-    expense = db.query(Expense).filter(
+    expense = (await db.execute(select(Expense).where(
         Expense.id == expense_id,
         Expense.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     if not expense:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Expense not found"
         )
     
-    db.delete(expense)
-    db.commit()
+    await db.delete(expense)
+    await db.commit()
     return {"message": "Expense deleted successfully"} 
\ No newline at end of file
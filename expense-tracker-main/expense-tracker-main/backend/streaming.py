@@ -0,0 +1,56 @@
+"""Incremental JSON encoders for export-sized listings.
+
+Building the full list and then calling jsonify holds the documents and
+their serialized form in memory at once. These generators encode documents
+one at a time as they arrive from Firestore, so the first bytes go out
+immediately and memory stays flat however large the export is.
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+# Coalesce small documents into writes of roughly this many bytes
+STREAM_BUFFER_SIZE = 16 * 1024
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'json-stream': 'application/json'
+}
+
+def _buffered(pieces: Iterable[str], buffer_size: int) -> Iterator[str]:
+    """Join small pieces into larger chunks, flushing the first one right away"""
+    buffer = []
+    size = 0
+    first = True
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if first or size >= buffer_size:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+            first = False
+    if buffer:
+        yield ''.join(buffer)
+
+def ndjson_stream(documents: Iterable[Dict[str, Any]], dumps: Callable[[Any], str],
+                  buffer_size: int = STREAM_BUFFER_SIZE) -> Iterator[str]:
+    """Encode documents as newline-delimited JSON"""
+    return _buffered((dumps(document) + '\n' for document in documents), buffer_size)
+
+def json_array_stream(documents: Iterable[Dict[str, Any]], dumps: Callable[[Any], str],
+                      buffer_size: int = STREAM_BUFFER_SIZE) -> Iterator[str]:
+    """Encode documents as a single JSON array, one element at a time"""
+    def pieces() -> Iterator[str]:
+        yield '['
+        separator = ''
+        for document in documents:
+            yield separator + dumps(document)
+            separator = ','
+        yield ']'
+    return _buffered(pieces(), buffer_size)
+
+def encode_stream(stream_format: str, documents: Iterable[Dict[str, Any]],
+                  dumps: Callable[[Any], str]) -> Iterator[str]:
+    """Encode documents in one of STREAM_FORMATS"""
+    if stream_format == 'ndjson':
+        return ndjson_stream(documents, dumps)
+    return json_array_stream(documents, dumps)
@@ -0,0 +1,4 @@
+import os
+
+# Sign test tokens with a key long enough for HS256 instead of the config placeholder
+os.environ.setdefault('SECRET_KEY', 'test-secret-key-0123456789abcdef0123456789abcdef')
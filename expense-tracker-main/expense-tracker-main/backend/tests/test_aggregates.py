@@ -0,0 +1,111 @@
+import unittest
+from firebase_admin import firestore
+from aggregates import aggregate_update, insights_from_aggregate, rebuild_in_transaction, summarize_expenses
+
+class FakeSnapshot:
+    def __init__(self, data):
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return self._data
+
+class FakeDocument:
+    def __init__(self, db, key):
+        self.db = db
+        self.key = key
+
+    def get(self, transaction=None):
+        self.db.reads.append((self.key, transaction))
+        return FakeSnapshot(self.db.documents.get(self.key))
+
+class FakeQuery:
+    def __init__(self, db, collection, field, value):
+        self.matches = [
+            FakeSnapshot(data) for (name, _), data in db.documents.items()
+            if name == collection and data.get(field) == value
+        ]
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def document(self, document_id):
+        return FakeDocument(self.db, (self.name, document_id))
+
+    def where(self, field, op, value):
+        return FakeQuery(self.db, self.name, field, value)
+
+class FakeTransaction:
+    def __init__(self, db):
+        self.db = db
+        self.queries = 0
+
+    def get(self, query):
+        self.queries += 1
+        return iter(query.matches)
+
+    def set(self, ref, data):
+        self.db.documents[ref.key] = data
+
+class FakeDB:
+    def __init__(self, documents):
+        self.documents = dict(documents)
+        self.reads = []
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+class TestAggregates(unittest.TestCase):
+    def setUp(self):
+        self.expenses = [
+            {'amount': 40.0, 'category': 'Food', 'date': '2024-03-01'},
+            {'amount': 10.0, 'category': 'Food', 'date': '2024-03-11'},
+            {'amount': 30.0, 'category': 'Transport', 'date': '2024-03-05'},
+            {'amount': 5.0, 'category': 'Transport', 'date': 'invalid-date'}
+        ]
+
+    def test_summarize_expenses(self):
+        summary = summarize_expenses(self.expenses)
+        self.assertEqual(summary['count'], 4)
+        self.assertAlmostEqual(summary['total_amount'], 85.0)
+        self.assertEqual(summary['category_totals'], {'Food': 50.0, 'Transport': 35.0})
+        self.assertEqual(summary['max_date_ordinal'] - summary['min_date_ordinal'], 10)
+
+    def test_insights_from_aggregate(self):
+        insights = insights_from_aggregate(summarize_expenses(self.expenses))
+        self.assertEqual(insights['topCategory'], 'Food')
+        self.assertEqual(insights['topCategoryAmount'], 50.0)
+        self.assertAlmostEqual(insights['averageDailySpend'], 8.5)
+
+        # Test with no expenses
+        self.assertIsNone(insights_from_aggregate(summarize_expenses([])))
+
+    def test_aggregate_update_uses_transforms(self):
+        update = aggregate_update('user', self.expenses)
+        self.assertIsInstance(update['count'], firestore.Increment)
+        self.assertIsInstance(update['category_totals']['Food'], firestore.Increment)
+        self.assertIsInstance(update['min_date_ordinal'], firestore.Minimum)
+        self.assertIsInstance(update['max_date_ordinal'], firestore.Maximum)
+
+    def test_rebuild_in_transaction(self):
+        db = FakeDB({('expenses', str(i)): dict(expense, user_id='user') for i, expense in enumerate(self.expenses)})
+        db.documents[('expenses', 'other')] = {'amount': 99.0, 'category': 'Food', 'user_id': 'other'}
+        transaction = FakeTransaction(db)
+
+        aggregate = rebuild_in_transaction(transaction, db, 'user')
+        self.assertEqual(aggregate['count'], 4)
+        self.assertEqual(aggregate['category_totals'], {'Food': 50.0, 'Transport': 35.0})
+        # The aggregate document is read inside the transaction so concurrent Increments force a retry
+        self.assertEqual(db.reads, [(('user_aggregates', 'user'), transaction)])
+        self.assertEqual(db.documents[('user_aggregates', 'user')]['count'], 4)
+
+    def test_rebuild_only_if_missing(self):
+        db = FakeDB({('user_aggregates', 'user'): {'count': 7}, ('expenses', '1'): {'amount': 1.0, 'user_id': 'user'}})
+        transaction = FakeTransaction(db)
+        self.assertEqual(rebuild_in_transaction(transaction, db, 'user', only_if_missing=True), {'count': 7})
+        self.assertEqual(transaction.queries, 0)
+
+if __name__ == '__main__':
+    unittest.main()
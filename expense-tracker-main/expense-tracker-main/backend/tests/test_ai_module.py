@@ -1,7 +1,9 @@
 import unittest
-from ai_module import ExpenseAI, TRAINING_DATA
+from ai_module import AnalyticsPipeline, ExpenseAI, TRAINING_DATA
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import Future
+from flask import Flask, jsonify
 
 class TestExpenseAI(unittest.TestCase):
     def setUp(self):
@@ -36,6 +38,27 @@ class TestExpenseAI(unittest.TestCase):
         self.assertEqual(result['category'], 'Other')
         self.assertGreaterEqual(result['confidence'], 0.5)
 
+    def test_batch_category_prediction(self):
+        descriptions = [
+            'Grocery shopping at Carrefour',
+            'Uber ride to airport',
+            'Netflix subscription',
+            'Electricity bill',
+            'Gym membership'
+        ]
+
+        # Batch results must match the single-item payloads one for one
+        results = self.ai.predict_categories(descriptions)
+        self.assertEqual(len(results), len(descriptions))
+        for description, result in zip(descriptions, results):
+            single = self.ai.predict_category(description)
+            self.assertEqual(result['category'], single['category'])
+            self.assertAlmostEqual(result['confidence'], single['confidence'])
+            self.assertEqual(result['suggested_categories'], single['suggested_categories'])
+
+        # Test with empty batch
+        self.assertEqual(self.ai.predict_categories([]), [])
+
     def test_future_expense_prediction(self):
         # Test with sample data
         result = self.ai.predict_future_expenses(self.sample_expenses, days=7)
@@ -51,6 +74,57 @@ class TestExpenseAI(unittest.TestCase):
         result = self.ai.predict_future_expenses([], days=7)
         self.assertIn('error', result)
 
+    def test_future_expense_prediction_timeout_fallback(self):
+        # A fit that cannot finish in time falls back to the category average
+        ai = ExpenseAI(forecast_workers=1, forecast_timeout=0.001)
+        result = ai.predict_future_expenses(self.sample_expenses, days=7)
+
+        self.assertEqual(result['model_metrics']['fallback_categories'], ['Food'])
+        self.assertEqual(result['predictions'], [50.0] * 7)
+        self.assertEqual(len(result['confidence_intervals']), 7)
+        self.assertEqual(result['model_metrics']['engines'], {'Food': 'simple_average'})
+
+    def test_hung_forecast_fits_recycle_pool(self):
+        class HungPool:
+            shut_down = False
+
+            def submit(self, fn, *args):
+                future = Future()
+                future.set_running_or_notify_cancel()
+                return future
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                self.shut_down = True
+
+        ai = ExpenseAI(forecast_workers=1, forecast_timeout=0.5)
+        pool = ai._forecast_pool = HungPool()
+        transport = [dict(expense, category='Transport') for expense in self.sample_expenses]
+
+        start = datetime.now()
+        result = ai.predict_future_expenses(self.sample_expenses + transport, days=7)
+        elapsed = (datetime.now() - start).total_seconds()
+
+        # Both fits share one timeout window instead of waiting for each in turn
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual(result['model_metrics']['fallback_categories'], ['Food', 'Transport'])
+        # Workers stuck in a fit are killed and the next request gets a fresh pool
+        self.assertTrue(pool.shut_down)
+        self.assertIsNone(ai._forecast_pool)
+
+    def test_forecast_engine_selection(self):
+        # A short series gets a closed-form engine instead of ARIMA
+        short = [dict(expense, category='Transport') for expense in self.sample_expenses[:5]]
+        result = self.ai.predict_future_expenses(self.sample_expenses + short, days=7)
+
+        self.assertEqual(result['model_metrics']['engines'], {'Food': 'arima', 'Transport': 'moving_average'})
+        self.assertEqual(result['category_predictions']['Transport']['predictions'], [50.0] * 7)
+        self.assertNotIn('Transport', result['model_metrics']['aic'])
+
+        forced = ExpenseAI(forecast_workers=0, forecast_engine='holt')
+        result = forced.predict_future_expenses(self.sample_expenses, days=7)
+        self.assertEqual(result['model_metrics']['engines'], {'Food': 'holt'})
+        self.assertEqual(len(result['predictions']), 7)
+
     def test_spending_pattern_analysis(self):
         # Test with sample data
         result = self.ai.analyze_spending_patterns(self.sample_expenses)
@@ -86,6 +160,50 @@ class TestExpenseAI(unittest.TestCase):
         result = self.ai.process_chat_query('Any query', [])
         self.assertEqual(result['message'], 'No expenses found in your history.')
 
+    def test_chat_responses_serialize(self):
+        # /api/ai/chat returns these through jsonify, which needs string keys
+        app = Flask(__name__)
+        queries = ['What is my total spending?', 'Show me spending by category', 'What is my spending trend?', 'Any tips?']
+        with app.app_context():
+            for query in queries:
+                result = self.ai.process_chat_query(query, self.sample_expenses)
+                self.assertIsNotNone(jsonify(result).get_json())
+
+        result = self.ai.process_chat_query('What is my total spending?', self.sample_expenses)
+        month = datetime.now().strftime('%Y-%m')
+        self.assertIn(month, result['breakdown']['by_month'])
+
+    def test_anomalies_and_patterns(self):
+        expenses = self.sample_expenses + [
+            {'amount': 900.0, 'description': 'New laptop', 'category': 'Food', 'date': '2024-03-15'}
+        ]
+        anomalies = self.ai.detect_anomalies(expenses)
+        self.assertEqual([expense['description'] for expense in anomalies], ['New laptop'])
+
+        patterns = self.ai.identify_patterns(expenses)
+        self.assertIn('daily_pattern', patterns)
+        self.assertIn('weekly_pattern', patterns)
+        self.assertIn('monthly_pattern', patterns)
+
+        # Test with empty data
+        self.assertEqual(self.ai.detect_anomalies([]), [])
+        self.assertEqual(self.ai.identify_patterns([]), {})
+
+    def test_analytics_pipeline_shares_intermediates(self):
+        pipeline = AnalyticsPipeline(self.ai, self.sample_expenses)
+        result = pipeline.chat('Tell me about my spending')
+
+        # The analysis, anomalies and patterns reuse what the answer computed
+        timings = dict(pipeline.timings)
+        self.assertIs(result['analysis']['patterns'], pipeline.patterns)
+        self.assertIs(result['analysis']['unusual_spending'], pipeline.unusual_spending)
+        self.assertEqual(pipeline.timings, timings)
+        for stage in ('frame', 'daily_spending', 'resamples', 'category_totals', 'unusual_spending', 'trends', 'patterns'):
+            self.assertIn(stage, timings)
+
+        query = 'What is my spending trend?'
+        self.assertEqual(pipeline.chat(query), self.ai.process_chat_query(query, self.sample_expenses))
+
     def test_edge_cases(self):
         # Test with very large amounts
         large_expenses = [{'amount': 1000000.0, 'description': 'Large expense', 'category': 'Other', 'date': '2024-03-15'}]
@@ -112,5 +230,25 @@ class TestExpenseAI(unittest.TestCase):
         self.assertLess((end_time - start_time).total_seconds(), 5)  # Should complete within 5 seconds
         self.assertIn('total_spent', result)
 
+        # 1M rows: 100 distinct expenses (one planted outlier) repeated, so
+        # the z-scores and the flagged rows are known up front
+        base = [
+            {
+                'amount': 40.0 + i % 21,
+                'description': f'Expense {i}',
+                'category': ('Food', 'Transport')[i % 2],
+                'date': (datetime(2024, 1, 1) + timedelta(days=i)).strftime('%Y-%m-%d')
+            } for i in range(99)
+        ]
+        base.append({'amount': 500.0, 'description': 'Outlier', 'category': 'Food', 'date': '2024-01-01'})
+        large_dataset = base * 10000
+        start_time = datetime.now()
+        result = self.ai.analyze_spending_patterns(large_dataset)
+        end_time = datetime.now()
+
+        self.assertLess((end_time - start_time).total_seconds(), 30)
+        self.assertEqual(len(result['unusual_spending']), 10000)
+        self.assertTrue(all(expense['description'] == 'Outlier' for expense in result['unusual_spending']))
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,190 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from database import Base, async_database_url, get_async_db, get_db, make_async_engine
+from models import User
+from routers import auth, categories, expenses
+
+class APITestCase(unittest.TestCase):
+    """Runs the routers against a throwaway SQLite file through both engines"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_url = f"sqlite:///{os.path.join(tmp.name, 'test.db')}"
+
+        self.engine = engine = create_engine(db_url, connect_args={'check_same_thread': False})
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        self.async_engine = make_async_engine(db_url)
+        # Runs after the TestClient has shut down, closing the pooled aiosqlite connections
+        self.addCleanup(lambda: asyncio.run(self.async_engine.dispose()))
+        async_session_factory = async_sessionmaker(self.async_engine, expire_on_commit=False)
+
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        async def override_get_async_db():
+            async with async_session_factory() as db:
+                yield db
+
+        app = FastAPI()
+        app.include_router(auth.router, prefix='/api/auth')
+        app.include_router(expenses.router, prefix='/api/expenses')
+        app.include_router(categories.router, prefix='/api/categories')
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_async_db] = override_get_async_db
+
+        @app.get('/me')
+        async def me(current_user: User = Depends(auth.get_current_user)):
+            return {'email': current_user.email}
+
+        self.client = self.enterContext(TestClient(app))
+
+    def login(self, email='user@example.com', password='secret123'):
+        self.client.post('/api/auth/register', data={'email': email, 'password': password, 'full_name': 'Test User'})
+        token = self.client.post('/api/auth/login', data={'email': email, 'password': password}).json()['access_token']
+        return {'Authorization': f'Bearer {token}'}
+
+class TestAsyncDatabaseUrl(unittest.TestCase):
+    def test_swaps_in_async_driver(self):
+        self.assertEqual(async_database_url('sqlite:///./test.db'), 'sqlite+aiosqlite:///./test.db')
+        self.assertEqual(async_database_url('postgresql://u:p@db/app'), 'postgresql+asyncpg://u:p@db/app')
+        self.assertEqual(async_database_url('mssql+pyodbc://u:p@db/app'), 'mssql+aioodbc://u:p@db/app')
+        self.assertEqual(async_database_url('sqlite+aiosqlite:///x.db'), 'sqlite+aiosqlite:///x.db')
+
+    def test_rejects_backend_without_async_driver(self):
+        with self.assertRaises(ValueError):
+            async_database_url('oracle://u:p@db/app')
+
+class TestAuthRouter(APITestCase):
+    def test_register_login_and_bearer_auth(self):
+        credentials = {'email': 'user@example.com', 'password': 'secret123'}
+        response = self.client.post('/api/auth/register', data=dict(credentials, full_name='Test User'))
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post('/api/auth/register', data=dict(credentials, full_name='Test User'))
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/auth/login', data=dict(credentials, password='wrong'))
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post('/api/auth/login', data=credentials)
+        self.assertEqual(response.status_code, 200)
+        token = response.json()['access_token']
+
+        response = self.client.get('/me', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.json(), {'email': 'user@example.com'})
+
+        self.assertEqual(self.client.get('/me').status_code, 401)
+        self.assertEqual(self.client.get('/me', headers={'Authorization': 'Bearer junk'}).status_code, 401)
+
+class TestExpenseRouters(APITestCase):
+    def test_category_and_expense_lifecycle(self):
+        headers = self.login()
+
+        category = self.client.post('/api/categories/', data={'name': 'Food'}, headers=headers).json()
+        self.assertEqual(category['name'], 'Food')
+        duplicate = self.client.post('/api/categories/', data={'name': 'Food'}, headers=headers)
+        self.assertEqual(duplicate.status_code, 400)
+
+        for day in range(1, 6):
+            response = self.client.post('/api/expenses/', data={
+                'amount': day * 10,
+                'description': f'Lunch {day}',
+                'date': f'2024-01-0{day}T12:00:00',
+                'category_id': category['id']
+            }, headers=headers)
+            self.assertEqual(response.status_code, 200)
+
+        page = self.client.get('/api/expenses/', params={'limit': 2}, headers=headers)
+        self.assertEqual([e['amount'] for e in page.json()], [10, 20])
+        cursor = page.headers['X-Next-Cursor']
+
+        page = self.client.get('/api/expenses/', params={'limit': 2, 'start_after': cursor, 'fields': 'amount'}, headers=headers)
+        self.assertEqual(page.json(), [{'id': 3, 'amount': 30.0}, {'id': 4, 'amount': 40.0}])
+
+        response = self.client.delete(f"/api/categories/{category['id']}", headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+        for expense_id in range(1, 6):
+            self.assertEqual(self.client.delete(f'/api/expenses/{expense_id}', headers=headers).status_code, 200)
+        response = self.client.delete(f"/api/categories/{category['id']}", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/categories/', headers=headers).json(), [])
+
+    def test_update_expense_checks_ownership(self):
+        owner = self.login()
+        other = self.login('other@example.com')
+        food = self.client.post('/api/categories/', data={'name': 'Food'}, headers=owner).json()
+        travel = self.client.post('/api/categories/', data={'name': 'Travel'}, headers=owner).json()
+        foreign = self.client.post('/api/categories/', data={'name': 'Mine'}, headers=other).json()
+
+        response = self.client.post('/api/expenses/', data={
+            'amount': 12.5, 'description': 'Taxi', 'date': '2024-02-01T08:00:00', 'category_id': foreign['id']
+        }, headers=owner)
+        self.assertEqual((response.status_code, response.json()['detail']), (404, 'Category not found'))
+
+        expense = self.client.post('/api/expenses/', data={
+            'amount': 12.5, 'description': 'Taxi', 'date': '2024-02-01T08:00:00', 'category_id': food['id']
+        }, headers=owner).json()
+        self.assertEqual(expense['category_id'], food['id'])
+
+        update = {'amount': 15, 'description': 'Taxi home', 'date': '2024-02-01T23:00:00', 'category_id': travel['id']}
+        response = self.client.put(f"/api/expenses/{expense['id']}", data=update, headers=owner)
+        self.assertEqual(response.json(), dict(
+            update, id=expense['id'], amount=15.0, user_id=expense['user_id']
+        ))
+
+        response = self.client.put(f"/api/expenses/{expense['id']}", data=dict(update, category_id=foreign['id']), headers=owner)
+        self.assertEqual((response.status_code, response.json()['detail']), (404, 'Category not found'))
+        response = self.client.put(f"/api/expenses/{expense['id']}", data=dict(update, category_id=foreign['id']), headers=other)
+        self.assertEqual((response.status_code, response.json()['detail']), (404, 'Expense not found'))
+        self.assertEqual(self.client.get(f"/api/expenses/{expense['id']}", headers=owner).json()['description'], 'Taxi home')
+
+    def test_delete_category_with_reassignment(self):
+        owner = self.login()
+        other = self.login('other@example.com')
+        food = self.client.post('/api/categories/', data={'name': 'Food'}, headers=owner).json()
+        dining = self.client.post('/api/categories/', data={'name': 'Dining'}, headers=owner).json()
+        foreign = self.client.post('/api/categories/', data={'name': 'Food'}, headers=other).json()
+        for day in range(1, 4):
+            self.client.post('/api/expenses/', data={
+                'amount': day, 'description': 'Cafe', 'date': f'2024-03-0{day}T10:00:00', 'category_id': food['id']
+            }, headers=owner)
+
+        path = f"/api/categories/{food['id']}"
+        self.assertEqual(self.client.delete(path, params={'reassign_to': food['id']}, headers=owner).status_code, 400)
+        self.assertEqual(self.client.delete(path, params={'reassign_to': foreign['id']}, headers=owner).status_code, 404)
+        self.assertEqual(self.client.delete(path, headers=other).status_code, 404)
+
+        response = self.client.delete(path, params={'reassign_to': dining['id']}, headers=owner)
+        self.assertEqual(response.json()['reassigned_expenses'], 3)
+        self.assertEqual(self.client.get(path, headers=owner).status_code, 404)
+        remaining = self.client.get('/api/expenses/', headers=owner).json()
+        self.assertEqual({e['category_id'] for e in remaining}, {dining['id']})
+
+    def test_users_only_see_their_own_expenses(self):
+        owner = self.login()
+        other = self.login('other@example.com')
+        category = self.client.post('/api/categories/', data={'name': 'Travel'}, headers=owner).json()
+        expense = self.client.post('/api/expenses/', data={
+            'amount': 99, 'description': 'Train', 'date': '2024-02-01T08:00:00', 'category_id': category['id']
+        }, headers=owner).json()
+
+        self.assertEqual(self.client.get(f"/api/expenses/{expense['id']}", headers=other).status_code, 404)
+        self.assertEqual(self.client.get('/api/expenses/', headers=other).json(), [])
+
+if __name__ == '__main__':
+    unittest.main()
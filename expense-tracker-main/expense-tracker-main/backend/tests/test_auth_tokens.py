@@ -0,0 +1,54 @@
+import time
+import unittest
+import jwt
+from auth_tokens import TokenCache, create_access_token, decode_access_token
+from config import DEFAULT_SECRET_KEY, check_secret_key, settings
+
+class TestAuthTokens(unittest.TestCase):
+    def test_round_trip_uses_cache(self):
+        cache = TokenCache()
+        token = create_access_token(42, 'user@example.com')
+
+        claims = decode_access_token(token, cache)
+        self.assertEqual(claims['sub'], '42')
+        self.assertEqual(claims['email'], 'user@example.com')
+
+        self.assertIs(decode_access_token(token, cache), claims)
+        self.assertEqual(cache.stats(), {'entries': 1, 'hits': 1, 'misses': 1})
+
+    def test_rejects_tampered_and_expired_tokens(self):
+        cache = TokenCache()
+        token = create_access_token(1, 'user@example.com')
+        with self.assertRaises(jwt.InvalidTokenError):
+            decode_access_token(token[:-2] + ('AA' if token[-2:] != 'AA' else 'BB'), cache)
+
+        expired = create_access_token(1, 'user@example.com', expires_minutes=-1)
+        with self.assertRaises(jwt.ExpiredSignatureError):
+            decode_access_token(expired, cache)
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_cached_claims_expire_with_token(self):
+        cache = TokenCache()
+        cache.put('token', {'sub': '1', 'exp': time.time() - 1})
+        self.assertIsNone(cache.get('token', time.time()))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_lru_eviction(self):
+        cache = TokenCache(max_entries=2)
+        exp = time.time() + 60
+        cache.put('a', {'exp': exp})
+        cache.put('b', {'exp': exp})
+        cache.get('a', time.time())
+        cache.put('c', {'exp': exp})
+        self.assertIsNone(cache.get('b', time.time()))
+        self.assertIsNotNone(cache.get('a', time.time()))
+
+    def test_secret_key_check(self):
+        with self.assertRaises(RuntimeError):
+            check_secret_key(DEFAULT_SECRET_KEY)
+        with self.assertRaises(RuntimeError):
+            check_secret_key('short')
+        check_secret_key(settings.SECRET_KEY)
+
+if __name__ == '__main__':
+    unittest.main()
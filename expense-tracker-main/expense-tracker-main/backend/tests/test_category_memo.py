@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+from category_memo import CategoryMemo, normalize_description
+
+class TestCategoryMemo(unittest.TestCase):
+    def setUp(self):
+        self.expenses = [
+            {'description': 'Netflix subscription', 'category': 'Entertainment'},
+            {'description': 'Netflix subscription', 'category': 'Entertainment'},
+            {'description': 'NETFLIX.COM 03/24 #8812', 'category': 'Bills'},
+            {'description': 'Le Petit Cafe', 'category': 'Food', 'ai_tagged': True}
+        ]
+
+    def test_normalize_description(self):
+        self.assertEqual(normalize_description('NETFLIX.COM 03/24 #8812'), 'netflix com')
+        self.assertEqual(normalize_description("H&M Store 12"), 'h&m store')
+        self.assertEqual(normalize_description('2024-03-01'), '')
+
+    def test_exact_then_normalized(self):
+        memo = CategoryMemo()
+        memo.load('user', self.expenses)
+
+        exact = memo.lookup('user', 'Netflix subscription')
+        self.assertEqual(exact['category'], 'Entertainment')
+        self.assertEqual(exact['source'], 'user_history_exact')
+
+        normalized = memo.lookup('user', 'netflix.com 11/24 #0042')
+        self.assertEqual(normalized['category'], 'Bills')
+        self.assertEqual(normalized['source'], 'user_history_normalized')
+
+        # Auto-categorized rows are not the user's labels
+        self.assertIsNone(memo.lookup('user', 'Le Petit Cafe'))
+        self.assertIsNone(memo.lookup('other', 'Netflix subscription'))
+        self.assertEqual(memo.stats()['hits'], 2)
+
+    def test_most_used_category_wins(self):
+        memo = CategoryMemo()
+        memo.load('user', self.expenses)
+        memo.learn('user', [{'description': 'Netflix subscription', 'category': 'Bills'}])
+        result = memo.lookup('user', 'Netflix subscription')
+        self.assertEqual(result['category'], 'Entertainment')
+        self.assertAlmostEqual(result['confidence'], 2 / 3)
+
+        # Ties go to the most recent label
+        memo.learn('user', [{'description': 'Netflix subscription', 'category': 'Bills'}])
+        self.assertEqual(memo.lookup('user', 'Netflix subscription')['category'], 'Bills')
+
+    def test_learn_requires_loaded_memo(self):
+        memo = CategoryMemo()
+        self.assertFalse(memo.learn('user', self.expenses))
+        self.assertFalse(memo.loaded('user'))
+        memo.load('user', [])
+        self.assertTrue(memo.learn('user', self.expenses))
+        self.assertEqual(memo.lookup('user', 'Netflix subscription')['category'], 'Entertainment')
+
+    def test_lru_bounds(self):
+        memo = CategoryMemo(max_users=2, max_entries_per_user=2)
+        memo.load('a', [])
+        memo.load('b', [])
+        memo.lookup('a', 'anything')
+        memo.load('c', [])
+        self.assertTrue(memo.loaded('a'))
+        self.assertFalse(memo.loaded('b'))
+
+        memo.learn('a', [
+            {'description': 'Gym', 'category': 'Health'},
+            {'description': 'Uber', 'category': 'Transport'},
+            {'description': 'Lidl', 'category': 'Food'}
+        ])
+        self.assertIsNone(memo.lookup('a', 'Gym'))
+        self.assertEqual(memo.lookup('a', 'Lidl')['category'], 'Food')
+        self.assertLessEqual(memo.stats()['entries'], 2 * 2 * 2)
+
+    def test_expiry(self):
+        memo = CategoryMemo(max_age=60)
+        with mock.patch('category_memo.time.monotonic', return_value=1000.0):
+            memo.load('user', self.expenses)
+        with mock.patch('category_memo.time.monotonic', return_value=1030.0):
+            self.assertTrue(memo.loaded('user'))
+        with mock.patch('category_memo.time.monotonic', return_value=1061.0):
+            self.assertFalse(memo.loaded('user'))
+
+if __name__ == '__main__':
+    unittest.main()
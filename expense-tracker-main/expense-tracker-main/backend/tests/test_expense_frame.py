@@ -0,0 +1,123 @@
+import unittest
+import pandas as pd
+from ai_module import ExpenseAI
+from expense_frame import ExpenseFrame, FrameCache, as_expense_frame
+
+class TestExpenseFrame(unittest.TestCase):
+    def setUp(self):
+        self.expenses = [
+            {'id': 'a', 'amount': 10.0, 'date': '2024-03-01', 'category': 'Food', 'description': 'Lunch'},
+            {'id': 'b', 'amount': 25.5, 'date': '2024-03-02', 'category': 'Transport', 'description': 'Taxi'},
+            {'id': 'c', 'amount': 7.25, 'date': '2024-03-02', 'category': 'Food', 'description': 'Coffee'}
+        ]
+
+    def test_matches_dataframe(self):
+        df = ExpenseFrame.from_expenses(self.expenses).to_dataframe()
+        expected = pd.DataFrame(self.expenses)
+        expected['date'] = pd.to_datetime(expected['date'])
+
+        self.assertEqual(df['amount'].tolist(), expected['amount'].tolist())
+        self.assertEqual(df['date'].tolist(), expected['date'].tolist())
+        self.assertEqual(df['category'].astype(str).tolist(), expected['category'].tolist())
+        self.assertEqual(df['description'].tolist(), expected['description'].tolist())
+        self.assertEqual(
+            df.groupby('category', observed=True)['amount'].sum().to_dict(),
+            expected.groupby('category')['amount'].sum().to_dict()
+        )
+
+    def test_append_grows_in_place(self):
+        frame = ExpenseFrame(capacity=1)
+        for expense in self.expenses:
+            frame.append([expense])
+        self.assertEqual(len(frame), 3)
+        self.assertEqual(frame.amounts.tolist(), [10.0, 25.5, 7.25])
+
+        df = frame.to_dataframe()
+        self.assertIs(frame.to_dataframe(), df)
+        frame.append([{'id': 'd', 'amount': 3.0, 'date': '2024-03-03', 'category': 'Fun'}])
+        self.assertEqual(len(frame.to_dataframe()), 4)
+        self.assertEqual(list(frame.to_dataframe()['category'].cat.categories), ['Food', 'Transport', 'Fun'])
+
+    def test_date_parsing(self):
+        # Mixed ISO 8601 forms parse; anything else becomes NaT instead of raising
+        frame = ExpenseFrame.from_expenses([
+            dict(self.expenses[0], date='2024-01-01'),
+            dict(self.expenses[1], date='2024-01-02T10:00:00'),
+            dict(self.expenses[2], date='2024-01-03T00:00:00+02:00'),
+            dict(self.expenses[0], id='d', date='not a date')
+        ])
+        dates = frame.to_dataframe()['date']
+        self.assertEqual(dates[:3].tolist(), [
+            pd.Timestamp('2024-01-01'), pd.Timestamp('2024-01-02 10:00'), pd.Timestamp('2024-01-02 22:00')
+        ])
+        self.assertTrue(pd.isna(dates[3]))
+
+    def test_fingerprint(self):
+        # Order does not matter, content does
+        frame = ExpenseFrame.from_expenses(self.expenses)
+        self.assertEqual(frame.fingerprint(), ExpenseFrame.from_expenses(self.expenses[::-1]).fingerprint())
+        before = frame.fingerprint()
+        frame.append([{'id': 'd', 'amount': 3.0, 'date': '2024-03-03', 'category': 'Fun'}])
+        self.assertNotEqual(frame.fingerprint(), before)
+
+    def test_as_expense_frame(self):
+        frame = ExpenseFrame.from_expenses(self.expenses)
+        self.assertIs(as_expense_frame(frame), frame)
+        self.assertEqual(len(as_expense_frame(self.expenses)), 3)
+
+    def test_ai_accepts_frame(self):
+        ai = ExpenseAI()
+        frame = ExpenseFrame.from_expenses(self.expenses)
+        from_frame = ai.analyze_spending_patterns(frame)
+        from_list = ai.analyze_spending_patterns(self.expenses)
+        for key in ('total_spent', 'category_distribution', 'unusual_spending', 'average_daily_spending'):
+            self.assertEqual(from_frame[key], from_list[key])
+        query = 'How much did I spend?'
+        self.assertEqual(ai.process_chat_query(query, frame)['message'],
+                         ai.process_chat_query(query, self.expenses)['message'])
+
+class TestFrameCache(unittest.TestCase):
+    def setUp(self):
+        self.expenses = [
+            {'id': str(i), 'amount': float(i), 'date': f'2024-03-{i % 28 + 1:02d}', 'category': 'Food'}
+            for i in range(10)
+        ]
+
+    def test_append_requires_cached_frame(self):
+        cache = FrameCache()
+        self.assertFalse(cache.append('user', self.expenses[:1]))
+        cache.put('user', ExpenseFrame.from_expenses(self.expenses[:5]))
+        self.assertTrue(cache.append('user', self.expenses[5:]))
+        self.assertEqual(len(cache.get('user')), 10)
+        self.assertEqual(cache.stats()['bytes'], cache.get('user').nbytes)
+
+    def test_lru_eviction_by_size(self):
+        size = ExpenseFrame.from_expenses(self.expenses).nbytes
+        cache = FrameCache(max_bytes=size * 2)
+        for user in ('a', 'b'):
+            cache.put(user, ExpenseFrame.from_expenses(self.expenses))
+        cache.get('a')
+        cache.put('c', ExpenseFrame.from_expenses(self.expenses))
+
+        # 'b' was least recently used
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertLessEqual(cache.stats()['bytes'], size * 2)
+
+    def test_refresh_size_and_invalidate(self):
+        cache = FrameCache()
+        frame = ExpenseFrame.from_expenses(self.expenses)
+        cache.put('user', frame)
+        before = cache.stats()['bytes']
+        frame.to_dataframe()
+        cache.refresh_size('user')
+        self.assertGreater(cache.stats()['bytes'], before)
+
+        self.assertTrue(cache.invalidate_user('user'))
+        self.assertIsNone(cache.get('user'))
+        self.assertEqual(cache.stats()['bytes'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
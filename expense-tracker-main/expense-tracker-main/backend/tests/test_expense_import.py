@@ -0,0 +1,101 @@
+import io
+import unittest
+import expense_import
+from expense_import import import_expenses, iter_csv_rows, iter_ofx_rows
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<CURDEF>EUR
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240115120000[-5:EST]
+<TRNAMT>-42.50
+<FITID>1
+<NAME>Grocery shopping at Lidl
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240116<TRNAMT>1500.00<FITID>2<NAME>Salary</STMTTRN>
+</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+class TestExpenseImport(unittest.TestCase):
+    def test_csv_rows(self):
+        stream = io.StringIO(
+            "Date,Description,Amount,Category\n"
+            "2024-03-01,Netflix subscription,11.99,Entertainment\n"
+            "\n"
+            "2024-03-02,Uber ride,23.10,\n"
+        )
+        rows = list(iter_csv_rows(stream))
+        self.assertEqual(rows[0], (2, {
+            'date': '2024-03-01', 'description': 'Netflix subscription',
+            'amount': '11.99', 'category': 'Entertainment'
+        }))
+        self.assertEqual(rows[1][1], {'date': '2024-03-02', 'description': 'Uber ride', 'amount': '23.10'})
+
+    def test_ofx_rows(self):
+        original = expense_import.OFX_READ_SIZE
+        expense_import.OFX_READ_SIZE = 7  # force tokens to straddle read boundaries
+        try:
+            rows = list(iter_ofx_rows(io.StringIO(OFX_STATEMENT)))
+        finally:
+            expense_import.OFX_READ_SIZE = original
+
+        self.assertEqual(rows, [
+            (1, {'description': 'Grocery shopping at Lidl', 'amount': 42.5, 'date': '2024-01-15', 'currency': 'EUR'}),
+            (2, {'description': 'Salary', 'amount': -1500.0, 'date': '2024-01-16', 'currency': 'EUR'})
+        ])
+
+    def test_import_expenses(self):
+        rows = [
+            (2, {'date': '2024-03-01', 'description': 'Netflix', 'amount': '11.99', 'category': 'Entertainment'}),
+            (3, {'date': '2024-03-02', 'description': 'Uber ride', 'amount': '23.10'}),
+            (4, {'date': '2024-03-03', 'description': 'Refund', 'amount': '-5'}),
+            (5, {'date': '2024-03-04', 'amount': '5'}),
+            (6, {'date': '2024-03-05', 'description': 'Cinema', 'amount': '12'})
+        ]
+        written = []
+
+        def write_chunk(chunk):
+            written.append([dict(expense) for expense in chunk])
+            return {'written': len(chunk), 'elapsed_seconds': 0.01}
+
+        def categorize(descriptions):
+            return [{'category': 'Auto'} for _ in descriptions]
+
+        report = import_expenses(rows, 'user', write_chunk, categorize=categorize, chunk_size=2)
+
+        self.assertEqual(report['imported'], 3)
+        self.assertEqual(report['failed'], 2)
+        self.assertEqual(report['auto_categorized'], 2)
+        self.assertEqual([e['row'] for e in report['errors']], [4, 5])
+        self.assertEqual([len(chunk) for chunk in written], [2, 1])
+        self.assertEqual(written[0][1]['category'], 'Auto')
+        self.assertEqual(written[0][1]['amount'], 23.10)
+        self.assertTrue(all(e['user_id'] == 'user' for chunk in written for e in chunk))
+
+    def test_import_requires_category_without_categorizer(self):
+        rows = [(2, {'date': '2024-03-02', 'description': 'Uber ride', 'amount': '23.10'})]
+        report = import_expenses(rows, 'user', lambda chunk: {'written': len(chunk), 'elapsed_seconds': 0}, max_errors=0)
+
+        self.assertEqual(report['imported'], 0)
+        self.assertEqual(report['failed'], 1)
+        self.assertTrue(report['errors_truncated'])
+
+    def test_import_rejects_invalid_dates(self):
+        rows = [
+            (2, {'date': '2024-03-02T10:00:00', 'description': 'Uber ride', 'amount': '23.10', 'category': 'Transport'}),
+            (3, {'date': '03/02/2024', 'description': 'Uber ride', 'amount': '23.10', 'category': 'Transport'})
+        ]
+        report = import_expenses(rows, 'user', lambda chunk: {'written': len(chunk), 'elapsed_seconds': 0})
+
+        self.assertEqual(report['imported'], 1)
+        self.assertEqual(report['errors'], [{'row': 3, 'error': 'Invalid date value, expected YYYY-MM-DD'}])
+
+if __name__ == '__main__':
+    unittest.main()
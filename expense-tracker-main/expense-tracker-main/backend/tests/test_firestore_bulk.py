@@ -0,0 +1,57 @@
+import unittest
+from firestore_bulk import FIRESTORE_BATCH_LIMIT, bulk_write, chunked
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.ops = []
+
+    def set(self, ref, data, merge=False):
+        self.ops.append((ref, data))
+
+    def commit(self):
+        assert len(self.ops) <= FIRESTORE_BATCH_LIMIT
+        self.db.committed.append(self.ops)
+
+class FakeCollection:
+    def __init__(self, name):
+        self.name = name
+
+    def document(self):
+        return self.name
+
+class FakeDB:
+    def __init__(self):
+        self.committed = []
+
+    def collection(self, name):
+        return FakeCollection(name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+class TestFirestoreBulk(unittest.TestCase):
+    def test_chunked(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunked([], 2)), [])
+
+    def test_bulk_write_respects_batch_limit(self):
+        db = FakeDB()
+        documents = ({'n': i} for i in range(1200))
+        stats = bulk_write(
+            db, 'expenses', documents,
+            stage_extra=lambda batch, chunk: batch.set('aggregate', {'count': len(chunk)}),
+            extra_ops=1
+        )
+
+        self.assertEqual(stats['written'], 1200)
+        self.assertEqual(stats['batches'], 3)
+        self.assertEqual([len(ops) for ops in db.committed], [500, 500, 203])
+        self.assertEqual(db.committed[0][-1], ('aggregate', {'count': 499}))
+
+    def test_bulk_write_rejects_oversized_extra(self):
+        with self.assertRaises(ValueError):
+            bulk_write(FakeDB(), 'expenses', [{}], extra_ops=FIRESTORE_BATCH_LIMIT)
+
+if __name__ == '__main__':
+    unittest.main()
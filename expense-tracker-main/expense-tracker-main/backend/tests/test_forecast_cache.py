@@ -0,0 +1,44 @@
+import unittest
+from forecast_cache import ForecastCache, estimate_size
+
+class TestForecastCache(unittest.TestCase):
+    def setUp(self):
+        self.result = {'predictions': [1.0] * 30, 'model_metrics': {}}
+
+    def test_get_put(self):
+        cache = ForecastCache()
+        fingerprint = 'fingerprint'
+        self.assertIsNone(cache.get('user', fingerprint, 30))
+
+        cache.put('user', fingerprint, 30, self.result)
+        self.assertEqual(cache.get('user', fingerprint, 30), self.result)
+        self.assertIsNone(cache.get('user', fingerprint, 7))
+        self.assertIsNone(cache.get('other', fingerprint, 30))
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_lru_eviction_by_size(self):
+        size = estimate_size(self.result)
+        cache = ForecastCache(max_bytes=size * 2)
+        cache.put('user', 'a', 30, self.result)
+        cache.put('user', 'b', 30, self.result)
+        cache.get('user', 'a', 30)
+        cache.put('user', 'c', 30, self.result)
+
+        # 'b' was least recently used
+        self.assertIsNotNone(cache.get('user', 'a', 30))
+        self.assertIsNone(cache.get('user', 'b', 30))
+        self.assertIsNotNone(cache.get('user', 'c', 30))
+        self.assertLessEqual(cache.stats()['bytes'], size * 2)
+
+    def test_invalidate_user(self):
+        cache = ForecastCache()
+        cache.put('user', 'a', 30, self.result)
+        cache.put('user', 'a', 7, self.result)
+        cache.put('other', 'a', 30, self.result)
+
+        self.assertEqual(cache.invalidate_user('user'), 2)
+        self.assertIsNone(cache.get('user', 'a', 30))
+        self.assertIsNotNone(cache.get('other', 'a', 30))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+from forecast_engines import holt_forecast, moving_average_forecast, select_engine
+
+class TestSelectEngine(unittest.TestCase):
+    def test_by_length_and_sparsity(self):
+        self.assertEqual(select_engine([20.0] * 5), 'moving_average')
+        self.assertEqual(select_engine([20.0] * 20), 'holt')
+        self.assertEqual(select_engine([20.0] * 60), 'arima')
+        # Long but mostly zero-spend days
+        self.assertEqual(select_engine([20.0, 0, 0, 0] * 30), 'moving_average')
+
+    def test_forced_engine(self):
+        self.assertEqual(select_engine([20.0] * 5, 'arima'), 'arima')
+        with self.assertRaises(ValueError):
+            select_engine([20.0] * 5, 'prophet')
+
+class TestClosedFormEngines(unittest.TestCase):
+    def test_moving_average(self):
+        values = [0.0] * 40 + [10.0, 30.0] * 14
+        result = moving_average_forecast(values, 5)
+        self.assertEqual(result['predictions'], [20.0] * 5)
+        low, high = result['confidence_intervals'][0]
+        self.assertAlmostEqual((low + high) / 2, 20.0)
+        self.assertAlmostEqual(high - low, 2 * 1.959963984540054 * 10.0)
+
+    def test_holt_follows_trend(self):
+        rng = np.random.default_rng(0)
+        values = 10 + 0.5 * np.arange(25) + rng.normal(0, 0.5, 25)
+        result = holt_forecast(values, 10)
+        self.assertEqual(len(result['predictions']), 10)
+        self.assertGreater(result['predictions'][0], values[-5:].mean())
+        # Damped trend: the forecast keeps rising but by less each day
+        steps = np.diff(result['predictions'])
+        self.assertTrue(np.all(steps > 0))
+        self.assertTrue(np.all(np.diff(steps) < 0))
+        # Intervals contain the forecast and widen with the horizon
+        widths = [high - low for low, high in result['confidence_intervals']]
+        self.assertTrue(np.all(np.diff(widths) > 0))
+
+    def test_holt_constant_series(self):
+        result = holt_forecast([50.0] * 20, 7)
+        np.testing.assert_allclose(result['predictions'], [50.0] * 7)
+
+if __name__ == '__main__':
+    unittest.main()
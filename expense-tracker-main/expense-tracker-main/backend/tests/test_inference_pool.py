@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import model_store
+from ai_module import ExpenseAI, category_model_metadata
+from inference_pool import CategoryInferencePool, Histogram
+from keyword_rules import KeywordMatcher
+
+class TestHistogram(unittest.TestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram((1, 5, 10))
+        for value in (0.5, 1, 3, 7, 50):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['buckets'], {'1': 2, '5': 3, '10': 4, '+Inf': 5})
+        self.assertEqual(snapshot['count'], 5)
+        self.assertAlmostEqual(snapshot['sum'], 61.5)
+
+class TestCategoryInferencePool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.store_dir = tempfile.mkdtemp()
+        cls.model = ExpenseAI._train_category_model()
+        model_store.save_model(cls.model, model_store.CATEGORY_MODEL_NAME, category_model_metadata(), cls.store_dir)
+        # A long coalescing window makes batching deterministic
+        cls.pool = CategoryInferencePool(1, category_model_metadata(), max_wait_ms=200, store_dir=cls.store_dir)
+        cls.pool.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        shutil.rmtree(cls.store_dir)
+
+    def test_matches_inline_model(self):
+        descriptions = ['Netflix subscription', 'Electricity bill', 'Uber ride']
+        classes, probabilities = self.pool.predict_proba(descriptions, timeout=30)
+        self.assertEqual(classes, list(self.model.classes_))
+        np.testing.assert_allclose(probabilities, self.model.predict_proba(descriptions))
+
+    def test_coalesces_requests(self):
+        before = self.pool.stats()
+        futures = [self.pool.submit([description]) for description in ('Gym membership', 'Gym membership', 'Pizza')]
+        results = [future.result(timeout=30) for future in futures]
+
+        stats = self.pool.stats()
+        self.assertEqual(stats['requests'] - before['requests'], 3)
+        self.assertEqual(stats['batches'] - before['batches'], 1)
+        # Duplicate descriptions are predicted once and fanned back out
+        self.assertEqual(stats['batch_size']['sum'] - before['batch_size']['sum'], 2)
+        np.testing.assert_array_equal(results[0][1], results[1][1])
+        self.assertEqual(stats['latency_ms']['count'] - before['latency_ms']['count'], 3)
+
+class TestInferenceFallback(unittest.TestCase):
+    def test_failed_pool_falls_back_inline_and_counts(self):
+        # No artifact in the store, so every batch fails in the worker
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir)
+        pool = CategoryInferencePool(1, category_model_metadata(), store_dir=store_dir)
+        self.addCleanup(pool.close)
+
+        ai = ExpenseAI(forecast_workers=0, inference_workers=1, keyword_matcher=KeywordMatcher([]))
+        ai._inference_pool = pool
+        with self.assertLogs('ai_module', 'WARNING'):
+            result = ai.predict_category('Netflix subscription')
+
+        self.assertEqual(result['category'], ai.category_model.predict(['Netflix subscription'])[0])
+        self.assertEqual(pool.stats()['fallbacks'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
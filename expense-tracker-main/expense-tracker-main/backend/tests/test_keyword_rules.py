@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import unittest
+from ai_module import ExpenseAI
+from keyword_rules import KeywordMatcher, KeywordRule, load_rules_file
+
+class TestKeywordMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher()
+
+    def test_priority_beats_rule_order(self):
+        # "gas" (Utilities) is a weaker rule than the phrase "gas station"
+        self.assertEqual(self.matcher.match('Gas station fill-up').rule.category, 'Transport')
+        self.assertEqual(self.matcher.match('Gas and electricity').rule.category, 'Utilities')
+        self.assertEqual(self.matcher.match('Pizza via Uber').rule.keyword, 'uber')
+
+    def test_whole_words_only(self):
+        self.assertIsNone(self.matcher.match('Business lunch'))
+        self.assertEqual(self.matcher.match('H&M jeans').rule.category, 'Shopping')
+        self.assertEqual(self.matcher.match('Disney+ yearly').rule.category, 'Entertainment')
+
+    def test_plurals(self):
+        self.assertEqual(self.matcher.match('Restaurants downtown').rule.category, 'Food')
+        self.assertEqual(self.matcher.match('Movies night').rule.category, 'Entertainment')
+        self.assertEqual(self.matcher.match('Buses').rule.category, 'Transport')
+        # Other endings are still different words
+        self.assertIsNone(self.matcher.match('Busy day'))
+
+    def test_overlapping_keywords(self):
+        matcher = KeywordMatcher([
+            KeywordRule('he', 'A'), KeywordRule('she', 'B'), KeywordRule('hers', 'C'), KeywordRule('his', 'D')
+        ])
+        self.assertEqual([(start, rule.keyword) for start, rule in matcher.find_all('his hers she')],
+                         [(0, 'his'), (4, 'hers'), (9, 'she')])
+
+    def test_preclassify(self):
+        self.assertEqual(self.matcher.preclassify('Netflix subscription').category, 'Entertainment')
+        # Generic keywords are left to the model
+        self.assertIsNone(self.matcher.preclassify('Electricity bill'))
+        # Two merchants of different categories are ambiguous
+        self.assertIsNone(self.matcher.preclassify('Amazon gift card for Netflix'))
+
+    def test_user_rules_override(self):
+        matcher = self.matcher.with_rules([
+            KeywordRule('aldi', 'Food', 100, 0.95),
+            KeywordRule('amazon', 'Entertainment', 100, 0.9)
+        ])
+        self.assertEqual(matcher.preclassify('ALDI Süd').category, 'Food')
+        self.assertEqual(matcher.preclassify('Amazon Prime Video').category, 'Entertainment')
+        self.assertIsNone(self.matcher.match('ALDI Süd'))
+
+    def test_load_rules_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rules.json')
+            with open(path, 'w') as f:
+                json.dump([{'keyword': 'aldi', 'category': 'Food', 'priority': 100}], f)
+            self.assertEqual(load_rules_file(path), [KeywordRule('aldi', 'Food', 100, 0.8)])
+
+class TestRulePreclassifier(unittest.TestCase):
+    def test_merchants_skip_model(self):
+        ai = ExpenseAI(forecast_workers=0)
+        results = ai.predict_categories(['Uber ride to airport', 'Netflix subscription'])
+        self.assertEqual([result['category'] for result in results], ['Transport', 'Entertainment'])
+        self.assertIsNone(ai._category_model)
+
+        # Everything else still goes through the model, in input order
+        results = ai.predict_categories(['Carrefour', 'Electricity bill', 'Zara coat'])
+        self.assertEqual(results[0]['category'], 'Food')
+        self.assertEqual(results[2]['category'], 'Shopping')
+        self.assertIsNotNone(ai._category_model)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+import model_store
+from ai_module import ExpenseAI, category_model_metadata
+
+class TestModelStore(unittest.TestCase):
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+        self.model = ExpenseAI._train_category_model()
+        self.manifest = model_store.save_model(
+            self.model, model_store.CATEGORY_MODEL_NAME, category_model_metadata(), self.store_dir
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.store_dir)
+
+    def test_round_trip(self):
+        loaded = model_store.load_model(
+            model_store.CATEGORY_MODEL_NAME, category_model_metadata(), self.store_dir
+        )
+        self.assertIsNotNone(loaded)
+        descriptions = ['Netflix subscription', 'Electricity bill', 'Uber ride']
+        self.assertEqual(list(loaded.predict(descriptions)), list(self.model.predict(descriptions)))
+
+        # Saving identical model bytes yields the same version
+        manifest = model_store.save_model(
+            self.model, model_store.CATEGORY_MODEL_NAME, category_model_metadata(), self.store_dir
+        )
+        self.assertEqual(manifest['version'], self.manifest['version'])
+
+    def test_hash_mismatch_is_rejected(self):
+        with open(os.path.join(self.store_dir, self.manifest['artifact']), 'ab') as f:
+            f.write(b'tampered')
+        loaded = model_store.load_model(
+            model_store.CATEGORY_MODEL_NAME, category_model_metadata(), self.store_dir
+        )
+        self.assertIsNone(loaded)
+
+    def test_stale_metadata_is_rejected(self):
+        loaded = model_store.load_model(
+            model_store.CATEGORY_MODEL_NAME, {'training_data': 'other'}, self.store_dir
+        )
+        self.assertIsNone(loaded)
+
+    def test_superseded_artifacts_are_pruned(self):
+        name = model_store.CATEGORY_MODEL_NAME
+        manifest = model_store.save_model({'retrained': True}, name, category_model_metadata(), self.store_dir)
+        artifacts = [f for f in os.listdir(self.store_dir) if f.endswith('.joblib')]
+        self.assertEqual(artifacts, [manifest['artifact']])
+
+        # A newer artifact whose manifest swap has not happened yet is left alone
+        pending = os.path.join(self.store_dir, f'{name}-{"0" * 12}.joblib')
+        with open(pending, 'wb') as f:
+            f.write(b'pending')
+        future = os.stat(pending).st_mtime + 60
+        os.utime(pending, (future, future))
+        self.assertEqual(model_store.prune_artifacts(name, self.store_dir), 0)
+        self.assertTrue(os.path.exists(pending))
+
+    def test_missing_model(self):
+        self.assertIsNone(model_store.load_model('missing', store_dir=self.store_dir))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import model_store
+from ai_module import CATEGORIES, TRAINING_DATA, ExpenseAI
+from keyword_rules import KeywordMatcher
+from online_learning import ONLINE_CATEGORY_MODEL_NAME, OnlineCategoryLearner, build_online_model
+
+class TestOnlineCategoryLearner(unittest.TestCase):
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+        self.model = build_online_model(TRAINING_DATA, CATEGORIES)
+
+    def tearDown(self):
+        shutil.rmtree(self.store_dir)
+
+    def learner(self, **kwargs) -> OnlineCategoryLearner:
+        options = dict(batch_size=4, snapshot_every=0, store_dir=self.store_dir, background=False)
+        options.update(kwargs)
+        return OnlineCategoryLearner(self.model, **options)
+
+    def test_seed_model(self):
+        predictions = self.model.predict(['Netflix subscription', 'Uber ride to airport'])
+        self.assertEqual(list(predictions), ['Entertainment', 'Transport'])
+
+    def test_learns_from_corrections(self):
+        learner = self.learner()
+        before = learner.model
+        self.assertNotEqual(before.predict(['Boulangerie Paul'])[0], 'Shopping')
+
+        learner.observe([('Boulangerie Paul', 'Shopping')] * 6)
+        self.assertEqual(learner.flush(), 6)
+        self.assertEqual(learner.stats()['batches'], 2)
+        self.assertEqual(learner.model.predict(['Boulangerie Paul'])[0], 'Shopping')
+        # Updates go to a copy; the previous model is left untouched
+        self.assertNotEqual(before.predict(['Boulangerie Paul'])[0], 'Shopping')
+
+    def test_new_category(self):
+        learner = self.learner()
+        learner.observe([('Piano lesson', 'Education'), ('Maths tutor', 'Education')])
+        learner.flush()
+        self.assertIn('Education', learner.model.classes_)
+        self.assertEqual(learner.model.predict(['Piano lesson'])[0], 'Education')
+        # What was learned before survives the label set growing
+        self.assertEqual(learner.model.predict(['Netflix subscription'])[0], 'Entertainment')
+
+    def test_snapshots(self):
+        learner = self.learner(snapshot_every=2, metadata={'mode': 'online'})
+        learner.observe([('Boulangerie Paul', 'Shopping')] * 8)
+        learner.flush()
+        self.assertEqual(learner.stats()['snapshots'], 1)
+
+        restored = model_store.load_model(ONLINE_CATEGORY_MODEL_NAME, {'mode': 'online'}, self.store_dir)
+        self.assertEqual(restored.predict(['Boulangerie Paul'])[0], 'Shopping')
+
+        # close() trains what is queued and snapshots it
+        learner.observe([('Piano lesson', 'Education')])
+        learner.close()
+        self.assertEqual(learner.stats()['snapshots'], 2)
+        # Only the published snapshot is kept on disk
+        artifacts = [name for name in os.listdir(self.store_dir) if name.endswith('.joblib')]
+        self.assertEqual(artifacts, [model_store.read_manifest(ONLINE_CATEGORY_MODEL_NAME, self.store_dir)['artifact']])
+
+    def test_background_batches(self):
+        learner = self.learner(background=True, flush_interval=0.05)
+        learner.observe([('Boulangerie Paul', 'Food')])
+        deadline = time.monotonic() + 5
+        while learner.stats()['samples_seen'] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        learner.close()
+        self.assertEqual(learner.stats()['samples_seen'], 1)
+
+class TestExpenseAIOnlineMode(unittest.TestCase):
+    def test_learn_categories(self):
+        static = ExpenseAI(forecast_workers=0)
+        self.assertEqual(static.learn_categories([{'description': 'Piano lesson', 'category': 'Education'}]), 0)
+
+        ai = ExpenseAI(forecast_workers=0, keyword_matcher=KeywordMatcher([]), category_model_mode='online')
+        ai._online_learner = OnlineCategoryLearner(
+            build_online_model(TRAINING_DATA, CATEGORIES), batch_size=2, snapshot_every=0, background=False
+        )
+        queued = ai.learn_categories([
+            {'description': 'Piano lesson', 'category': 'Education'},
+            {'description': 'Piano lesson', 'category': 'Education'},
+            {'description': 'Piano lesson', 'category': 'Food', 'ai_tagged': True}
+        ])
+        self.assertEqual(queued, 2)
+        ai.online_learner.flush()
+        self.assertEqual(ai.predict_category('Piano lesson')['category'], 'Education')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+import time
+import unittest
+from process_pools import spawn_executor, terminate_executor
+
+class TestProcessPools(unittest.TestCase):
+    def test_terminate_kills_running_task(self):
+        executor = spawn_executor(1)
+        future = executor.submit(time.sleep, 60)
+        deadline = time.monotonic() + 30
+        while not future.running() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        processes = list(executor._processes.values())
+        self.assertEqual(len(processes), 1)
+
+        terminate_executor(executor)
+        for process in processes:
+            process.join(timeout=10)
+            self.assertFalse(process.is_alive())
+
+if __name__ == '__main__':
+    unittest.main()
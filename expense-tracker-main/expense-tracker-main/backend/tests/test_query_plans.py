@@ -0,0 +1,70 @@
+import re
+import unittest
+from sqlalchemy import event
+from test_api_routers import APITestCase
+
+# A bare "SCAN <table>" is a full table scan; index use reads "SCAN t USING
+# INDEX ...", "SEARCH t USING INDEX ..." or "... USING INTEGER PRIMARY KEY"
+TABLE_SCAN = re.compile(r'^SCAN (\w+)$')
+
+class TestQueryPlans(APITestCase):
+    """Replays every query the routers issue through EXPLAIN QUERY PLAN"""
+
+    def setUp(self):
+        super().setUp()
+        self.statements = []
+        engine = self.async_engine.sync_engine
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            verb = statement.lstrip().split(None, 1)[0].upper()
+            if executemany or verb not in ('SELECT', 'INSERT', 'UPDATE', 'DELETE'):
+                return
+            if verb == 'INSERT' and 'SELECT' not in statement.upper():
+                return
+            self.statements.append((statement, parameters))
+
+        event.listen(engine, 'before_cursor_execute', record)
+        self.addCleanup(event.remove, engine, 'before_cursor_execute', record)
+
+    def query_plans(self):
+        plans = []
+        with self.engine.connect() as connection:
+            for statement, parameters in self.statements:
+                rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+                plans.append((statement, [row[-1] for row in rows]))
+        return plans
+
+    def test_router_queries_use_indexes(self):
+        headers = self.login()
+        category = self.client.post('/api/categories/', data={'name': 'Food'}, headers=headers).json()
+        self.client.put(f"/api/categories/{category['id']}", data={'name': 'Groceries'}, headers=headers)
+        self.client.get('/api/categories/', headers=headers)
+        self.client.get(f"/api/categories/{category['id']}", headers=headers)
+        for day in range(1, 4):
+            self.client.post('/api/expenses/', data={
+                'amount': day, 'description': 'Bread', 'date': f'2024-01-0{day}T09:00:00',
+                'category_id': category['id']
+            }, headers=headers)
+        self.client.put('/api/expenses/1', data={
+            'amount': 5, 'description': 'Rolls', 'date': '2024-01-01T10:00:00', 'category_id': category['id']
+        }, headers=headers)
+        page = self.client.get('/api/expenses/', params={'limit': 2}, headers=headers)
+        self.client.get('/api/expenses/', params={
+            'limit': 2, 'start_after': page.headers['X-Next-Cursor'], 'fields': 'amount,date'
+        }, headers=headers)
+        self.client.get('/api/expenses/', params={
+            'start_date': '2024-01-02T00:00:00', 'end_date': '2024-01-03T00:00:00'
+        }, headers=headers)
+        self.client.get('/api/expenses/1', headers=headers)
+        self.client.delete(f"/api/categories/{category['id']}", headers=headers)
+
+        plans = self.query_plans()
+        self.assertGreaterEqual(len(plans), 10)
+        for statement, plan in plans:
+            for step in plan:
+                self.assertIsNone(TABLE_SCAN.match(step), f'{step!r} in plan for: {statement}')
+            if 'LIMIT' in statement and 'ORDER BY expenses.date' in statement:
+                self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan, statement)
+
+if __name__ == '__main__':
+    unittest.main()
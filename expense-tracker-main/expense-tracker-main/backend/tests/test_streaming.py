@@ -0,0 +1,34 @@
+import json
+import unittest
+from streaming import json_array_stream, ndjson_stream
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.documents = [{'id': str(i), 'amount': i * 1.5} for i in range(100)]
+
+    def test_ndjson_stream(self):
+        body = ''.join(ndjson_stream(iter(self.documents), json.dumps, buffer_size=64))
+        self.assertEqual([json.loads(line) for line in body.splitlines()], self.documents)
+
+    def test_json_array_stream(self):
+        body = ''.join(json_array_stream(iter(self.documents), json.dumps, buffer_size=64))
+        self.assertEqual(json.loads(body), self.documents)
+        self.assertEqual(''.join(json_array_stream(iter([]), json.dumps)), '[]')
+
+    def test_stream_is_incremental(self):
+        consumed = []
+
+        def documents():
+            for document in self.documents:
+                consumed.append(document)
+                yield document
+
+        chunks = json_array_stream(documents(), json.dumps, buffer_size=1024 * 1024)
+        first = next(chunks)
+
+        # The first chunk goes out before the rest of the query is read
+        self.assertEqual(first, '[')
+        self.assertEqual(consumed, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -62,7 +62,7 @@ const AddExpense = () => {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ description }),
+        body: JSON.stringify({ description, user_id: user?.id }),
       });
 
       if (response.ok) {